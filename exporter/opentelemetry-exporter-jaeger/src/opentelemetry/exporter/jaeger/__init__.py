@@ -44,8 +44,11 @@ Usage
         # password=xxxx, # optional
     )
 
-    # Create a BatchExportSpanProcessor and add the exporter to it
-    span_processor = BatchExportSpanProcessor(jaeger_exporter)
+    # Create a BatchExportSpanProcessor and add the exporter to it, keeping
+    # batches within the maximum UDP packet size of the agent
+    span_processor = BatchExportSpanProcessor(
+        jaeger_exporter, max_export_batch_bytes=60000
+    )
 
     # add to the tracer
     trace.get_tracer_provider().add_span_processor(span_processor)
@@ -69,7 +72,13 @@ from thrift.transport import THttpClient, TTransport
 from opentelemetry.configuration import Configuration
 from opentelemetry.exporter.jaeger.gen.agent import Agent as agent
 from opentelemetry.exporter.jaeger.gen.jaeger import Collector as jaeger
-from opentelemetry.sdk.trace.export import Span, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.export import (
+    Span,
+    SpanExporter,
+    SpanExportResult,
+    estimate_attributes_size,
+    estimate_span_size,
+)
 from opentelemetry.trace import SpanKind
 from opentelemetry.trace.status import StatusCode
 
@@ -78,6 +87,10 @@ DEFAULT_AGENT_PORT = 6831
 
 UDP_PACKET_MAX_LENGTH = 65000
 
+# encoded size of the status, span kind and instrumentation library tags
+# added to every span
+_SPAN_TAGS_OVERHEAD_BYTES = 160
+
 OTLP_JAEGER_SPAN_KIND = {
     SpanKind.CLIENT: "client",
     SpanKind.SERVER: "server",
@@ -185,6 +198,18 @@ class JaegerSpanExporter(SpanExporter):
     def shutdown(self):
         pass
 
+    def estimate_encoded_size(self, span: Span) -> int:
+        """See `opentelemetry.sdk.trace.export.SpanExporter.estimate_encoded_size`.
+
+        Jaeger has no resource, its attributes are added as tags to every
+        span instead.
+        """
+        return (
+            estimate_span_size(span)
+            + estimate_attributes_size(span.resource.attributes)
+            + _SPAN_TAGS_OVERHEAD_BYTES
+        )
+
 
 def _parameter_setter(param, env_variable, default):
     """Returns value according to the provided data.
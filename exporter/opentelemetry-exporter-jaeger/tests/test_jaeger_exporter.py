@@ -444,6 +444,40 @@ class TestJaegerSpanExporter(unittest.TestCase):
         self.assertEqual(agent_client_mock.emit.call_count, 1)
         self.assertEqual(collector_mock.submit.call_count, 1)
 
+    def test_estimate_encoded_size(self):
+        exporter = jaeger_exporter.JaegerSpanExporter("my-service")
+        spans = []
+        for resource in (Resource({}), Resource({"key": "some_resource"})):
+            span = trace._Span(
+                "test_span", context=self._test_span.context, resource=resource
+            )
+            span.start()
+            span.end()
+            spans.append(span)
+
+        # resource attributes are added as tags to every span
+        self.assertGreater(
+            exporter.estimate_encoded_size(spans[1]),
+            exporter.estimate_encoded_size(spans[0]),
+        )
+        span = spans[1]
+
+        # the estimate doesn't fall short of the actual encoded size
+        agent_client = jaeger_exporter.AgentClientUDP(
+            host_name="localhost", port=6354
+        )
+        batch = jaeger.Batch(
+            # pylint: disable=protected-access
+            spans=jaeger_exporter._translate_to_jaeger((span,)),
+            process=jaeger.Process(serviceName="my-service"),
+        )
+        # pylint: disable=protected-access
+        agent_client.client.emitBatch(batch)
+        self.assertGreaterEqual(
+            exporter.estimate_encoded_size(span),
+            len(agent_client.buffer.getvalue()),
+        )
+
     def test_agent_client(self):
         agent_client = jaeger_exporter.AgentClientUDP(
             host_name="localhost", port=6354
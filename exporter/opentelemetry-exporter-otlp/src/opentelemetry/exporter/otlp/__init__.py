@@ -36,6 +36,40 @@ if no compression is the desired choice.
 Additional details are available `in the specification
 <https://github.com/open-telemetry/opentelemetry-specification/blob/master/specification/protocol/exporter.md#opentelemetry-protocol-exporter>`_.
 
+.. envvar:: OTEL_EXPORTER_OTLP_PROTOCOL
+.. envvar:: OTEL_EXPORTER_OTLP_COMPRESSION_LEVEL
+
+The :envvar:`OTEL_EXPORTER_OTLP_PROTOCOL` environment variable selects the
+transport of the exporters: ``grpc`` (the default), or OTLP/HTTP with
+``http/protobuf`` or ``http/json`` request bodies. The OTLP/HTTP requests are
+sent over persistent HTTP/1.1 connections to the ``/v1/traces`` or
+``/v1/metrics`` path of the endpoint, ``localhost:55681`` by default, unless
+the endpoint is a URL with a path. With gzip compression, their compression
+level is :envvar:`OTEL_EXPORTER_OTLP_COMPRESSION_LEVEL` (6 by default).
+
+.. envvar:: OTEL_EXPORTER_OTLP_SPOOL_DIRECTORY
+.. envvar:: OTEL_EXPORTER_OTLP_SPOOL_MAX_BYTES
+
+The :envvar:`OTEL_EXPORTER_OTLP_SPOOL_DIRECTORY` environment variable enables
+a persistent spool of the requests that could not be exported because the
+collector was unavailable. The exporters then no longer retry the exports in
+their export calls: the failed requests are written to the ``traces`` or
+``metrics`` subdirectory of the spool directory, and sent again in the
+background, including after a restart. The spool size is limited to
+:envvar:`OTEL_EXPORTER_OTLP_SPOOL_MAX_BYTES` bytes (64 MiB by default), the
+oldest requests being dropped first.
+
+.. envvar:: OTEL_EXPORTER_OTLP_EXPORT_TIMEOUT_MILLIS
+.. envvar:: OTEL_EXPORTER_OTLP_RETRYABLE_STATUS_CODES
+
+The retries of an export are given up once
+:envvar:`OTEL_EXPORTER_OTLP_EXPORT_TIMEOUT_MILLIS` milliseconds have passed,
+:envvar:`OTEL_BSP_EXPORT_TIMEOUT_MILLIS` (30 seconds by default) if it is not
+set, or as soon as the exporter or its span processor is shut down. The retry
+delays are jittered. The gRPC status codes of the retried errors are given by
+:envvar:`OTEL_EXPORTER_OTLP_RETRYABLE_STATUS_CODES`, a comma-separated list of
+names such as ``UNAVAILABLE,DEADLINE_EXCEEDED``.
+
 .. code:: python
 
     from opentelemetry import trace
@@ -16,10 +16,13 @@
 
 import enum
 import logging
+import os
+import threading
 from abc import ABC, abstractmethod
 from collections.abc import Mapping, Sequence
-from time import sleep
-from typing import Any, Callable, Dict, Generic, List, Optional
+from random import uniform
+from time import monotonic
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional
 from typing import Sequence as TypingSequence
 from typing import Text, TypeVar
 
@@ -36,7 +39,17 @@ from grpc import (
 )
 
 from opentelemetry.configuration import Configuration
-from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.exporter.otlp.http_transport import (
+    HTTPExportClient,
+    get_export_url,
+)
+from opentelemetry.exporter.otlp.spool import Spool
+from opentelemetry.proto.common.v1.common_pb2 import (
+    AnyValue,
+    ArrayValue,
+    KeyValue,
+    KeyValueList,
+)
 from opentelemetry.proto.resource.v1.resource_pb2 import Resource
 from opentelemetry.sdk.resources import Resource as SDKResource
 
@@ -47,12 +60,46 @@ TypingResourceT = TypeVar("TypingResourceT")
 ExportServiceRequestT = TypeVar("ExportServiceRequestT")
 ExportResultT = TypeVar("ExportResultT")
 
+# maximum number of translated resources kept by an exporter
+_MAX_CACHED_RESOURCES = 64
+
+# default gzip compression level of the OTLP/HTTP requests
+_DEFAULT_COMPRESSION_LEVEL = 6
+
+# default maximum size of the spool of an exporter: 64 MiB
+_DEFAULT_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+# maximum delay between the attempts to send the spooled requests, in seconds
+_SPOOL_MAX_RETRY_DELAY = 64
+
+# default maximum duration of an export call, with its retries
+_DEFAULT_EXPORT_TIMEOUT_MILLIS = 30000
+
+_RETRYABLE_STATUS_CODES = frozenset(
+    [
+        StatusCode.CANCELLED,
+        StatusCode.DEADLINE_EXCEEDED,
+        StatusCode.PERMISSION_DENIED,
+        StatusCode.UNAUTHENTICATED,
+        StatusCode.RESOURCE_EXHAUSTED,
+        StatusCode.ABORTED,
+        StatusCode.OUT_OF_RANGE,
+        StatusCode.UNAVAILABLE,
+        StatusCode.DATA_LOSS,
+    ]
+)
+
 
 class OTLPCompression(enum.Enum):
     gzip = "gzip"
 
 
-def _translate_key_values(key: Text, value: Any) -> KeyValue:
+class OTLPProtocol(enum.Enum):
+    grpc = "grpc"
+    http_protobuf = "http/protobuf"
+    http_json = "http/json"
+
+
+def _translate_any_value(value: Any) -> AnyValue:
 
     if isinstance(value, bool):
         any_value = AnyValue(bool_value=value)
@@ -67,26 +114,72 @@ def _translate_key_values(key: Text, value: Any) -> KeyValue:
         any_value = AnyValue(double_value=value)
 
     elif isinstance(value, Sequence):
-        any_value = AnyValue(array_value=value)
+        any_value = AnyValue(
+            array_value=ArrayValue(
+                values=[_translate_any_value(element) for element in value]
+            )
+        )
 
     elif isinstance(value, Mapping):
-        any_value = AnyValue(kvlist_value=value)
+        any_value = AnyValue(
+            kvlist_value=KeyValueList(
+                values=[
+                    _translate_key_values(key, element)
+                    for key, element in value.items()
+                ]
+            )
+        )
 
     else:
         raise Exception(
             "Invalid type {} of value {}".format(type(value), value)
         )
 
-    return KeyValue(key=key, value=any_value)
+    return any_value
+
+
+def _translate_key_values(key: Text, value: Any) -> KeyValue:
+    return KeyValue(key=key, value=_translate_any_value(value))
+
+
+def _translate_resource(sdk_resource: SDKResource) -> Resource:
+
+    collector_resource = Resource()
+
+    for key, value in sdk_resource.attributes.items():
+
+        try:
+            # pylint: disable=no-member
+            collector_resource.attributes.append(
+                _translate_key_values(key, value)
+            )
+        except Exception as error:  # pylint: disable=broad-except
+            logger.exception(error)
+
+    return collector_resource
 
 
 def _get_resource_data(
     sdk_resource_instrumentation_library_data: Dict[
-        SDKResource, ResourceDataT
+        SDKResource, List[ResourceDataT]
     ],
     resource_class: Callable[..., TypingResourceT],
     name: str,
+    resource_cache: Optional[Dict[SDKResource, Resource]] = None,
 ) -> List[TypingResourceT]:
+    """Returns the resource data of the instrumentation library data grouped
+    by resource.
+
+    The translated resources are kept in ``resource_cache`` to be reused by
+    the next calls.
+    """
+
+    if resource_cache is None:
+        resource_cache = {}
+
+    instrumentation_library_field = "instrumentation_library_{}".format(
+        name
+    )
 
     resource_data = []
 
@@ -95,25 +188,21 @@ def _get_resource_data(
         instrumentation_library_data,
     ) in sdk_resource_instrumentation_library_data.items():
 
-        collector_resource = Resource()
+        collector_resource = resource_cache.get(sdk_resource)
 
-        for key, value in sdk_resource.attributes.items():
-
-            try:
-                # pylint: disable=no-member
-                collector_resource.attributes.append(
-                    _translate_key_values(key, value)
-                )
-            except Exception as error:  # pylint: disable=broad-except
-                logger.exception(error)
+        if collector_resource is None:
+            collector_resource = _translate_resource(sdk_resource)
+            if len(resource_cache) >= _MAX_CACHED_RESOURCES:
+                resource_cache.clear()
+            resource_cache[sdk_resource] = collector_resource
 
         resource_data.append(
             resource_class(
                 **{
                     "resource": collector_resource,
-                    "instrumentation_library_{}".format(name): [
+                    instrumentation_library_field: (
                         instrumentation_library_data
-                    ],
+                    ),
                 }
             )
         )
@@ -121,6 +210,41 @@ def _get_resource_data(
     return resource_data
 
 
+def _get_retry_delay(error: RpcError, delay: float) -> float:
+    """Returns the delay requested by the server in the error details, or
+    ``delay`` if there is none."""
+
+    retry_info_bin = dict(error.trailing_metadata()).get(
+        "google.rpc.retryinfo-bin"
+    )
+    if retry_info_bin is not None:
+        retry_info = RetryInfo()
+        retry_info.ParseFromString(retry_info_bin)
+        delay = (
+            retry_info.retry_delay.seconds
+            + retry_info.retry_delay.nanos / 1.0e9
+        )
+    return delay
+
+
+def _jitter(delay: float) -> float:
+    """Returns a random delay between half and all of ``delay``, so that the
+    exporters failing at the same time do not retry at the same time."""
+    return uniform(delay / 2, delay)
+
+
+def _parse_status_codes(status_codes: str) -> frozenset:
+    """Returns the status codes of a comma separated list of names."""
+    try:
+        return frozenset(
+            StatusCode[name.strip().upper()]
+            for name in status_codes.split(",")
+            if name.strip()
+        )
+    except KeyError as error:
+        raise ValueError("Invalid status code: {}".format(error))
+
+
 def _load_credential_from_file(filepath) -> ChannelCredentials:
     try:
         with open(filepath, "rb") as f:
@@ -144,8 +268,29 @@ class OTLPExporterMixin(
         headers: Headers to send when exporting
         compression: Compression algorithm to be used in channel
         timeout: Backend request timeout in seconds
+        protocol: Transport protocol: grpc (default), http/protobuf or
+            http/json
+        compression_level: Compression level of the OTLP/HTTP requests, from
+            1 to 9
+        spool_directory: Directory of the spool keeping the requests that
+            could not be exported, which are then sent again in the
+            background instead of retrying them in the export calls
+        spool_max_bytes: Maximum size of the spool
+        export_timeout_millis: Maximum duration of an export call, including
+            its retries, defaults to the export timeout of the batch span
+            processor
+        retryable_status_codes: Status codes of the failed exports that are
+            retried
     """
 
+    # name of the subdirectory of the spool directory used by the exporter
+    _spool_name = None
+    # stub of the service taking already serialized requests
+    _encoded_stub = None
+    # path and message class of the OTLP/HTTP requests
+    _http_path = None
+    _request_class = None
+
     def __init__(
         self,
         endpoint: Optional[str] = None,
@@ -154,13 +299,56 @@ class OTLPExporterMixin(
         headers: Optional[str] = None,
         timeout: Optional[int] = None,
         compression: str = None,
+        spool_directory: Optional[str] = None,
+        spool_max_bytes: Optional[int] = None,
+        protocol: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        export_timeout_millis: Optional[float] = None,
+        retryable_status_codes: Optional[Iterable[StatusCode]] = None,
     ):
         super().__init__()
 
+        self._export_timeout = (
+            export_timeout_millis
+            or Configuration().EXPORTER_OTLP_EXPORT_TIMEOUT_MILLIS
+            or Configuration().get(
+                "BSP_EXPORT_TIMEOUT_MILLIS", _DEFAULT_EXPORT_TIMEOUT_MILLIS
+            )
+        ) / 1e3
+
+        if retryable_status_codes is None:
+            retryable_status_codes = (
+                Configuration().EXPORTER_OTLP_RETRYABLE_STATUS_CODES
+            )
+            if retryable_status_codes is None:
+                retryable_status_codes = _RETRYABLE_STATUS_CODES
+            else:
+                retryable_status_codes = _parse_status_codes(
+                    retryable_status_codes
+                )
+        self._retryable_status_codes = frozenset(retryable_status_codes)
+
+        # set on shutdown, to stop exporting
+        self._shutdown_event = threading.Event()
+        # set by cancel_retries and on shutdown, to cancel the waits between
+        # retries
+        self._retries_cancelled = threading.Event()
+
+        protocol = (
+            protocol or Configuration().EXPORTER_OTLP_PROTOCOL or "grpc"
+        )
+        if protocol not in OTLPProtocol._value2member_map_:
+            raise ValueError("Unsupported OTLP protocol: {}".format(protocol))
+        protocol = OTLPProtocol(protocol)
+
         endpoint = (
             endpoint
             or Configuration().EXPORTER_OTLP_ENDPOINT
-            or "localhost:55680"
+            or (
+                "localhost:55680"
+                if protocol is OTLPProtocol.grpc
+                else "localhost:55681"
+            )
         )
 
         if insecure is None:
@@ -174,17 +362,16 @@ class OTLPExporterMixin(
             or Configuration().EXPORTER_OTLP_TIMEOUT
             or 10  # default: 10 seconds
         )
-        self._collector_span_kwargs = None
+        # translated resources, reused between the exports
+        self._resources = {}
 
-        if compression is None:
-            compression_algorithm = Compression.NoCompression
-        elif (
+        if (
             compression in OTLPCompression._value2member_map_
             and OTLPCompression(compression) is OTLPCompression.gzip
         ):
             compression_algorithm = Compression.Gzip
         else:
-            compression_str = Configuration().EXPORTER_OTLP_INSECURE or None
+            compression_str = Configuration().EXPORTER_OTLP_COMPRESSION or None
             if compression_str is None:
                 compression_algorithm = Compression.NoCompression
             elif (
@@ -197,28 +384,76 @@ class OTLPExporterMixin(
                     "OTEL_EXPORTER_OTLP_COMPRESSION environment variable does not match gzip."
                 )
 
-        if insecure:
-            self._client = self._stub(
-                insecure_channel(endpoint, compression=compression_algorithm)
+        channel = None
+
+        if protocol is not OTLPProtocol.grpc:
+            if compression_algorithm is Compression.Gzip:
+                compression_level = (
+                    compression_level
+                    or Configuration().EXPORTER_OTLP_COMPRESSION_LEVEL
+                    or _DEFAULT_COMPRESSION_LEVEL
+                )
+            else:
+                compression_level = None
+            self._client = HTTPExportClient(
+                get_export_url(endpoint, insecure, self._http_path),
+                self._request_class,
+                json_encoding=protocol is OTLPProtocol.http_json,
+                compression_level=compression_level,
+                certificate_file=Configuration().EXPORTER_OTLP_CERTIFICATE,
+            )
+
+        elif insecure:
+            channel = insecure_channel(
+                endpoint, compression=compression_algorithm
             )
-            return
 
         # secure mode
-        if (
-            credentials is None
-            and Configuration().EXPORTER_OTLP_CERTIFICATE is None
-        ):
-            # use the default location chosen by gRPC runtime
-            credentials = ssl_channel_credentials()
         else:
-            credentials = credentials or _load_credential_from_file(
-                Configuration().EXPORTER_OTLP_CERTIFICATE
-            )
-        self._client = self._stub(
-            secure_channel(
+            if (
+                credentials is None
+                and Configuration().EXPORTER_OTLP_CERTIFICATE is None
+            ):
+                # use the default location chosen by gRPC runtime
+                credentials = ssl_channel_credentials()
+            else:
+                credentials = credentials or _load_credential_from_file(
+                    Configuration().EXPORTER_OTLP_CERTIFICATE
+                )
+            channel = secure_channel(
                 endpoint, credentials, compression=compression_algorithm
             )
+
+        if channel is not None:
+            self._client = self._stub(channel)
+
+        spool_directory = (
+            spool_directory or Configuration().EXPORTER_OTLP_SPOOL_DIRECTORY
         )
+        self._spool = None
+
+        if spool_directory:
+            self._spool = Spool(
+                os.path.join(spool_directory, self._spool_name),
+                max_bytes=(
+                    spool_max_bytes
+                    or Configuration().EXPORTER_OTLP_SPOOL_MAX_BYTES
+                    or _DEFAULT_SPOOL_MAX_BYTES
+                ),
+            )
+            # the OTLP/HTTP client also takes serialized requests
+            self._encoded_client = (
+                self._client
+                if channel is None
+                else self._encoded_stub(channel)
+            )
+            # set when requests are spooled, and on shutdown
+            self._spool_event = threading.Event()
+            self._spool_thread = threading.Thread(
+                target=self._send_spooled, daemon=True
+            )
+            # the spool may have requests left by a previous process
+            self._spool_thread.start()
 
     @abstractmethod
     def _translate_data(
@@ -226,7 +461,21 @@ class OTLPExporterMixin(
     ) -> ExportServiceRequestT:
         pass
 
+    def _get_request(self, data: TypingSequence[SDKDataT]) -> Any:
+        """Returns the request passed to the stub to export the data."""
+        return self._translate_data(data)
+
     def _export(self, data: TypingSequence[SDKDataT]) -> ExportResultT:
+        if self._shutdown_event.is_set():
+            logger.warning("Exporter already shutdown, ignoring batch")
+            return self._result.FAILURE
+
+        if self._spool is not None:
+            return self._export_spooled(data)
+
+        deadline = monotonic() + self._export_timeout
+        request = self._get_request(data)
+
         # expo returns a generator that yields delay values which grow
         # exponentially. Once delay is greater than max_value, the yielded
         # value will remain constant.
@@ -240,44 +489,48 @@ class OTLPExporterMixin(
             if delay == max_value:
                 return self._result.FAILURE
 
+            # the waits between the retries may overshoot the deadline
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                logger.warning(
+                    "Export timeout of %ss exceeded, giving up export of "
+                    "batch",
+                    self._export_timeout,
+                )
+                return self._result.FAILURE
+
             try:
                 self._client.Export(
-                    request=self._translate_data(data),
+                    request=request,
                     metadata=self._headers,
-                    timeout=self._timeout,
+                    timeout=min(self._timeout, remaining),
                 )
 
                 return self._result.SUCCESS
 
             except RpcError as error:
 
-                if error.code() in [
-                    StatusCode.CANCELLED,
-                    StatusCode.DEADLINE_EXCEEDED,
-                    StatusCode.PERMISSION_DENIED,
-                    StatusCode.UNAUTHENTICATED,
-                    StatusCode.RESOURCE_EXHAUSTED,
-                    StatusCode.ABORTED,
-                    StatusCode.OUT_OF_RANGE,
-                    StatusCode.UNAVAILABLE,
-                    StatusCode.DATA_LOSS,
-                ]:
-
-                    retry_info_bin = dict(error.trailing_metadata()).get(
-                        "google.rpc.retryinfo-bin"
-                    )
-                    if retry_info_bin is not None:
-                        retry_info = RetryInfo()
-                        retry_info.ParseFromString(retry_info_bin)
-                        delay = (
-                            retry_info.retry_delay.seconds
-                            + retry_info.retry_delay.nanos / 1.0e9
+                if error.code() in self._retryable_status_codes:
+
+                    delay = _get_retry_delay(error, _jitter(delay))
+
+                    if monotonic() + delay >= deadline:
+                        logger.warning(
+                            "Export timeout of %ss exceeded, giving up "
+                            "export of batch",
+                            self._export_timeout,
                         )
+                        return self._result.FAILURE
 
                     logger.debug(
                         "Waiting %ss before retrying export of span", delay
                     )
-                    sleep(delay)
+                    if self._retries_cancelled.wait(delay):
+                        logger.warning(
+                            "Export retries cancelled, giving up export of "
+                            "batch"
+                        )
+                        return self._result.FAILURE
                     continue
 
                 if error.code() == StatusCode.OK:
@@ -287,5 +540,113 @@ class OTLPExporterMixin(
 
         return self._result.FAILURE
 
+    def _export_spooled(
+        self, data: TypingSequence[SDKDataT]
+    ) -> ExportResultT:
+        request = self._get_request(data)
+        if not isinstance(request, bytes):
+            request = request.SerializeToString()
+
+        # the request is only sent right away if there are no spooled
+        # requests, so that the requests are sent in order and that the
+        # export calls do not wait for an unavailable collector
+        if self._spool.empty():
+            try:
+                self._encoded_client.Export(
+                    request=request,
+                    metadata=self._headers,
+                    timeout=self._timeout,
+                )
+                return self._result.SUCCESS
+
+            except RpcError as error:
+                if error.code() not in self._retryable_status_codes:
+                    return self._result.FAILURE
+
+        try:
+            if not self._spool.append(request):
+                return self._result.FAILURE
+        except (OSError, ValueError):
+            logger.exception("Failed to spool export request")
+            return self._result.FAILURE
+
+        self._spool_event.set()
+        return self._result.SUCCESS
+
+    def _send_spooled(self) -> None:
+        """Sends the spooled requests, oldest first, until shutdown."""
+        delays = expo(max_value=_SPOOL_MAX_RETRY_DELAY)
+
+        while not self._shutdown_event.is_set():
+            self._spool_event.clear()
+            # the thread must keep running whatever happens, or the spooled
+            # requests are not sent anymore
+            try:
+                request = self._spool.peek()
+
+                if request is None:
+                    self._spool_event.wait()
+                    continue
+
+                try:
+                    self._encoded_client.Export(
+                        request=request,
+                        metadata=self._headers,
+                        timeout=self._timeout,
+                    )
+
+                except RpcError as error:
+
+                    if error.code() in self._retryable_status_codes:
+                        delay = _get_retry_delay(
+                            error, _jitter(next(delays))
+                        )
+                        logger.debug(
+                            "Waiting %ss before retrying export of spooled "
+                            "data",
+                            delay,
+                        )
+                        self._shutdown_event.wait(delay)
+                        continue
+
+                    logger.error(
+                        "Failed to export spooled data, dropping it: %s",
+                        error.code(),
+                    )
+
+                # pylint: disable=broad-except
+                except Exception:
+                    logger.exception(
+                        "Failed to export spooled data, dropping it"
+                    )
+
+                self._spool.pop()
+                delays = expo(max_value=_SPOOL_MAX_RETRY_DELAY)
+
+            # pylint: disable=broad-except
+            except Exception:
+                logger.exception("Failed to send spooled data")
+                self._shutdown_event.wait(_jitter(next(delays)))
+
+    def cancel_retries(self) -> None:
+        """Cancels the waits between the retries of the exports in progress,
+        and makes all the next exports give up instead of retrying.
+
+        Called when the span processors start shutting down, so that the
+        remaining batches are exported once without waiting for an
+        unavailable collector. The cancellation can't be undone: the
+        exporter doesn't retry anymore, even for other processors sharing
+        it, so it should only be called when the exporter is about to be
+        shut down.
+        """
+        self._retries_cancelled.set()
+
     def shutdown(self) -> None:
-        pass
+        self._retries_cancelled.set()
+        self._shutdown_event.set()
+        if self._spool is not None:
+            self._spool_event.set()
+            self._spool_thread.join()
+            self._spool.close()
+        if isinstance(self._client, HTTPExportClient):
+            self._client.close()
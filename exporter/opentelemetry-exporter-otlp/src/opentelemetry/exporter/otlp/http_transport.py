@@ -0,0 +1,332 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OTLP/HTTP Transport
+
+Sends the OTLP export requests with HTTP/1.1 POST requests, encoded in
+protobuf or in JSON, over persistent connections.
+
+`HTTPExportClient` has the interface of the gRPC service stubs used by
+`OTLPExporterMixin`, and raises the errors of the HTTP responses as
+`grpc.RpcError` with the gRPC status codes of the HTTP status codes, so that
+they are handled like the errors of the gRPC exports. The delay of the
+``Retry-After`` header of the responses is returned as a ``RetryInfo``, like
+the gRPC servers do.
+"""
+
+import gzip
+import http.client
+import json
+import logging
+import socket
+import ssl
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from queue import Empty, Full, LifoQueue
+from time import time
+from typing import Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+from google.protobuf.duration_pb2 import Duration
+from google.protobuf.json_format import MessageToDict
+from google.rpc.error_details_pb2 import RetryInfo
+from grpc import RpcError, StatusCode
+
+logger = logging.getLogger(__name__)
+
+# the gRPC status codes of the HTTP status codes, as mapped by gRPC
+_HTTP_STATUS_CODES = {
+    400: StatusCode.INTERNAL,
+    401: StatusCode.UNAUTHENTICATED,
+    403: StatusCode.PERMISSION_DENIED,
+    404: StatusCode.UNIMPLEMENTED,
+    429: StatusCode.UNAVAILABLE,
+    502: StatusCode.UNAVAILABLE,
+    503: StatusCode.UNAVAILABLE,
+    504: StatusCode.UNAVAILABLE,
+}
+
+# errors of a request sent on a connection closed by the server while it was
+# kept in the pool, the request is then sent again on a new connection
+_CLOSED_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class HTTPExportError(RpcError):
+    """The error of an export request sent over HTTP."""
+
+    def __init__(
+        self,
+        code: StatusCode,
+        details: str,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(details)
+        self._code = code
+        self._details = details
+        self._retry_after = retry_after
+
+    def code(self) -> StatusCode:
+        return self._code
+
+    def details(self) -> str:
+        return self._details
+
+    def trailing_metadata(self) -> Tuple[Tuple[str, bytes], ...]:
+        if self._retry_after is None:
+            return ()
+        seconds = int(self._retry_after)
+        retry_info = RetryInfo(
+            retry_delay=Duration(
+                seconds=seconds,
+                nanos=int((self._retry_after - seconds) * 1e9),
+            )
+        )
+        return (("google.rpc.retryinfo-bin", retry_info.SerializeToString()),)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Returns the delay in seconds of a ``Retry-After`` header, which is
+    either a number of seconds or a date."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning("Invalid Retry-After header: %s", value)
+        return None
+    return max(date.timestamp() - time(), 0.0)
+
+
+def _parse_headers(headers: Any) -> Tuple[Tuple[str, str], ...]:
+    """Returns the headers given as a ``key=value,...`` string, a mapping or
+    a sequence of pairs, like the gRPC metadata."""
+    if not headers:
+        return ()
+    if isinstance(headers, str):
+        return tuple(
+            tuple(header.strip() for header in pair.split("=", 1))
+            for pair in headers.split(",")
+            if "=" in pair
+        )
+    if isinstance(headers, Mapping):
+        return tuple(headers.items())
+    return tuple(headers)
+
+
+def get_export_url(endpoint: str, insecure: bool, path: str) -> str:
+    """Returns the URL of the export requests sent to ``endpoint``.
+
+    The scheme is taken from ``insecure`` when the endpoint has none, and
+    ``path`` is added when the endpoint has no path.
+    """
+    if "://" not in endpoint:
+        endpoint = "{}://{}".format("http" if insecure else "https", endpoint)
+    if urlsplit(endpoint).path in ("", "/"):
+        endpoint = endpoint.rstrip("/") + path
+    return endpoint
+
+
+class _HTTPConnectionPool:
+    """A pool of persistent connections to a server."""
+
+    def __init__(
+        self,
+        host: str,
+        port: Optional[int],
+        ssl_context: Optional[ssl.SSLContext],
+        max_connections: int,
+    ):
+        self._host = host
+        self._port = port
+        self._ssl_context = ssl_context
+        # the most recently used connections are reused first, so that the
+        # connections that are no longer needed are closed by the server
+        self._connections = LifoQueue(max_connections)
+
+    def _create_connection(
+        self, timeout: Optional[float]
+    ) -> http.client.HTTPConnection:
+        if self._ssl_context is not None:
+            return http.client.HTTPSConnection(
+                self._host,
+                self._port,
+                timeout=timeout,
+                context=self._ssl_context,
+            )
+        return http.client.HTTPConnection(
+            self._host, self._port, timeout=timeout
+        )
+
+    def post(
+        self,
+        path: str,
+        body: bytes,
+        headers: dict,
+        timeout: Optional[float],
+    ) -> Tuple[http.client.HTTPResponse, bytes]:
+        """Sends a POST request, returns its response and response body."""
+        try:
+            connection = self._connections.get_nowait()
+            reused = True
+        except Empty:
+            connection = self._create_connection(timeout)
+            reused = False
+
+        while True:
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            try:
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except _CLOSED_CONNECTION_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                connection = self._create_connection(timeout)
+                reused = False
+            except BaseException:
+                connection.close()
+                raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._connections.put_nowait(connection)
+            except Full:
+                connection.close()
+
+        return response, data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except Empty:
+                return
+
+
+class HTTPExportClient:
+    """Sends OTLP export requests over HTTP.
+
+    Args:
+        url: The URL the requests are sent to
+        request_class: The protobuf message class of the requests, used to
+            encode in JSON the requests given already serialized
+        json_encoding: Encode the requests in JSON instead of protobuf
+        compression_level: The gzip compression level of the requests, which
+            are not compressed if None
+        certificate_file: The file of the certificates used to verify the
+            server, the default certificates are used if None
+        max_connections: The maximum number of connections kept open
+    """
+
+    def __init__(
+        self,
+        url: str,
+        request_class: Any,
+        json_encoding: bool = False,
+        compression_level: Optional[int] = None,
+        certificate_file: Optional[str] = None,
+        max_connections: int = 4,
+    ):
+        parsed_url = urlsplit(url)
+        self._path = parsed_url.path
+        if parsed_url.query:
+            self._path += "?" + parsed_url.query
+
+        ssl_context = None
+        if parsed_url.scheme == "https":
+            ssl_context = ssl.create_default_context(cafile=certificate_file)
+
+        self._pool = _HTTPConnectionPool(
+            parsed_url.hostname,
+            parsed_url.port,
+            ssl_context,
+            max_connections,
+        )
+        self._request_class = request_class
+        self._json_encoding = json_encoding
+        self._compression_level = compression_level
+
+        self._headers = {
+            "Content-Type": "application/json"
+            if json_encoding
+            else "application/x-protobuf"
+        }
+        if compression_level is not None:
+            self._headers["Content-Encoding"] = "gzip"
+
+    def _encode(self, request: Any) -> bytes:
+        if self._json_encoding:
+            if isinstance(request, bytes):
+                request = self._request_class.FromString(request)
+            return json.dumps(
+                MessageToDict(request), separators=(",", ":")
+            ).encode("utf-8")
+
+        if isinstance(request, bytes):
+            return request
+        return request.SerializeToString()
+
+    # pylint: disable=invalid-name
+    def Export(
+        self,
+        request: Any,
+        metadata: Any = None,
+        timeout: Optional[float] = None,
+    ) -> bytes:
+        """Sends an export request, given as a protobuf message or already
+        serialized, and returns the body of the response.
+
+        Raises:
+            HTTPExportError: The request failed.
+        """
+        body = self._encode(request)
+        if self._compression_level is not None:
+            body = gzip.compress(body, self._compression_level)
+
+        headers = dict(_parse_headers(metadata))
+        headers.update(self._headers)
+
+        try:
+            response, data = self._pool.post(
+                self._path, body, headers, timeout
+            )
+        except socket.timeout as error:
+            raise HTTPExportError(StatusCode.DEADLINE_EXCEEDED, str(error))
+        except (OSError, http.client.HTTPException) as error:
+            raise HTTPExportError(StatusCode.UNAVAILABLE, str(error))
+
+        if 200 <= response.status < 300:
+            return data
+
+        raise HTTPExportError(
+            _HTTP_STATUS_CODES.get(response.status, StatusCode.UNKNOWN),
+            "HTTP {} {}".format(response.status, response.reason),
+            _parse_retry_after(response.getheader("Retry-After")),
+        )
+
+    def close(self) -> None:
+        self._pool.close()
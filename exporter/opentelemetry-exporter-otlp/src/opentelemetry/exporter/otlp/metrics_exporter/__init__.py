@@ -15,9 +15,9 @@
 """OTLP Metrics Exporter"""
 
 import logging
-from typing import List, Optional, Sequence, Type, TypeVar
+from typing import Iterable, List, Optional, Sequence, Type, TypeVar
 
-from grpc import ChannelCredentials
+from grpc import ChannelCredentials, StatusCode
 
 from opentelemetry.configuration import Configuration
 from opentelemetry.exporter.otlp.exporter import (
@@ -27,6 +27,7 @@ from opentelemetry.exporter.otlp.exporter import (
 )
 from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import (
     ExportMetricsServiceRequest,
+    ExportMetricsServiceResponse,
 )
 from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2_grpc import (
     MetricsServiceStub,
@@ -36,10 +37,14 @@ from opentelemetry.proto.metrics.v1.metrics_pb2 import (
     AggregationTemporality,
     DoubleDataPoint,
     DoubleGauge,
+    DoubleHistogram,
+    DoubleHistogramDataPoint,
     DoubleSum,
     InstrumentationLibraryMetrics,
     IntDataPoint,
     IntGauge,
+    IntHistogram,
+    IntHistogramDataPoint,
     IntSum,
 )
 from opentelemetry.proto.metrics.v1.metrics_pb2 import Metric as OTLPMetric
@@ -58,6 +63,8 @@ from opentelemetry.sdk.metrics.export import (
     MetricsExportResult,
 )
 from opentelemetry.sdk.metrics.export.aggregate import (
+    DDSketchAggregator,
+    ExponentialHistogramAggregator,
     HistogramAggregator,
     LastValueAggregator,
     MinMaxSumCountAggregator,
@@ -67,6 +74,26 @@ from opentelemetry.sdk.metrics.export.aggregate import (
 
 logger = logging.getLogger(__name__)
 DataPointT = TypeVar("DataPointT", IntDataPoint, DoubleDataPoint)
+HistogramDataPointT = TypeVar(
+    "HistogramDataPointT", IntHistogramDataPoint, DoubleHistogramDataPoint
+)
+
+
+def _get_start_time_unix_nano(
+    export_record: ExportRecord, aggregation_temporality: int
+) -> int:
+    if aggregation_temporality == (
+        AggregationTemporality.AGGREGATION_TEMPORALITY_CUMULATIVE
+    ):
+        return export_record.aggregator.first_timestamp
+    return export_record.aggregator.initial_checkpoint_timestamp
+
+
+def _get_labels(export_record: ExportRecord) -> List[StringKeyValue]:
+    return [
+        StringKeyValue(key=str(label_key), value=str(label_value))
+        for label_key, label_value in export_record.labels
+    ]
 
 
 def _get_data_points(
@@ -92,28 +119,58 @@ def _get_data_points(
     elif isinstance(export_record.aggregator, ValueObserverAggregator):
         value = export_record.aggregator.checkpoint.last
 
-    if aggregation_temporality == (
-        AggregationTemporality.AGGREGATION_TEMPORALITY_CUMULATIVE
-    ):
-        start_time_unix_nano = export_record.aggregator.first_timestamp
-    else:
-        start_time_unix_nano = (
-            export_record.aggregator.initial_checkpoint_timestamp
+    return [
+        data_point_class(
+            labels=_get_labels(export_record),
+            value=value,
+            start_time_unix_nano=_get_start_time_unix_nano(
+                export_record, aggregation_temporality
+            ),
+            time_unix_nano=(export_record.aggregator.last_update_timestamp),
         )
+    ]
+
+
+def _get_histogram_data_points(
+    export_record: ExportRecord,
+    data_point_class: Type[HistogramDataPointT],
+    aggregation_temporality: int,
+) -> List[HistogramDataPointT]:
+    # exponential histograms and sketches are exported as the explicit
+    # bounds of their buckets since this version of the protocol has no
+    # exponential histogram nor summary
+    histogram = export_record.aggregator.checkpoint
+    explicit_bounds, bucket_counts = histogram.to_explicit_buckets()
+    histogram_sum = histogram.sum
+    if data_point_class is IntHistogramDataPoint:
+        histogram_sum = int(histogram_sum)
 
     return [
         data_point_class(
-            labels=[
-                StringKeyValue(key=str(label_key), value=str(label_value))
-                for label_key, label_value in export_record.labels
-            ],
-            value=value,
-            start_time_unix_nano=start_time_unix_nano,
+            labels=_get_labels(export_record),
+            count=histogram.count,
+            sum=histogram_sum,
+            bucket_counts=bucket_counts,
+            explicit_bounds=explicit_bounds,
+            start_time_unix_nano=_get_start_time_unix_nano(
+                export_record, aggregation_temporality
+            ),
             time_unix_nano=(export_record.aggregator.last_update_timestamp),
         )
     ]
 
 
+class _EncodedMetricsServiceStub:
+    """Same as `MetricsServiceStub`, but for requests that are already
+    encoded."""
+
+    def __init__(self, channel):
+        self.Export = channel.unary_unary(
+            "/opentelemetry.proto.collector.metrics.v1.MetricsService/Export",
+            response_deserializer=ExportMetricsServiceResponse.FromString,
+        )
+
+
 class OTLPMetricsExporter(
     MetricsExporter,
     OTLPExporterMixin[
@@ -129,10 +186,25 @@ class OTLPMetricsExporter(
         credentials: Credentials object for server authentication
         headers: Headers to send when exporting
         timeout: Backend request timeout in seconds
+        spool_directory: Directory of the spool keeping the metrics that
+            could not be exported
+        spool_max_bytes: Maximum size of the spool
+        protocol: Transport protocol: grpc (default), http/protobuf or
+            http/json
+        compression: Compression algorithm of the requests: gzip or None
+        compression_level: Compression level of the OTLP/HTTP requests
+        export_timeout_millis: Maximum duration of an export call, including
+            its retries
+        retryable_status_codes: Status codes of the failed exports that are
+            retried
     """
 
     _stub = MetricsServiceStub
+    _encoded_stub = _EncodedMetricsServiceStub
     _result = MetricsExportResult
+    _spool_name = "metrics"
+    _http_path = "/v1/metrics"
+    _request_class = ExportMetricsServiceRequest
 
     def __init__(
         self,
@@ -141,6 +213,13 @@ class OTLPMetricsExporter(
         credentials: Optional[ChannelCredentials] = None,
         headers: Optional[str] = None,
         timeout: Optional[int] = None,
+        spool_directory: Optional[str] = None,
+        spool_max_bytes: Optional[int] = None,
+        protocol: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        export_timeout_millis: Optional[float] = None,
+        retryable_status_codes: Optional[Iterable[StatusCode]] = None,
     ):
         if insecure is None:
             insecure = Configuration().EXPORTER_OTLP_METRIC_INSECURE
@@ -163,6 +242,13 @@ class OTLPMetricsExporter(
                 or Configuration().EXPORTER_OTLP_METRIC_HEADERS,
                 "timeout": timeout
                 or Configuration().EXPORTER_OTLP_METRIC_TIMEOUT,
+                "spool_directory": spool_directory,
+                "spool_max_bytes": spool_max_bytes,
+                "protocol": protocol,
+                "compression": compression,
+                "compression_level": compression_level,
+                "export_timeout_millis": export_timeout_millis,
+                "retryable_status_codes": retryable_status_codes,
             }
         )
 
@@ -187,7 +273,9 @@ class OTLPMetricsExporter(
         #   ----------------------------------------------
         #   Counter            Sum(aggregation_temporality=delta;is_monotonic=true)
         #   UpDownCounter      Sum(aggregation_temporality=delta;is_monotonic=false)
-        #   ValueRecorder      TBD
+        #   ValueRecorder      Histogram(aggregation_temporality=cumulative)
+        #                      with an ExponentialHistogramAggregator or a
+        #                      DDSketchAggregator, TBD otherwise
         #   SumObserver        Sum(aggregation_temporality=cumulative;is_monotonic=true)
         #   UpDownSumObserver  Sum(aggregation_temporality=cumulative;is_monotonic=false)
         #   ValueObserver      Gauge()
@@ -204,6 +292,11 @@ class OTLPMetricsExporter(
                 int: {
                     "sum": {"class": IntSum, "argument": "int_sum"},
                     "gauge": {"class": IntGauge, "argument": "int_gauge"},
+                    "histogram": {
+                        "class": IntHistogram,
+                        "argument": "int_histogram",
+                        "data_point_class": IntHistogramDataPoint,
+                    },
                     "data_point_class": IntDataPoint,
                 },
                 float: {
@@ -212,6 +305,11 @@ class OTLPMetricsExporter(
                         "class": DoubleGauge,
                         "argument": "double_gauge",
                     },
+                    "histogram": {
+                        "class": DoubleHistogram,
+                        "argument": "double_histogram",
+                        "data_point_class": DoubleHistogramDataPoint,
+                    },
                     "data_point_class": DoubleDataPoint,
                 },
             }
@@ -257,8 +355,29 @@ class OTLPMetricsExporter(
                 argument = type_class[value_type]["sum"]["argument"]
 
             elif isinstance(export_record.instrument, (ValueRecorder)):
-                logger.warning("Skipping exporting of ValueRecorder metric")
-                continue
+                if not isinstance(
+                    export_record.aggregator,
+                    (DDSketchAggregator, ExponentialHistogramAggregator),
+                ):
+                    logger.warning(
+                        "Skipping exporting of ValueRecorder metric"
+                    )
+                    continue
+
+                aggregation_temporality = (
+                    AggregationTemporality.AGGREGATION_TEMPORALITY_CUMULATIVE
+                )
+                histogram_type = type_class[value_type]["histogram"]
+
+                otlp_metric_data = histogram_type["class"](
+                    data_points=_get_histogram_data_points(
+                        export_record,
+                        histogram_type["data_point_class"],
+                        aggregation_temporality,
+                    ),
+                    aggregation_temporality=aggregation_temporality,
+                )
+                argument = histogram_type["argument"]
 
             elif isinstance(export_record.instrument, SumObserver):
 
@@ -334,12 +453,22 @@ class OTLPMetricsExporter(
 
         return ExportMetricsServiceRequest(
             resource_metrics=_get_resource_data(
-                sdk_resource_instrumentation_library_metrics,
+                {
+                    sdk_resource: [instrumentation_library_metrics]
+                    for (
+                        sdk_resource,
+                        instrumentation_library_metrics,
+                    ) in sdk_resource_instrumentation_library_metrics.items()
+                },
                 ResourceMetrics,
                 "metrics",
+                self._resources,
             )
         )
 
     def export(self, metrics: Sequence[ExportRecord]) -> MetricsExportResult:
         # pylint: disable=arguments-differ
         return self._export(metrics)
+
+    def shutdown(self) -> None:
+        OTLPExporterMixin.shutdown(self)
@@ -0,0 +1,282 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OTLP Export Spool
+
+A persistent queue of encoded export requests, used by the OTLP exporters to
+keep the requests that could not be exported until they can be sent again.
+
+The requests are appended to segment files in the spool directory, each
+record being the length and CRC-32 of a request followed by the request. The
+segments are read through memory maps, oldest first, and the position of the
+next request to send is kept in a cursor file so that the sent requests are
+not sent again after a restart. When the spool is full, its oldest segments
+are deleted.
+"""
+
+import logging
+import mmap
+import os
+import threading
+import zlib
+from collections import deque
+from struct import Struct
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# length and CRC-32 of a record
+_HEADER = Struct("<II")
+
+_SEGMENT_NAME_FORMAT = "{:020d}.segment"
+_SEGMENT_SUFFIX = ".segment"
+_CURSOR_NAME = "cursor"
+
+
+class Spool:
+    """A persistent queue of encoded export requests.
+
+    A spool directory must only be used by one exporter at a time.
+
+    Args:
+        directory: The directory of the segment files, created if needed
+        max_bytes: The maximum size of the segment files, the oldest
+            segments are deleted to keep the spool under this size
+        segment_bytes: The size after which a new segment is started
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        segment_bytes: int = 4 * 1024 * 1024,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._segment_bytes = min(segment_bytes, max_bytes)
+        self._lock = threading.Lock()
+
+        sequences = sorted(
+            int(name[: -len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.endswith(_SEGMENT_SUFFIX)
+            and name[: -len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        self._sequences = deque(sequences)
+        self._sizes = {
+            sequence: os.path.getsize(self._get_path(sequence))
+            for sequence in sequences
+        }
+        self._size = sum(self._sizes.values())
+
+        # position of the next record to read in the oldest segment
+        self._read_offset = 0
+        # position after the record returned by the last call of peek
+        self._next_offset = None
+        self._read_map = None
+
+        read_sequence, read_offset = self._read_cursor()
+        while self._sequences and self._sequences[0] < read_sequence:
+            self._remove_oldest()
+        if self._sequences and self._sequences[0] == read_sequence:
+            self._read_offset = read_offset
+        # remove the segments whose records have all been sent
+        while (
+            self._sequences
+            and self._read_offset >= self._sizes[self._sequences[0]]
+        ):
+            self._remove_oldest()
+
+        # records are always appended to a new segment, so that a record
+        # partially written by a previous process is not followed by others
+        self._write_file = None
+        self._roll()
+
+    def _get_path(self, sequence: int) -> str:
+        return os.path.join(
+            self._directory, _SEGMENT_NAME_FORMAT.format(sequence)
+        )
+
+    def _read_cursor(self):
+        try:
+            with open(os.path.join(self._directory, _CURSOR_NAME)) as file:
+                sequence, offset = file.read().split()
+                return int(sequence), int(offset)
+        except (OSError, ValueError):
+            return -1, 0
+
+    def _write_cursor(self) -> None:
+        path = os.path.join(self._directory, _CURSOR_NAME)
+        with open(path + ".tmp", "w") as file:
+            file.write("{} {}".format(self._sequences[0], self._read_offset))
+        os.replace(path + ".tmp", path)
+
+    def _roll(self) -> None:
+        if self._write_file is not None:
+            self._write_file.close()
+        sequence = self._sequences[-1] + 1 if self._sequences else 0
+        # unbuffered, so that no part of a record that failed to be written
+        # is left in a buffer to be written later
+        self._write_file = open(self._get_path(sequence), "ab", buffering=0)
+        self._sequences.append(sequence)
+        self._sizes[sequence] = 0
+
+    def _remove_oldest(self) -> None:
+        if self._read_map is not None:
+            self._read_map.close()
+            self._read_map = None
+        sequence = self._sequences.popleft()
+        self._size -= self._sizes.pop(sequence)
+        self._read_offset = 0
+        self._next_offset = None
+        try:
+            os.remove(self._get_path(sequence))
+        except OSError as error:
+            logger.warning("Failed to remove spool segment: %s", error)
+
+    def append(self, data: bytes) -> bool:
+        """Appends a request to the spool.
+
+        Returns:
+            False if the request is larger than the spool, True otherwise.
+        """
+        record_size = _HEADER.size + len(data)
+        if record_size > self._max_bytes:
+            logger.warning(
+                "Dropping request of %s bytes larger than the spool",
+                len(data),
+            )
+            return False
+
+        with self._lock:
+            while self._size + record_size > self._max_bytes:
+                if len(self._sequences) == 1:
+                    self._roll()
+                logger.warning(
+                    "Spool is full, dropping its oldest %s bytes",
+                    self._sizes[self._sequences[0]],
+                )
+                self._remove_oldest()
+
+            write_sequence = self._sequences[-1]
+            if (
+                self._sizes[write_sequence]
+                and self._sizes[write_sequence] + record_size
+                > self._segment_bytes
+            ):
+                self._roll()
+                write_sequence = self._sequences[-1]
+
+            try:
+                self._write(_HEADER.pack(len(data), zlib.crc32(data)) + data)
+            except BaseException:
+                self._discard_partial_record(write_sequence)
+                raise
+            self._sizes[write_sequence] += record_size
+            self._size += record_size
+
+        return True
+
+    def _write(self, record: bytes) -> None:
+        view = memoryview(record)
+        while view:
+            view = view[self._write_file.write(view) :]
+
+    def _discard_partial_record(self, sequence: int) -> None:
+        """Removes the part of a record written before an error, so that the
+        next records are not misaligned, or starts a new segment if that
+        fails too. The partial record then ends the previous segment, and is
+        discarded as corrupted when it is read."""
+        try:
+            os.ftruncate(self._write_file.fileno(), self._sizes[sequence])
+        except OSError:
+            self._roll()
+
+    def peek(self) -> Optional[bytes]:
+        """Returns the oldest request of the spool, None if it is empty.
+
+        The request stays in the spool until `pop` is called.
+        """
+        with self._lock:
+            while True:
+                data = self._read_record()
+                if data is not None or len(self._sequences) == 1:
+                    return data
+                # all the records of a segment that is no longer written have
+                # been sent, or the rest of the segment is corrupted
+                self._remove_oldest()
+
+    def _read_record(self) -> Optional[bytes]:
+        sequence = self._sequences[0]
+        size = self._sizes[sequence]
+        offset = self._read_offset
+
+        if offset + _HEADER.size > size:
+            return None
+
+        if self._read_map is None or len(self._read_map) < size:
+            if self._read_map is not None:
+                self._read_map.close()
+            with open(self._get_path(sequence), "rb") as file:
+                self._read_map = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            # the segment may have been truncated by a crash
+            size = self._sizes[sequence] = len(self._read_map)
+            if offset + _HEADER.size > size:
+                return None
+
+        length, checksum = _HEADER.unpack_from(self._read_map, offset)
+        end = offset + _HEADER.size + length
+        data = self._read_map[offset + _HEADER.size : end]
+
+        if end > size or zlib.crc32(data) != checksum:
+            logger.warning(
+                "Discarding corrupted spool segment %s",
+                self._get_path(sequence),
+            )
+            return None
+
+        self._next_offset = end
+        return data
+
+    def pop(self) -> None:
+        """Removes the request returned by the last call of `peek`."""
+        with self._lock:
+            if self._next_offset is None:
+                return
+            self._read_offset = self._next_offset
+            self._next_offset = None
+            if (
+                len(self._sequences) > 1
+                and self._read_offset >= self._sizes[self._sequences[0]]
+            ):
+                self._remove_oldest()
+            self._write_cursor()
+
+    def empty(self) -> bool:
+        """Returns True if the spool has no request to send."""
+        with self._lock:
+            return (
+                len(self._sequences) == 1
+                and self._read_offset >= self._sizes[self._sequences[0]]
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._read_map is not None:
+                self._read_map.close()
+                self._read_map = None
+            self._write_file.close()
@@ -14,9 +14,10 @@
 """OTLP Span Exporter"""
 
 import logging
-from typing import Optional, Sequence
+from typing import Any, Dict, Iterable, Optional, Sequence
 
 from grpc import ChannelCredentials
+from grpc import StatusCode as GRPCStatusCode
 
 from opentelemetry.configuration import Configuration
 from opentelemetry.exporter.otlp.exporter import (
@@ -25,8 +26,10 @@ from opentelemetry.exporter.otlp.exporter import (
     _load_credential_from_file,
     _translate_key_values,
 )
+from opentelemetry.exporter.otlp.trace_exporter.encoder import SpanEncoder
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
     ExportTraceServiceRequest,
+    ExportTraceServiceResponse,
 )
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2_grpc import (
     TraceServiceStub,
@@ -40,10 +43,25 @@ from opentelemetry.proto.trace.v1.trace_pb2 import Span as CollectorSpan
 from opentelemetry.proto.trace.v1.trace_pb2 import Status
 from opentelemetry.sdk.trace import Span as SDKSpan
 from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.sdk.util.instrumentation import InstrumentationInfo
 from opentelemetry.trace.status import StatusCode
 
 logger = logging.getLogger(__name__)
 
+# maximum number of translated instrumentation libraries kept by an exporter
+_MAX_CACHED_INSTRUMENTATION_LIBRARIES = 256
+
+
+class _EncodedTraceServiceStub:
+    """Same as `TraceServiceStub`, but for requests that are already
+    encoded."""
+
+    def __init__(self, channel):
+        self.Export = channel.unary_unary(
+            "/opentelemetry.proto.collector.trace.v1.TraceService/Export",
+            response_deserializer=ExportTraceServiceResponse.FromString,
+        )
+
 
 # pylint: disable=no-member
 class OTLPSpanExporter(
@@ -59,10 +77,27 @@ class OTLPSpanExporter(
         credentials: Credentials object for server authentication
         headers: Headers to send when exporting
         timeout: Backend request timeout in seconds
+        direct_encoding: Encode the requests with a `SpanEncoder` instead of
+            translating the spans to protobuf messages, which is faster
+        spool_directory: Directory of the spool keeping the spans that could
+            not be exported
+        spool_max_bytes: Maximum size of the spool
+        protocol: Transport protocol: grpc (default), http/protobuf or
+            http/json
+        compression: Compression algorithm of the requests: gzip or None
+        compression_level: Compression level of the OTLP/HTTP requests
+        export_timeout_millis: Maximum duration of an export call, including
+            its retries
+        retryable_status_codes: Status codes of the failed exports that are
+            retried
     """
 
     _result = SpanExportResult
     _stub = TraceServiceStub
+    _encoded_stub = _EncodedTraceServiceStub
+    _spool_name = "traces"
+    _http_path = "/v1/traces"
+    _request_class = ExportTraceServiceRequest
 
     def __init__(
         self,
@@ -71,10 +106,29 @@ class OTLPSpanExporter(
         credentials: Optional[ChannelCredentials] = None,
         headers: Optional[str] = None,
         timeout: Optional[int] = None,
+        direct_encoding: Optional[bool] = None,
+        spool_directory: Optional[str] = None,
+        spool_max_bytes: Optional[int] = None,
+        protocol: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        export_timeout_millis: Optional[float] = None,
+        retryable_status_codes: Optional[Iterable[GRPCStatusCode]] = None,
     ):
         if insecure is None:
             insecure = Configuration().EXPORTER_OTLP_SPAN_INSECURE
 
+        if direct_encoding is None:
+            direct_encoding = (
+                Configuration().EXPORTER_OTLP_SPAN_DIRECT_ENCODING
+            )
+        self._encoder = None
+        # translated instrumentation libraries, reused between the exports
+        self._instrumentation_libraries = {}
+        if direct_encoding:
+            self._encoder = SpanEncoder()
+            self._stub = _EncodedTraceServiceStub
+
         if (
             not insecure
             and Configuration().EXPORTER_OTLP_SPAN_CERTIFICATE is not None
@@ -93,62 +147,85 @@ class OTLPSpanExporter(
                 or Configuration().EXPORTER_OTLP_SPAN_HEADERS,
                 "timeout": timeout
                 or Configuration().EXPORTER_OTLP_SPAN_TIMEOUT,
+                "spool_directory": spool_directory,
+                "spool_max_bytes": spool_max_bytes,
+                "protocol": protocol,
+                "compression": compression,
+                "compression_level": compression_level,
+                "export_timeout_millis": export_timeout_millis,
+                "retryable_status_codes": retryable_status_codes,
             }
         )
 
-    def _translate_name(self, sdk_span: SDKSpan) -> None:
-        self._collector_span_kwargs["name"] = sdk_span.name
-
-    def _translate_start_time(self, sdk_span: SDKSpan) -> None:
-        self._collector_span_kwargs[
-            "start_time_unix_nano"
-        ] = sdk_span.start_time
-
-    def _translate_end_time(self, sdk_span: SDKSpan) -> None:
-        self._collector_span_kwargs["end_time_unix_nano"] = sdk_span.end_time
-
-    def _translate_span_id(self, sdk_span: SDKSpan) -> None:
-        self._collector_span_kwargs[
+    def _translate_name(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
+        collector_span_kwargs["name"] = sdk_span.name
+
+    def _translate_start_time(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
+        collector_span_kwargs["start_time_unix_nano"] = sdk_span.start_time
+
+    def _translate_end_time(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
+        collector_span_kwargs["end_time_unix_nano"] = sdk_span.end_time
+
+    def _translate_span_id(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
+        collector_span_kwargs[
             "span_id"
         ] = sdk_span.context.span_id.to_bytes(8, "big")
 
-    def _translate_trace_id(self, sdk_span: SDKSpan) -> None:
-        self._collector_span_kwargs[
+    def _translate_trace_id(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
+        collector_span_kwargs[
             "trace_id"
         ] = sdk_span.context.trace_id.to_bytes(16, "big")
 
-    def _translate_parent(self, sdk_span: SDKSpan) -> None:
+    def _translate_parent(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.parent is not None:
-            self._collector_span_kwargs[
+            collector_span_kwargs[
                 "parent_span_id"
             ] = sdk_span.parent.span_id.to_bytes(8, "big")
 
-    def _translate_context_trace_state(self, sdk_span: SDKSpan) -> None:
+    def _translate_context_trace_state(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.context.trace_state is not None:
-            self._collector_span_kwargs["trace_state"] = ",".join(
+            collector_span_kwargs["trace_state"] = ",".join(
                 [
                     "{}={}".format(key, value)
                     for key, value in (sdk_span.context.trace_state.items())
                 ]
             )
 
-    def _translate_attributes(self, sdk_span: SDKSpan) -> None:
+    def _translate_attributes(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.attributes:
 
-            self._collector_span_kwargs["attributes"] = []
+            collector_span_kwargs["attributes"] = []
 
             for key, value in sdk_span.attributes.items():
 
                 try:
-                    self._collector_span_kwargs["attributes"].append(
+                    collector_span_kwargs["attributes"].append(
                         _translate_key_values(key, value)
                     )
                 except Exception as error:  # pylint: disable=broad-except
                     logger.exception(error)
 
-    def _translate_events(self, sdk_span: SDKSpan) -> None:
+    def _translate_events(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.events:
-            self._collector_span_kwargs["events"] = []
+            collector_span_kwargs["events"] = []
 
             for sdk_span_event in sdk_span.events:
 
@@ -166,13 +243,15 @@ class OTLPSpanExporter(
                     except Exception as error:
                         logger.exception(error)
 
-                self._collector_span_kwargs["events"].append(
+                collector_span_kwargs["events"].append(
                     collector_span_event
                 )
 
-    def _translate_links(self, sdk_span: SDKSpan) -> None:
+    def _translate_links(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.links:
-            self._collector_span_kwargs["links"] = []
+            collector_span_kwargs["links"] = []
 
             for sdk_span_link in sdk_span.links:
 
@@ -183,7 +262,8 @@ class OTLPSpanExporter(
                     span_id=(sdk_span_link.context.span_id.to_bytes(8, "big")),
                 )
 
-                for key, value in sdk_span_link.attributes.items():
+                # links may have no attributes
+                for key, value in (sdk_span_link.attributes or {}).items():
                     try:
                         collector_span_link.attributes.append(
                             _translate_key_values(key, value)
@@ -192,79 +272,130 @@ class OTLPSpanExporter(
                     except Exception as error:
                         logger.exception(error)
 
-                self._collector_span_kwargs["links"].append(
+                collector_span_kwargs["links"].append(
                     collector_span_link
                 )
 
-    def _translate_status(self, sdk_span: SDKSpan) -> None:
+    def _translate_status(
+        self, sdk_span: SDKSpan, collector_span_kwargs: Dict[str, Any]
+    ) -> None:
         if sdk_span.status is not None:
             # TODO: Update this when the proto definitions are updated to include UNSET and ERROR
             proto_status_code = Status.STATUS_CODE_OK
             if sdk_span.status.status_code is StatusCode.ERROR:
                 proto_status_code = Status.STATUS_CODE_UNKNOWN_ERROR
-            self._collector_span_kwargs["status"] = Status(
+            collector_span_kwargs["status"] = Status(
                 code=proto_status_code, message=sdk_span.status.description,
             )
 
     def _translate_data(
         self, data: Sequence[SDKSpan]
     ) -> ExportTraceServiceRequest:
-        # pylint: disable=attribute-defined-outside-init
-
-        sdk_resource_instrumentation_library_spans = {}
+        # resource -> instrumentation info -> InstrumentationLibrarySpans
+        resource_library_spans = {}
+        # the same as above, keyed by resource identity as hashing resources
+        # is slow and the spans of a batch usually share a few resources
+        library_spans_by_resource_id = {}
 
         for sdk_span in data:
 
-            if sdk_span.resource not in (
-                sdk_resource_instrumentation_library_spans.keys()
-            ):
-                if sdk_span.instrumentation_info is not None:
-                    instrumentation_library_spans = InstrumentationLibrarySpans(
-                        instrumentation_library=InstrumentationLibrary(
-                            name=sdk_span.instrumentation_info.name,
-                            version=sdk_span.instrumentation_info.version,
-                        )
-                    )
-
-                else:
-                    instrumentation_library_spans = (
-                        InstrumentationLibrarySpans()
-                    )
+            library_spans = library_spans_by_resource_id.get(
+                id(sdk_span.resource)
+            )
+            if library_spans is None:
+                library_spans = resource_library_spans.setdefault(
+                    sdk_span.resource, {}
+                )
+                library_spans_by_resource_id[
+                    id(sdk_span.resource)
+                ] = library_spans
+
+            instrumentation_info = sdk_span.instrumentation_info
+            collector_library_spans = library_spans.get(instrumentation_info)
+            if collector_library_spans is None:
+                collector_library_spans = self._get_library_spans(
+                    instrumentation_info
+                )
+                library_spans[instrumentation_info] = collector_library_spans
+
+            # local, as export may be called concurrently
+            collector_span_kwargs = {}
+
+            self._translate_name(sdk_span, collector_span_kwargs)
+            self._translate_start_time(sdk_span, collector_span_kwargs)
+            self._translate_end_time(sdk_span, collector_span_kwargs)
+            self._translate_span_id(sdk_span, collector_span_kwargs)
+            self._translate_trace_id(sdk_span, collector_span_kwargs)
+            self._translate_parent(sdk_span, collector_span_kwargs)
+            self._translate_context_trace_state(
+                sdk_span, collector_span_kwargs
+            )
+            self._translate_attributes(sdk_span, collector_span_kwargs)
+            self._translate_events(sdk_span, collector_span_kwargs)
+            self._translate_links(sdk_span, collector_span_kwargs)
+            self._translate_status(sdk_span, collector_span_kwargs)
 
-                sdk_resource_instrumentation_library_spans[
-                    sdk_span.resource
-                ] = instrumentation_library_spans
-
-            self._collector_span_kwargs = {}
-
-            self._translate_name(sdk_span)
-            self._translate_start_time(sdk_span)
-            self._translate_end_time(sdk_span)
-            self._translate_span_id(sdk_span)
-            self._translate_trace_id(sdk_span)
-            self._translate_parent(sdk_span)
-            self._translate_context_trace_state(sdk_span)
-            self._translate_attributes(sdk_span)
-            self._translate_events(sdk_span)
-            self._translate_links(sdk_span)
-            self._translate_status(sdk_span)
-
-            self._collector_span_kwargs["kind"] = getattr(
+            collector_span_kwargs["kind"] = getattr(
                 CollectorSpan.SpanKind,
                 "SPAN_KIND_{}".format(sdk_span.kind.name),
             )
 
-            sdk_resource_instrumentation_library_spans[
-                sdk_span.resource
-            ].spans.append(CollectorSpan(**self._collector_span_kwargs))
+            collector_library_spans.spans.append(
+                CollectorSpan(**collector_span_kwargs)
+            )
 
         return ExportTraceServiceRequest(
             resource_spans=_get_resource_data(
-                sdk_resource_instrumentation_library_spans,
+                {
+                    sdk_resource: list(library_spans.values())
+                    for (
+                        sdk_resource,
+                        library_spans,
+                    ) in resource_library_spans.items()
+                },
                 ResourceSpans,
                 "spans",
+                self._resources,
             )
         )
 
+    def _get_library_spans(
+        self, instrumentation_info: Optional[InstrumentationInfo]
+    ) -> InstrumentationLibrarySpans:
+        if instrumentation_info is None:
+            return InstrumentationLibrarySpans()
+
+        instrumentation_library = self._instrumentation_libraries.get(
+            instrumentation_info
+        )
+        if instrumentation_library is None:
+            instrumentation_library = InstrumentationLibrary(
+                name=instrumentation_info.name,
+                version=instrumentation_info.version,
+            )
+            if (
+                len(self._instrumentation_libraries)
+                >= _MAX_CACHED_INSTRUMENTATION_LIBRARIES
+            ):
+                self._instrumentation_libraries.clear()
+            self._instrumentation_libraries[
+                instrumentation_info
+            ] = instrumentation_library
+
+        return InstrumentationLibrarySpans(
+            instrumentation_library=instrumentation_library
+        )
+
+    def _get_request(self, data: Sequence[SDKSpan]) -> Any:
+        if self._encoder is not None:
+            return self._encoder.encode(data)
+        return self._translate_data(data)
+
     def export(self, spans: Sequence[SDKSpan]) -> SpanExportResult:
         return self._export(spans)
+
+    def shutdown(self) -> None:
+        OTLPExporterMixin.shutdown(self)
+
+    def cancel_retries(self) -> None:
+        OTLPExporterMixin.cancel_retries(self)
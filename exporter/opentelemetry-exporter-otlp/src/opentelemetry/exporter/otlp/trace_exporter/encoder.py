@@ -0,0 +1,343 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OTLP Span Encoder
+
+Encodes ``ExportTraceServiceRequest`` messages from SDK spans by writing the
+protobuf wire format directly, without creating the protobuf message objects
+of the request. The encoded requests are the same bytes as the serialization
+of the requests translated by `OTLPSpanExporter`.
+"""
+
+import logging
+import threading
+from collections.abc import Mapping, Sequence
+from struct import Struct
+from typing import Any, Optional
+from typing import Sequence as TypingSequence
+from typing import Text
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Span as SDKSpan
+from opentelemetry.sdk.util.instrumentation import InstrumentationInfo
+from opentelemetry.trace import SpanKind
+from opentelemetry.trace.status import StatusCode
+
+logger = logging.getLogger(__name__)
+
+_FIXED64 = Struct("<Q")
+_DOUBLE = Struct("<d")
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+_UINT64_MASK = 2 ** 64 - 1
+
+# values of the opentelemetry.proto.trace.v1.Span.SpanKind enum
+_SPAN_KINDS = {
+    SpanKind.INTERNAL: 1,
+    SpanKind.SERVER: 2,
+    SpanKind.CLIENT: 3,
+    SpanKind.PRODUCER: 4,
+    SpanKind.CONSUMER: 5,
+}
+
+# value of STATUS_CODE_UNKNOWN_ERROR in opentelemetry.proto.trace.v1.Status
+_STATUS_CODE_UNKNOWN_ERROR = 2
+
+# types of the attribute values whose encoded key values are cached, floats
+# are not as -0.0 == 0.0 and nan != nan
+_CACHED_TYPES = (str, bool, int)
+
+# maximum numbers of encoded resources and instrumentation libraries kept
+_MAX_CACHED_RESOURCES = 64
+_MAX_CACHED_LIBRARIES = 256
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _varint_size(value: int) -> int:
+    return (value.bit_length() + 6) // 7 or 1
+
+
+def _write_length_delimited(buffer: bytearray, tag: int, data: bytes) -> None:
+    # all the field numbers are small enough for their tag to be one byte
+    buffer.append(tag)
+    _write_varint(buffer, len(data))
+    buffer += data
+
+
+def _write_string(buffer: bytearray, tag: int, text: Text) -> None:
+    _write_length_delimited(buffer, tag, text.encode("utf-8"))
+
+
+def _encode_any_value(value: Any) -> bytearray:
+    """Encodes an ``AnyValue`` like ``_translate_key_values``."""
+    buffer = bytearray()
+
+    if isinstance(value, bool):
+        buffer += b"\x10\x01" if value else b"\x10\x00"
+
+    elif isinstance(value, str):
+        _write_string(buffer, 0x0A, value)
+
+    elif isinstance(value, int):
+        if not _INT64_MIN <= value <= _INT64_MAX:
+            raise ValueError("Value out of range: {}".format(value))
+        buffer.append(0x18)
+        _write_varint(buffer, value & _UINT64_MASK)
+
+    elif isinstance(value, float):
+        buffer.append(0x21)
+        buffer += _DOUBLE.pack(value)
+
+    elif isinstance(value, Sequence):
+        array_value = bytearray()
+        for element in value:
+            _write_length_delimited(
+                array_value, 0x0A, _encode_any_value(element)
+            )
+        _write_length_delimited(buffer, 0x2A, array_value)
+
+    elif isinstance(value, Mapping):
+        kvlist_value = bytearray()
+        for key, element in value.items():
+            _write_length_delimited(
+                kvlist_value, 0x0A, _encode_key_value(key, element)
+            )
+        _write_length_delimited(buffer, 0x32, kvlist_value)
+
+    else:
+        raise Exception(
+            "Invalid type {} of value {}".format(type(value), value)
+        )
+
+    return buffer
+
+
+def _encode_key_value(key: Text, value: Any) -> bytes:
+    buffer = bytearray()
+    _write_string(buffer, 0x0A, key)
+    _write_length_delimited(buffer, 0x12, _encode_any_value(value))
+    return bytes(buffer)
+
+
+class SpanEncoder:
+    """Encodes ``ExportTraceServiceRequest`` messages from SDK spans.
+
+    The encoded key values of the attributes with string, boolean and integer
+    values are cached, as the same attributes are usually found on many
+    spans, as well as the encoded resources and instrumentation libraries.
+
+    Args:
+        max_cached_key_values: The maximum number of encoded key values kept
+            in the cache, which is emptied when it is full.
+    """
+
+    def __init__(self, max_cached_key_values: int = 4096):
+        self._max_cached_key_values = max_cached_key_values
+        self._key_values = {}
+        # encoded resource and instrumentation library fields
+        self._resources = {}
+        self._libraries = {}
+        # encoding buffers reused by the calls of each thread
+        self._buffers = threading.local()
+
+    def encode(self, spans: TypingSequence[SDKSpan]) -> bytes:
+        """Returns the encoded ``ExportTraceServiceRequest`` of the spans."""
+        buffers = self._buffers
+        try:
+            request = buffers.request
+            span_buffer = buffers.span
+        except AttributeError:
+            request = buffers.request = bytearray()
+            span_buffer = buffers.span = bytearray()
+
+        # resource -> instrumentation info -> encoded spans
+        resource_library_spans = {}
+        # the same as above, keyed by resource identity as hashing resources
+        # is slow and the spans of a batch usually share a few resources
+        library_spans_by_resource_id = {}
+
+        for span in spans:
+            library_spans = library_spans_by_resource_id.get(id(span.resource))
+            if library_spans is None:
+                library_spans = resource_library_spans.setdefault(
+                    span.resource, {}
+                )
+                library_spans_by_resource_id[id(span.resource)] = library_spans
+
+            encoded_spans = library_spans.get(span.instrumentation_info)
+            if encoded_spans is None:
+                encoded_spans = bytearray()
+                library_spans[span.instrumentation_info] = encoded_spans
+
+            del span_buffer[:]
+            self._write_span(span_buffer, span)
+            _write_length_delimited(encoded_spans, 0x12, span_buffer)
+
+        del request[:]
+        for resource, library_spans in resource_library_spans.items():
+            resource_field = self._get_resource_field(resource)
+
+            # the sizes are computed first so that the spans are only copied
+            # once, into the request
+            resource_spans_size = len(resource_field)
+            library_spans_fields = []
+            for instrumentation_info, encoded_spans in library_spans.items():
+                library_field = self._get_library_field(instrumentation_info)
+                size = len(library_field) + len(encoded_spans)
+                resource_spans_size += 1 + _varint_size(size) + size
+                library_spans_fields.append(
+                    (library_field, encoded_spans, size)
+                )
+
+            request.append(0x0A)
+            _write_varint(request, resource_spans_size)
+            request += resource_field
+            for library_field, encoded_spans, size in library_spans_fields:
+                request.append(0x12)
+                _write_varint(request, size)
+                request += library_field
+                request += encoded_spans
+
+        return bytes(request)
+
+    def _get_resource_field(self, resource: Resource) -> bytes:
+        """Returns the encoded ``resource`` field of a ``ResourceSpans``."""
+        resource_field = self._resources.get(resource)
+        if resource_field is None:
+            resource_buffer = bytearray()
+            self._write_attributes(resource_buffer, 0x0A, resource.attributes)
+            field_buffer = bytearray()
+            _write_length_delimited(field_buffer, 0x0A, resource_buffer)
+            resource_field = bytes(field_buffer)
+            if len(self._resources) >= _MAX_CACHED_RESOURCES:
+                self._resources.clear()
+            self._resources[resource] = resource_field
+        return resource_field
+
+    def _get_library_field(
+        self, instrumentation_info: Optional[InstrumentationInfo]
+    ) -> bytes:
+        """Returns the encoded ``instrumentation_library`` field of an
+        ``InstrumentationLibrarySpans``."""
+        if instrumentation_info is None:
+            return b""
+        library_field = self._libraries.get(instrumentation_info)
+        if library_field is None:
+            library = bytearray()
+            if instrumentation_info.name:
+                _write_string(library, 0x0A, instrumentation_info.name)
+            if instrumentation_info.version:
+                _write_string(library, 0x12, instrumentation_info.version)
+            field_buffer = bytearray()
+            _write_length_delimited(field_buffer, 0x0A, library)
+            library_field = bytes(field_buffer)
+            if len(self._libraries) >= _MAX_CACHED_LIBRARIES:
+                self._libraries.clear()
+            self._libraries[instrumentation_info] = library_field
+        return library_field
+
+    def _write_attributes(
+        self, buffer: bytearray, tag: int, attributes: Any
+    ) -> None:
+        if not attributes:
+            return
+        cache = self._key_values
+        for key, value in attributes.items():
+            try:
+                if value.__class__ in _CACHED_TYPES:
+                    cache_key = (key, value.__class__, value)
+                    key_value = cache.get(cache_key)
+                    if key_value is None:
+                        key_value = _encode_key_value(key, value)
+                        if len(cache) >= self._max_cached_key_values:
+                            cache.clear()
+                        cache[cache_key] = key_value
+                else:
+                    key_value = _encode_key_value(key, value)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.exception(error)
+                continue
+            _write_length_delimited(buffer, tag, key_value)
+
+    def _write_span(self, buffer: bytearray, span: SDKSpan) -> None:
+        # fields are written in the order of their numbers, and fields with
+        # default values are omitted, like protobuf does
+        context = span.context
+        buffer += b"\x0a\x10"
+        buffer += context.trace_id.to_bytes(16, "big")
+        buffer += b"\x12\x08"
+        buffer += context.span_id.to_bytes(8, "big")
+
+        if context.trace_state is not None:
+            trace_state = ",".join(
+                [
+                    "{}={}".format(key, value)
+                    for key, value in context.trace_state.items()
+                ]
+            )
+            if trace_state:
+                _write_string(buffer, 0x1A, trace_state)
+
+        if span.parent is not None:
+            buffer += b"\x22\x08"
+            buffer += span.parent.span_id.to_bytes(8, "big")
+
+        if span.name:
+            _write_string(buffer, 0x2A, span.name)
+
+        buffer.append(0x30)
+        _write_varint(buffer, _SPAN_KINDS[span.kind])
+
+        if span.start_time:
+            buffer.append(0x39)
+            buffer += _FIXED64.pack(span.start_time)
+        if span.end_time:
+            buffer.append(0x41)
+            buffer += _FIXED64.pack(span.end_time)
+
+        self._write_attributes(buffer, 0x4A, span.attributes)
+
+        for event in span.events:
+            event_buffer = bytearray()
+            if event.timestamp:
+                event_buffer.append(0x09)
+                event_buffer += _FIXED64.pack(event.timestamp)
+            if event.name:
+                _write_string(event_buffer, 0x12, event.name)
+            self._write_attributes(event_buffer, 0x1A, event.attributes)
+            _write_length_delimited(buffer, 0x5A, event_buffer)
+
+        for link in span.links:
+            link_buffer = bytearray(b"\x0a\x10")
+            link_buffer += link.context.trace_id.to_bytes(16, "big")
+            link_buffer += b"\x12\x08"
+            link_buffer += link.context.span_id.to_bytes(8, "big")
+            self._write_attributes(link_buffer, 0x22, link.attributes)
+            _write_length_delimited(buffer, 0x6A, link_buffer)
+
+        if span.status is not None:
+            status_buffer = bytearray()
+            if span.status.status_code is StatusCode.ERROR:
+                status_buffer.append(0x08)
+                status_buffer.append(_STATUS_CODE_UNKNOWN_ERROR)
+            if span.status.description:
+                _write_string(status_buffer, 0x12, span.status.description)
+            _write_length_delimited(buffer, 0x7A, status_buffer)
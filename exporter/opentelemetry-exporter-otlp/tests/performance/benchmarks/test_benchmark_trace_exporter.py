@@ -0,0 +1,58 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from opentelemetry.exporter.otlp.trace_exporter import OTLPSpanExporter
+from opentelemetry.exporter.otlp.trace_exporter.encoder import SpanEncoder
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+
+NUM_SPANS = 512
+
+
+def _create_spans():
+    tracer = TracerProvider(
+        resource=Resource({"service.name": "benchmark"})
+    ).get_tracer(__name__, "1.0")
+    spans = []
+    for index in range(NUM_SPANS):
+        span = tracer.start_span(
+            "benchmark",
+            attributes={
+                "http.method": "GET",
+                "http.url": "https://example.com/",
+                "http.status_code": 200,
+                "index": index,
+            },
+        )
+        span.add_event("event", {"event.attribute": 1.5})
+        span.end()
+        spans.append(span)
+    return spans
+
+
+def test_translate_spans(benchmark):
+    exporter = OTLPSpanExporter(insecure=True)
+    spans = _create_spans()
+
+    def _translate():
+        # pylint: disable=protected-access
+        return exporter._translate_data(spans).SerializeToString()
+
+    benchmark(_translate)
+
+
+def test_encode_spans(benchmark):
+    encoder = SpanEncoder()
+    spans = _create_spans()
+    benchmark(encoder.encode, spans)
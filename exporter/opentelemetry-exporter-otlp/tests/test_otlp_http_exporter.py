@@ -0,0 +1,271 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socket import socket
+from socketserver import ThreadingMixIn
+from threading import Thread
+from time import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from google.protobuf.json_format import MessageToDict
+
+from opentelemetry.configuration import Configuration
+from opentelemetry.exporter.otlp.http_transport import (
+    _parse_retry_after,
+    get_export_url,
+)
+from opentelemetry.exporter.otlp.metrics_exporter import OTLPMetricsExporter
+from opentelemetry.exporter.otlp.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.metrics.export import MetricsExportResult
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # pylint: disable=invalid-name
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            (self.path, self.headers, body, self.client_address)
+        )
+
+        status, headers = (
+            self.server.responses.pop(0)
+            if self.server.responses
+            else (200, {})
+        )
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class CollectorServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("localhost", 0), CollectorHandler)
+        self.requests = []
+        # status and headers of the next responses
+        self.responses = []
+
+
+class TestOTLPHTTPExporter(TestCase):
+    def setUp(self):
+        self.server = CollectorServer()
+        self.server_thread = Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        self.server_thread.start()
+        self.endpoint = "localhost:{}".format(self.server.server_address[1])
+
+        tracer = TracerProvider(
+            resource=Resource({"service.name": "http"})
+        ).get_tracer(__name__)
+        self.span = tracer.start_span("span", attributes={"a": 1})
+        self.span.end()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server_thread.join()
+
+    def create_exporter(self, **kwargs):
+        exporter = OTLPSpanExporter(
+            endpoint=self.endpoint, insecure=True, **kwargs
+        )
+        self.addCleanup(exporter.shutdown)
+        return exporter
+
+    def test_export_protobuf(self):
+        exporter = self.create_exporter(protocol="http/protobuf")
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.SUCCESS
+        )
+
+        path, headers, body, _ = self.server.requests[0]
+        self.assertEqual(path, "/v1/traces")
+        self.assertEqual(headers["Content-Type"], "application/x-protobuf")
+        self.assertIsNone(headers["Content-Encoding"])
+        # pylint: disable=protected-access
+        self.assertEqual(
+            body, exporter._translate_data([self.span]).SerializeToString()
+        )
+
+    def test_export_json(self):
+        exporter = self.create_exporter(
+            protocol="http/json", direct_encoding=True
+        )
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.SUCCESS
+        )
+
+        _, headers, body, _ = self.server.requests[0]
+        self.assertEqual(headers["Content-Type"], "application/json")
+        # pylint: disable=protected-access
+        self.assertEqual(
+            json.loads(body.decode("utf-8")),
+            MessageToDict(exporter._translate_data([self.span])),
+        )
+
+    def test_export_gzip(self):
+        exporter = self.create_exporter(
+            protocol="http/protobuf", compression="gzip", compression_level=1
+        )
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.SUCCESS
+        )
+
+        _, headers, body, _ = self.server.requests[0]
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        # pylint: disable=protected-access
+        self.assertEqual(
+            gzip.decompress(body),
+            exporter._translate_data([self.span]).SerializeToString(),
+        )
+
+    @patch.dict(
+        "os.environ",
+        {
+            "OTEL_EXPORTER_OTLP_COMPRESSION": "gzip",
+            "OTEL_EXPORTER_OTLP_COMPRESSION_LEVEL": "1",
+        },
+    )
+    def test_export_gzip_env_variables(self):
+        # pylint: disable=protected-access
+        Configuration._reset()
+        self.addCleanup(Configuration._reset)
+        exporter = self.create_exporter(protocol="http/protobuf")
+        self.assertEqual(exporter._client._compression_level, 1)
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.SUCCESS
+        )
+
+        _, headers, body, _ = self.server.requests[0]
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(body),
+            exporter._translate_data([self.span]).SerializeToString(),
+        )
+
+    def test_export_headers(self):
+        exporter = self.create_exporter(
+            protocol="http/protobuf", headers="api-key=secret, tenant=a=b"
+        )
+        exporter.export([self.span])
+
+        _, headers, _, _ = self.server.requests[0]
+        self.assertEqual(headers["api-key"], "secret")
+        self.assertEqual(headers["tenant"], "a=b")
+
+    def test_persistent_connection(self):
+        exporter = self.create_exporter(protocol="http/protobuf")
+        for _ in range(3):
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.SUCCESS
+            )
+
+        self.assertEqual(
+            len({request[3] for request in self.server.requests}), 1
+        )
+
+    def test_retry_after(self):
+        self.server.responses = [
+            (429, {"Retry-After": "3"}),
+            (503, {}),
+        ]
+        exporter = self.create_exporter(protocol="http/protobuf")
+        # pylint: disable=protected-access
+        with patch.object(
+            exporter._retries_cancelled, "wait", return_value=False
+        ) as mock_wait:
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.SUCCESS
+            )
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(mock_wait.call_args_list[0][0], (3,))
+
+    def test_failure(self):
+        self.server.responses = [(400, {})]
+        exporter = self.create_exporter(protocol="http/protobuf")
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.FAILURE
+        )
+        self.assertEqual(len(self.server.requests), 1)
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_unavailable(self, mock_expo):
+        mock_expo.configure_mock(**{"return_value": [1]})
+        # a port nothing listens on
+        with socket() as unused_socket:
+            unused_socket.bind(("localhost", 0))
+            self.endpoint = "localhost:{}".format(
+                unused_socket.getsockname()[1]
+            )
+        exporter = self.create_exporter(protocol="http/protobuf")
+        # pylint: disable=protected-access
+        with patch.object(
+            exporter._retries_cancelled, "wait", return_value=False
+        ) as mock_wait:
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.FAILURE
+            )
+        mock_wait.assert_called_once()
+
+    def test_export_metrics(self):
+        exporter = OTLPMetricsExporter(
+            endpoint=self.endpoint, insecure=True, protocol="http/protobuf"
+        )
+        self.addCleanup(exporter.shutdown)
+        self.assertEqual(exporter.export([]), MetricsExportResult.SUCCESS)
+        self.assertEqual(self.server.requests[0][0], "/v1/metrics")
+
+    def test_invalid_protocol(self):
+        with self.assertRaises(ValueError):
+            OTLPSpanExporter(protocol="http/xml")
+
+    def test_get_export_url(self):
+        for endpoint, insecure, url in [
+            ("localhost:55681", True, "http://localhost:55681/v1/traces"),
+            ("localhost:55681", False, "https://localhost:55681/v1/traces"),
+            ("http://collector/", False, "http://collector/v1/traces"),
+            ("https://collector/otlp", True, "https://collector/otlp"),
+        ]:
+            self.assertEqual(
+                get_export_url(endpoint, insecure, "/v1/traces"), url
+            )
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(_parse_retry_after(None))
+        self.assertEqual(_parse_retry_after("2.5"), 2.5)
+        self.assertEqual(_parse_retry_after("-1"), 0.0)
+        self.assertAlmostEqual(
+            _parse_retry_after(formatdate(time() + 60, usegmt=True)),
+            60,
+            delta=2,
+        )
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(_parse_retry_after("later"))
@@ -32,6 +32,8 @@ from opentelemetry.proto.common.v1.common_pb2 import (
 )
 from opentelemetry.proto.metrics.v1.metrics_pb2 import (
     AggregationTemporality,
+    DoubleHistogram,
+    DoubleHistogramDataPoint,
     InstrumentationLibraryMetrics,
     IntDataPoint,
     IntSum,
@@ -47,9 +49,14 @@ from opentelemetry.sdk.metrics import (
     SumObserver,
     UpDownCounter,
     UpDownSumObserver,
+    ValueRecorder,
 )
 from opentelemetry.sdk.metrics.export import ExportRecord
-from opentelemetry.sdk.metrics.export.aggregate import SumAggregator
+from opentelemetry.sdk.metrics.export.aggregate import (
+    DDSketchAggregator,
+    ExponentialHistogramAggregator,
+    SumAggregator,
+)
 from opentelemetry.sdk.resources import Resource as SDKResource
 
 THIS_DIR = os.path.dirname(__file__)
@@ -365,3 +372,113 @@ class TestOTLPMetricExporter(TestCase):
         actual = self.exporter._translate_data([counter_export_record])
 
         self.assertEqual(expected, actual)
+
+    @patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_translate_exponential_histogram_export_record(
+        self, mock_time_ns
+    ):
+        mock_time_ns.configure_mock(**{"return_value": 1})
+        recorder_export_record = ExportRecord(
+            ValueRecorder("c", "d", "e", float, self.meter, ("f",),),
+            [("g", "h")],
+            ExponentialHistogramAggregator({"max_scale": 0}),
+            self.resource,
+        )
+
+        recorder_export_record.aggregator.update(0.75)
+        recorder_export_record.aggregator.update(3.0)
+        recorder_export_record.aggregator.take_checkpoint()
+
+        expected = ExportMetricsServiceRequest(
+            resource_metrics=[
+                ResourceMetrics(
+                    resource=OTLPResource(
+                        attributes=[
+                            KeyValue(key="a", value=AnyValue(int_value=1)),
+                            KeyValue(
+                                key="b", value=AnyValue(bool_value=False)
+                            ),
+                        ]
+                    ),
+                    instrumentation_library_metrics=[
+                        InstrumentationLibraryMetrics(
+                            instrumentation_library=InstrumentationLibrary(
+                                name="name", version="version",
+                            ),
+                            metrics=[
+                                OTLPMetric(
+                                    name="c",
+                                    description="d",
+                                    unit="e",
+                                    double_histogram=DoubleHistogram(
+                                        data_points=[
+                                            DoubleHistogramDataPoint(
+                                                labels=[
+                                                    StringKeyValue(
+                                                        key="g", value="h"
+                                                    )
+                                                ],
+                                                count=2,
+                                                sum=3.75,
+                                                bucket_counts=[0, 1, 0, 1, 0],
+                                                explicit_bounds=[
+                                                    0.0,
+                                                    1.0,
+                                                    2.0,
+                                                    4.0,
+                                                ],
+                                                time_unix_nano=1,
+                                                start_time_unix_nano=1,
+                                            )
+                                        ],
+                                        aggregation_temporality=(
+                                            AggregationTemporality.AGGREGATION_TEMPORALITY_CUMULATIVE
+                                        ),
+                                    ),
+                                )
+                            ],
+                        )
+                    ],
+                )
+            ]
+        )
+
+        # pylint: disable=protected-access
+        actual = self.exporter._translate_data([recorder_export_record])
+
+        self.assertEqual(expected, actual)
+
+    @patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_translate_ddsketch_export_record(self, mock_time_ns):
+        mock_time_ns.configure_mock(**{"return_value": 1})
+        recorder_export_record = ExportRecord(
+            ValueRecorder("c", "d", "e", int, self.meter, ("f",),),
+            [("g", "h")],
+            DDSketchAggregator({"relative_accuracy": 1 / 3}),
+            self.resource,
+        )
+
+        # gamma is 2, so the buckets are (0.5, 1] and (2, 4]
+        recorder_export_record.aggregator.update(1)
+        recorder_export_record.aggregator.update(3)
+        recorder_export_record.aggregator.take_checkpoint()
+
+        # pylint: disable=protected-access
+        actual = self.exporter._translate_data([recorder_export_record])
+
+        metric = actual.resource_metrics[0].instrumentation_library_metrics[
+            0
+        ].metrics[0]
+        self.assertEqual(metric.name, "c")
+        self.assertEqual(
+            metric.int_histogram.aggregation_temporality,
+            AggregationTemporality.AGGREGATION_TEMPORALITY_CUMULATIVE,
+        )
+        data_point = metric.int_histogram.data_points[0]
+        self.assertEqual(data_point.count, 2)
+        self.assertEqual(data_point.sum, 4)
+        self.assertEqual(list(data_point.bucket_counts), [0, 1, 1, 0])
+        self.assertEqual(
+            [round(bound, 6) for bound in data_point.explicit_bounds],
+            [0, 1, 4],
+        )
@@ -0,0 +1,155 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import TestCase
+
+from opentelemetry import trace as trace_api
+from opentelemetry.exporter.otlp.trace_exporter import OTLPSpanExporter
+from opentelemetry.exporter.otlp.trace_exporter.encoder import SpanEncoder
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace.status import Status, StatusCode
+
+
+class TestSpanEncoder(TestCase):
+    def setUp(self):
+        self.exporter = OTLPSpanExporter(insecure=True)
+        self.encoder = SpanEncoder()
+        self.tracer_provider = TracerProvider(
+            resource=Resource({"service.name": "encoder", "pid": 1234})
+        )
+        self.tracer = self.tracer_provider.get_tracer("tracer", "1.0")
+        self.other_tracer = TracerProvider(
+            resource=Resource({"service.name": "other"})
+        ).get_tracer("other")
+
+    def assert_encoded(self, spans):
+        # pylint: disable=protected-access
+        encoded = self.encoder.encode(spans)
+        self.assertEqual(
+            encoded, self.exporter._translate_data(spans).SerializeToString()
+        )
+        return ExportTraceServiceRequest.FromString(encoded)
+
+    def test_encode_attributes(self):
+        span = self.tracer.start_span(
+            "attributes",
+            attributes={
+                "string": "value",
+                "unicode": "été",
+                "empty": "",
+                "true": True,
+                "false": False,
+                "zero": 0,
+                "negative": -42,
+                "large": 2 ** 62,
+                "float": 1.5,
+                "negative_float": -0.0,
+                "strings": ("a", "b"),
+                "floats": (1.0, 2.5),
+            },
+        )
+        span.end()
+        self.assert_encoded([span])
+
+    def test_encode_span(self):
+        with self.tracer.start_as_current_span(
+            "parent", kind=trace_api.SpanKind.SERVER
+        ) as parent:
+            span = self.tracer.start_span(
+                "child",
+                kind=trace_api.SpanKind.CLIENT,
+                links=[
+                    trace_api.Link(
+                        parent.get_span_context(), {"link": "attribute"}
+                    ),
+                    trace_api.Link(parent.get_span_context()),
+                ],
+            )
+            span.add_event("event", {"event": 1})
+            span.add_event("no attributes")
+            span.set_status(Status(StatusCode.ERROR, "description"))
+            span.end()
+        self.assert_encoded([span, parent])
+
+    def test_encode_resources(self):
+        spans = [
+            self.tracer.start_span("first"),
+            self.other_tracer.start_span("other"),
+            self.tracer.start_span("second"),
+        ]
+        for span in spans:
+            span.end()
+        request = self.assert_encoded(spans)
+        self.assertEqual(len(request.resource_spans), 2)
+
+    def test_encode_libraries(self):
+        spans = [
+            self.tracer.start_span("first"),
+            self.tracer_provider.get_tracer("library").start_span("library"),
+            self.other_tracer.start_span("other"),
+            self.tracer.start_span("second"),
+        ]
+        for span in spans:
+            span.end()
+        request = self.assert_encoded(spans)
+        self.assertEqual(
+            [
+                len(resource_spans.instrumentation_library_spans)
+                for resource_spans in request.resource_spans
+            ],
+            [2, 1],
+        )
+        # pylint: disable=protected-access
+        self.assertEqual(len(self.encoder._resources), 2)
+        self.assertEqual(len(self.encoder._libraries), 3)
+        self.assert_encoded(spans)
+
+    def test_encode_invalid_attribute(self):
+        span = self.tracer.start_span("span", attributes={"valid": 1})
+        # pylint: disable=protected-access
+        span._attributes["too_large"] = 2 ** 64
+        span.end()
+        with self.assertLogs(level="ERROR"):
+            request = self.assert_encoded([span])
+        attributes = (
+            request.resource_spans[0]
+            .instrumentation_library_spans[0]
+            .spans[0]
+            .attributes
+        )
+        self.assertEqual(
+            [attribute.key for attribute in attributes], ["valid"]
+        )
+
+    def test_encode_empty(self):
+        self.assertEqual(self.encoder.encode([]), b"")
+
+    def test_key_value_cache(self):
+        encoder = SpanEncoder(max_cached_key_values=2)
+        spans = []
+        for index in range(3):
+            span = self.tracer.start_span(
+                "span", attributes={"index": index, "name": "span"}
+            )
+            span.end()
+            spans.append(span)
+        # pylint: disable=protected-access
+        expected = self.exporter._translate_data(spans).SerializeToString()
+        self.assertEqual(encoder.encode(spans), expected)
+        self.assertLessEqual(len(encoder._key_values), 2)
+        self.assertEqual(encoder.encode(spans), expected)
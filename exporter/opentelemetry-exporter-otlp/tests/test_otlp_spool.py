@@ -0,0 +1,182 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import errno
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from opentelemetry.exporter.otlp.spool import Spool
+
+
+class TestSpool(TestCase):
+    def setUp(self):
+        self.temporary_directory = TemporaryDirectory()
+        self.directory = self.temporary_directory.name
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def pop_all(self, spool):
+        requests = []
+        while True:
+            request = spool.peek()
+            if request is None:
+                return requests
+            requests.append(request)
+            spool.pop()
+
+    def segments(self):
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.endswith(".segment")
+        )
+
+    def test_append_pop(self):
+        spool = Spool(self.directory)
+        self.assertTrue(spool.empty())
+        self.assertIsNone(spool.peek())
+
+        self.assertTrue(spool.append(b"first"))
+        self.assertTrue(spool.append(b""))
+        self.assertFalse(spool.empty())
+
+        # peek returns the same request until it is popped
+        self.assertEqual(spool.peek(), b"first")
+        self.assertEqual(spool.peek(), b"first")
+        spool.pop()
+        self.assertEqual(spool.peek(), b"")
+        spool.pop()
+        # pop does nothing without a peeked request
+        spool.pop()
+        self.assertIsNone(spool.peek())
+        self.assertTrue(spool.empty())
+
+        spool.append(b"second")
+        self.assertEqual(self.pop_all(spool), [b"second"])
+        spool.close()
+
+    def test_reopen(self):
+        spool = Spool(self.directory)
+        for request in [b"first", b"second", b"third"]:
+            spool.append(request)
+        self.assertEqual(spool.peek(), b"first")
+        spool.pop()
+        # peeked but not popped, so sent again
+        self.assertEqual(spool.peek(), b"second")
+        spool.close()
+
+        spool = Spool(self.directory)
+        spool.append(b"fourth")
+        self.assertEqual(
+            self.pop_all(spool), [b"second", b"third", b"fourth"]
+        )
+        spool.close()
+
+        spool = Spool(self.directory)
+        self.assertTrue(spool.empty())
+        self.assertIsNone(spool.peek())
+        spool.close()
+        self.assertEqual(len(self.segments()), 1)
+
+    def test_segments(self):
+        spool = Spool(self.directory, segment_bytes=32)
+        requests = [bytes([index]) * 10 for index in range(5)]
+        for request in requests:
+            spool.append(request)
+        # two 18 bytes records do not fit in a segment
+        self.assertEqual(len(self.segments()), 5)
+
+        self.assertEqual(self.pop_all(spool), requests)
+        self.assertEqual(len(self.segments()), 1)
+        spool.close()
+
+    def test_max_bytes(self):
+        with self.assertLogs(level="WARNING"):
+            spool = Spool(self.directory, max_bytes=64, segment_bytes=32)
+            requests = [bytes([index]) * 10 for index in range(5)]
+            for request in requests:
+                self.assertTrue(spool.append(request))
+            self.assertFalse(spool.append(b"x" * 64))
+        # the oldest requests are dropped
+        self.assertEqual(self.pop_all(spool), requests[2:])
+        spool.close()
+
+    def test_max_bytes_single_segment(self):
+        spool = Spool(self.directory, max_bytes=64)
+        with self.assertLogs(level="WARNING"):
+            for request in [b"a" * 30, b"b" * 30, b"c" * 30]:
+                spool.append(request)
+        self.assertEqual(self.pop_all(spool), [b"c" * 30])
+        spool.close()
+
+    def test_corrupted_segment(self):
+        spool = Spool(self.directory)
+        for request in [b"first", b"second", b"third"]:
+            spool.append(request)
+        spool.close()
+
+        # truncate the last record, as a crash while writing it would
+        path = os.path.join(self.directory, self.segments()[-1])
+        os.truncate(path, os.path.getsize(path) - 1)
+
+        spool = Spool(self.directory)
+        spool.append(b"fourth")
+        with self.assertLogs(level="WARNING"):
+            requests = self.pop_all(spool)
+        self.assertEqual(requests, [b"first", b"second", b"fourth"])
+        spool.close()
+
+    def test_write_error(self):
+        spool = Spool(self.directory)
+        spool.append(b"first")
+
+        def partial_write(record):
+            # pylint: disable=protected-access
+            spool._write_file.write(record[:3])
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        with patch.object(spool, "_write", side_effect=partial_write):
+            with self.assertRaises(OSError):
+                spool.append(b"second")
+        spool.append(b"third")
+
+        # the partial record is removed
+        self.assertEqual(len(self.segments()), 1)
+        self.assertEqual(self.pop_all(spool), [b"first", b"third"])
+        self.assertTrue(spool.empty())
+        spool.close()
+
+    def test_write_error_truncate_error(self):
+        spool = Spool(self.directory)
+        spool.append(b"first")
+
+        def partial_write(record):
+            # pylint: disable=protected-access
+            spool._write_file.write(record[:3])
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        with patch.object(spool, "_write", side_effect=partial_write):
+            with patch("os.ftruncate", side_effect=OSError):
+                with self.assertRaises(OSError):
+                    spool.append(b"second")
+        spool.append(b"third")
+
+        # the next records are written to a new segment
+        self.assertEqual(len(self.segments()), 2)
+        self.assertEqual(self.pop_all(spool), [b"first", b"third"])
+        self.assertTrue(spool.empty())
+        spool.close()
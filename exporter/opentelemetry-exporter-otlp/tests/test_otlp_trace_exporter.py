@@ -13,8 +13,12 @@
 # limitations under the License.
 
 import os
+import time
 from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from tempfile import TemporaryDirectory
+from threading import Event
 from unittest import TestCase
 from unittest.mock import Mock, PropertyMock, patch
 
@@ -23,7 +27,9 @@ from google.rpc.error_details_pb2 import RetryInfo
 from grpc import ChannelCredentials, StatusCode, server
 
 from opentelemetry.configuration import Configuration
+from opentelemetry.exporter.otlp.spool import Spool
 from opentelemetry.exporter.otlp.trace_exporter import OTLPSpanExporter
+from opentelemetry.exporter.otlp.trace_exporter.encoder import SpanEncoder
 from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
     ExportTraceServiceRequest,
     ExportTraceServiceResponse,
@@ -49,6 +55,7 @@ from opentelemetry.proto.trace.v1.trace_pb2 import Status
 from opentelemetry.sdk.resources import Resource as SDKResource
 from opentelemetry.sdk.trace import TracerProvider, _Span
 from opentelemetry.sdk.trace.export import (
+    BatchExportSpanProcessor,
     SimpleExportSpanProcessor,
     SpanExportResult,
 )
@@ -95,6 +102,23 @@ class TraceServiceServicerSUCCESS(TraceServiceServicer):
         return ExportTraceServiceResponse()
 
 
+class TraceServiceServicerRECORD(TraceServiceServicer):
+    # pylint: disable=invalid-name,unused-argument,no-self-use
+    def __init__(self):
+        self.requests = []
+        self.code = StatusCode.OK
+        self.exported = Event()
+
+    def Export(self, request, context):
+        context.set_code(self.code)
+
+        if self.code == StatusCode.OK:
+            self.requests.append(request)
+            self.exported.set()
+
+        return ExportTraceServiceResponse()
+
+
 class TraceServiceServicerALREADY_EXISTS(TraceServiceServicer):
     # pylint: disable=invalid-name,unused-argument,no-self-use
     def Export(self, request, context):
@@ -198,32 +222,173 @@ class TestOTLPSpanExporter(TestCase):
         self.assertTrue(mock_ssl_channel.called)
 
     @patch("opentelemetry.exporter.otlp.exporter.expo")
-    @patch("opentelemetry.exporter.otlp.exporter.sleep")
-    def test_unavailable(self, mock_sleep, mock_expo):
+    def test_unavailable(self, mock_expo):
 
         mock_expo.configure_mock(**{"return_value": [1]})
 
         add_TraceServiceServicer_to_server(
             TraceServiceServicerUNAVAILABLE(), self.server
         )
-        self.assertEqual(
-            self.exporter.export([self.span]), SpanExportResult.FAILURE
-        )
-        mock_sleep.assert_called_with(1)
+        # pylint: disable=protected-access
+        with patch.object(
+            self.exporter._retries_cancelled, "wait", return_value=False
+        ) as mock_wait:
+            self.assertEqual(
+                self.exporter.export([self.span]), SpanExportResult.FAILURE
+            )
+        # the delay is jittered
+        (delay,), _ = mock_wait.call_args
+        self.assertGreaterEqual(delay, 0.5)
+        self.assertLessEqual(delay, 1)
 
     @patch("opentelemetry.exporter.otlp.exporter.expo")
-    @patch("opentelemetry.exporter.otlp.exporter.sleep")
-    def test_unavailable_delay(self, mock_sleep, mock_expo):
+    def test_unavailable_delay(self, mock_expo):
 
         mock_expo.configure_mock(**{"return_value": [1]})
 
         add_TraceServiceServicer_to_server(
             TraceServiceServicerUNAVAILABLEDelay(), self.server
         )
+        # pylint: disable=protected-access
+        with patch.object(
+            self.exporter._retries_cancelled, "wait", return_value=False
+        ) as mock_wait:
+            self.assertEqual(
+                self.exporter.export([self.span]), SpanExportResult.FAILURE
+            )
+        mock_wait.assert_called_with(4)
+
+    def test_export_timeout(self):
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerUNAVAILABLEDelay(), self.server
+        )
+        exporter = OTLPSpanExporter(insecure=True, export_timeout_millis=2000)
+        # pylint: disable=protected-access
+        with patch.object(exporter._retries_cancelled, "wait") as mock_wait:
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(
+                    exporter.export([self.span]), SpanExportResult.FAILURE
+                )
+        # the delay of 4s requested by the server exceeds the timeout
+        mock_wait.assert_not_called()
+
+    @patch("opentelemetry.exporter.otlp.exporter.monotonic")
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_export_timeout_wait_overshoot(self, mock_expo, mock_monotonic):
+        mock_expo.configure_mock(**{"return_value": repeat(1)})
+        # the wait between the attempts ends after the deadline
+        mock_monotonic.configure_mock(**{"side_effect": [0, 0, 0, 2.5]})
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerUNAVAILABLE(), self.server
+        )
+        exporter = OTLPSpanExporter(insecure=True, export_timeout_millis=2000)
+        # pylint: disable=protected-access
+        with patch.object(
+            exporter._client, "Export", wraps=exporter._client.Export
+        ) as mock_export:
+            with patch.object(
+                exporter._retries_cancelled, "wait", return_value=False
+            ):
+                with self.assertLogs(level="WARNING"):
+                    self.assertEqual(
+                        exporter.export([self.span]),
+                        SpanExportResult.FAILURE,
+                    )
+        # no attempt is made without time left
+        self.assertEqual(mock_export.call_count, 1)
+
+    @patch.dict("os.environ", {"OTEL_BSP_EXPORT_TIMEOUT_MILLIS": "5000"})
+    def test_export_timeout_env_variable(self):
+        # pylint: disable=protected-access
+        self.assertEqual(OTLPSpanExporter(insecure=True)._export_timeout, 5)
+        self.assertEqual(self.exporter._export_timeout, 30)
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_shutdown_cancels_retry(self, mock_expo):
+        mock_expo.configure_mock(**{"return_value": [10]})
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerUNAVAILABLE(), self.server
+        )
+        # pylint: disable=protected-access
+        waiting = Event()
+        wait = self.exporter._retries_cancelled.wait
+
+        def _wait(timeout):
+            waiting.set()
+            return wait(timeout)
+
+        with patch.object(
+            self.exporter._retries_cancelled, "wait", side_effect=_wait
+        ):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(self.exporter.export, [self.span])
+                self.assertTrue(waiting.wait(10))
+                self.exporter.shutdown()
+                self.assertEqual(
+                    future.result(timeout=1), SpanExportResult.FAILURE
+                )
+
+        # the exports are not sent after shutdown
         self.assertEqual(
             self.exporter.export([self.span]), SpanExportResult.FAILURE
         )
-        mock_sleep.assert_called_with(4)
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_span_processor_shutdown_cancels_retry(self, mock_expo):
+        mock_expo.configure_mock(**{"return_value": [10]})
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerUNAVAILABLE(), self.server
+        )
+        tracer_provider = TracerProvider()
+        span_processor = BatchExportSpanProcessor(self.exporter)
+        tracer_provider.add_span_processor(span_processor)
+        tracer_provider.get_tracer(__name__).start_span("foo").end()
+
+        # the remaining span is exported once, without waiting 10s to retry
+        start = time.time()
+        with self.assertLogs(level="WARNING"):
+            span_processor.shutdown()
+        self.assertLess(time.time() - start, 5)
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_retryable_status_codes(self, mock_expo):
+        mock_expo.configure_mock(**{"return_value": [1]})
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerALREADY_EXISTS(), self.server
+        )
+        exporter = OTLPSpanExporter(
+            insecure=True, retryable_status_codes=[StatusCode.ALREADY_EXISTS]
+        )
+        # pylint: disable=protected-access
+        with patch.object(
+            exporter._retries_cancelled, "wait", return_value=False
+        ) as mock_wait:
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.FAILURE
+            )
+        mock_wait.assert_called_once()
+
+    @patch.dict(
+        "os.environ",
+        {
+            "OTEL_EXPORTER_OTLP_RETRYABLE_STATUS_CODES": (
+                "unavailable, DEADLINE_EXCEEDED"
+            )
+        },
+    )
+    def test_retryable_status_codes_env_variable(self):
+        # pylint: disable=protected-access
+        self.assertEqual(
+            OTLPSpanExporter(insecure=True)._retryable_status_codes,
+            {StatusCode.UNAVAILABLE, StatusCode.DEADLINE_EXCEEDED},
+        )
+
+    @patch.dict(
+        "os.environ", {"OTEL_EXPORTER_OTLP_RETRYABLE_STATUS_CODES": "TEAPOT"}
+    )
+    def test_invalid_retryable_status_codes(self):
+        with self.assertRaises(ValueError):
+            OTLPSpanExporter(insecure=True)
 
     def test_success(self):
         add_TraceServiceServicer_to_server(
@@ -233,6 +398,105 @@ class TestOTLPSpanExporter(TestCase):
             self.exporter.export([self.span]), SpanExportResult.SUCCESS
         )
 
+    def test_success_direct_encoding(self):
+        servicer = TraceServiceServicerRECORD()
+        add_TraceServiceServicer_to_server(servicer, self.server)
+        exporter = OTLPSpanExporter(insecure=True, direct_encoding=True)
+        self.assertEqual(
+            exporter.export([self.span]), SpanExportResult.SUCCESS
+        )
+        # pylint: disable=protected-access
+        self.assertEqual(
+            servicer.requests, [self.exporter._translate_data([self.span])]
+        )
+
+    @patch.dict(
+        "os.environ", {"OTEL_EXPORTER_OTLP_SPAN_DIRECT_ENCODING": "True"}
+    )
+    def test_direct_encoding_env_variable(self):
+        exporter = OTLPSpanExporter(insecure=True)
+        # pylint: disable=protected-access
+        self.assertIsNotNone(exporter._encoder)
+        self.assertIsNone(self.exporter._encoder)
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_export_spooled(self, mock_expo):
+        mock_expo.side_effect = lambda **kwargs: repeat(0.01)
+        servicer = TraceServiceServicerRECORD()
+        servicer.code = StatusCode.UNAVAILABLE
+        add_TraceServiceServicer_to_server(servicer, self.server)
+
+        with TemporaryDirectory() as directory:
+            exporter = OTLPSpanExporter(
+                insecure=True, spool_directory=directory
+            )
+            # the export does not wait for the collector
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.SUCCESS
+            )
+            exporter.shutdown()
+            self.assertEqual(servicer.requests, [])
+
+            # the spooled spans are sent by the next exporter
+            servicer.code = StatusCode.OK
+            exporter = OTLPSpanExporter(
+                insecure=True, spool_directory=directory
+            )
+            self.assertTrue(servicer.exported.wait(10))
+            exporter.shutdown()
+
+        # pylint: disable=protected-access
+        self.assertEqual(
+            servicer.requests, [self.exporter._translate_data([self.span])]
+        )
+
+    @patch("opentelemetry.exporter.otlp.exporter.expo")
+    def test_export_spooled_read_error(self, mock_expo):
+        mock_expo.side_effect = lambda **kwargs: repeat(0.01)
+        servicer = TraceServiceServicerRECORD()
+        add_TraceServiceServicer_to_server(servicer, self.server)
+
+        peek = Spool.peek
+        errors = [OSError("read error")]
+
+        def failing_peek(spool):
+            if errors:
+                raise errors.pop()
+            return peek(spool)
+
+        # pylint: disable=protected-access
+        request = self.exporter._translate_data([self.span])
+        with TemporaryDirectory() as directory:
+            spool = Spool(os.path.join(directory, "traces"))
+            spool.append(request.SerializeToString())
+            spool.close()
+
+            with patch.object(Spool, "peek", failing_peek):
+                with self.assertLogs(level="ERROR"):
+                    exporter = OTLPSpanExporter(
+                        insecure=True, spool_directory=directory
+                    )
+                    # the spooled spans are still sent after the error
+                    self.assertTrue(servicer.exported.wait(10))
+            exporter.shutdown()
+
+        self.assertEqual(servicer.requests, [request])
+
+    def test_export_spooled_failure(self):
+        add_TraceServiceServicer_to_server(
+            TraceServiceServicerALREADY_EXISTS(), self.server
+        )
+        with TemporaryDirectory() as directory:
+            exporter = OTLPSpanExporter(
+                insecure=True, spool_directory=directory
+            )
+            self.assertEqual(
+                exporter.export([self.span]), SpanExportResult.FAILURE
+            )
+            # pylint: disable=protected-access
+            self.assertTrue(exporter._spool.empty())
+            exporter.shutdown()
+
     def test_failure(self):
         add_TraceServiceServicer_to_server(
             TraceServiceServicerALREADY_EXISTS(), self.server
@@ -343,3 +607,96 @@ class TestOTLPSpanExporter(TestCase):
 
         # pylint: disable=protected-access
         self.assertEqual(expected, self.exporter._translate_data([self.span]))
+        self.assertEqual(
+            expected.SerializeToString(), SpanEncoder().encode([self.span])
+        )
+
+    def test_translate_spans_grouping(self):
+        resource = SDKResource({"service.name": "first"})
+        other_resource = SDKResource({"service.name": "second"})
+        first = InstrumentationInfo("first", "1.0")
+        second = InstrumentationInfo("second", "2.0")
+
+        spans = []
+        for name, span_resource, instrumentation_info in [
+            ("a", resource, first),
+            ("b", other_resource, first),
+            ("c", resource, second),
+            # an equal resource in another object is grouped with the first
+            ("d", SDKResource({"service.name": "first"}), first),
+        ]:
+            span = _Span(
+                name,
+                context=self.span.get_span_context(),
+                resource=span_resource,
+                instrumentation_info=instrumentation_info,
+            )
+            span.start()
+            span.end()
+            spans.append(span)
+
+        # pylint: disable=protected-access
+        request = self.exporter._translate_data(spans)
+        self.assertEqual(
+            [
+                (
+                    resource_spans.resource.attributes[0].value.string_value,
+                    [
+                        (
+                            library_spans.instrumentation_library.name,
+                            [span.name for span in library_spans.spans],
+                        )
+                        for library_spans in (
+                            resource_spans.instrumentation_library_spans
+                        )
+                    ],
+                )
+                for resource_spans in request.resource_spans
+            ],
+            [
+                ("first", [("first", ["a", "d"]), ("second", ["c"])]),
+                ("second", [("first", ["b"])]),
+            ],
+        )
+        self.assertEqual(
+            SpanEncoder().encode(spans), request.SerializeToString()
+        )
+
+        # the resources and instrumentation libraries are translated once
+        with patch(
+            "opentelemetry.exporter.otlp.exporter._translate_resource"
+        ) as translate_resource:
+            self.assertEqual(self.exporter._translate_data(spans), request)
+        translate_resource.assert_not_called()
+        self.assertEqual(len(self.exporter._resources), 2)
+        self.assertEqual(len(self.exporter._instrumentation_libraries), 2)
+
+    def test_translate_spans_concurrently(self):
+        spans = []
+        for name in ("a", "b"):
+            span = _Span(name, context=self.span.get_span_context())
+            span.start()
+            span.end()
+            spans.append(span)
+
+        # pylint: disable=protected-access
+        translate_status = self.exporter._translate_status
+        other_requests = []
+
+        def _translate_status(sdk_span, collector_span_kwargs):
+            if sdk_span is spans[0]:
+                # another export translates its batch in the meantime
+                other_requests.append(
+                    self.exporter._translate_data(spans[1:])
+                )
+            translate_status(sdk_span, collector_span_kwargs)
+
+        with patch.object(
+            self.exporter, "_translate_status", side_effect=_translate_status
+        ):
+            request = self.exporter._translate_data(spans[:1])
+
+        self.assertEqual(request, self.exporter._translate_data(spans[:1]))
+        self.assertEqual(
+            other_requests, [self.exporter._translate_data(spans[1:])]
+        )
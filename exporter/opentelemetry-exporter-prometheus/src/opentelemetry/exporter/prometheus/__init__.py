@@ -71,9 +71,12 @@ from typing import Iterable, Optional, Sequence, Union
 from prometheus_client.core import (
     REGISTRY,
     CounterMetricFamily,
+    HistogramMetricFamily,
     SummaryMetricFamily,
     UnknownMetricFamily,
 )
+from prometheus_client.samples import Sample
+from prometheus_client.utils import floatToGoString
 
 from opentelemetry.metrics import Counter, ValueRecorder
 from opentelemetry.sdk.metrics.export import (
@@ -81,7 +84,11 @@ from opentelemetry.sdk.metrics.export import (
     MetricsExporter,
     MetricsExportResult,
 )
-from opentelemetry.sdk.metrics.export.aggregate import MinMaxSumCountAggregator
+from opentelemetry.sdk.metrics.export.aggregate import (
+    DDSketchAggregator,
+    ExponentialHistogramAggregator,
+    MinMaxSumCountAggregator,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -173,6 +180,48 @@ class CustomCollector:
                     count_value=value.count,
                     sum_value=value.sum,
                 )
+            elif isinstance(export_record.aggregator, DDSketchAggregator):
+                prometheus_metric = SummaryMetricFamily(
+                    name=metric_name,
+                    documentation=description,
+                    labels=label_keys,
+                )
+                prometheus_metric.add_metric(
+                    labels=label_values,
+                    count_value=value.count,
+                    sum_value=value.sum,
+                )
+                if value.count:
+                    for quantile in export_record.aggregator.quantiles:
+                        quantile_labels = dict(zip(label_keys, label_values))
+                        quantile_labels["quantile"] = floatToGoString(
+                            quantile
+                        )
+                        prometheus_metric.samples.append(
+                            Sample(
+                                metric_name,
+                                quantile_labels,
+                                value.quantile(quantile),
+                            )
+                        )
+            elif isinstance(
+                export_record.aggregator, ExponentialHistogramAggregator
+            ):
+                prometheus_metric = HistogramMetricFamily(
+                    name=metric_name,
+                    documentation=description,
+                    labels=label_keys,
+                )
+                bounds, counts = value.to_explicit_buckets()
+                buckets = []
+                cumulative_count = 0
+                for bound, count in zip(bounds, counts):
+                    cumulative_count += count
+                    buckets.append((floatToGoString(bound), cumulative_count))
+                buckets.append(("+Inf", value.count))
+                prometheus_metric.add_metric(
+                    labels=label_values, buckets=buckets, sum_value=value.sum,
+                )
             else:
                 prometheus_metric = UnknownMetricFamily(
                     name=metric_name,
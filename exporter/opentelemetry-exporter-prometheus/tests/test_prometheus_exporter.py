@@ -26,6 +26,8 @@ from opentelemetry.metrics import get_meter_provider, set_meter_provider
 from opentelemetry.sdk import metrics
 from opentelemetry.sdk.metrics.export import ExportRecord, MetricsExportResult
 from opentelemetry.sdk.metrics.export.aggregate import (
+    DDSketchAggregator,
+    ExponentialHistogramAggregator,
     MinMaxSumCountAggregator,
     SumAggregator,
 )
@@ -99,6 +101,67 @@ class TestPrometheusMetricExporter(unittest.TestCase):
         self.assertIn("testprefix_test_name_count 2.0", result)
         self.assertIn("testprefix_test_name_sum 579.0", result)
 
+    def test_exponential_histogram_aggregator_to_prometheus(self):
+        meter = get_meter_provider().get_meter(__name__)
+        metric = meter.create_valuerecorder(
+            "test@name", "testdesc", "unit", float, []
+        )
+        labels = {}
+        key_labels = get_dict_as_key(labels)
+        aggregator = ExponentialHistogramAggregator({"max_scale": 0})
+        aggregator.update(0.75)
+        aggregator.update(3.0)
+        aggregator.take_checkpoint()
+        record = ExportRecord(
+            metric, key_labels, aggregator, get_meter_provider().resource
+        )
+        collector = CustomCollector("testprefix")
+        collector.add_metrics_data([record])
+        result_bytes = generate_latest(collector)
+        result = result_bytes.decode("utf-8")
+        self.assertIn('testprefix_test_name_bucket{le="0.0"} 0.0', result)
+        self.assertIn('testprefix_test_name_bucket{le="1.0"} 1.0', result)
+        self.assertIn('testprefix_test_name_bucket{le="2.0"} 1.0', result)
+        self.assertIn('testprefix_test_name_bucket{le="4.0"} 2.0', result)
+        self.assertIn('testprefix_test_name_bucket{le="+Inf"} 2.0', result)
+        self.assertIn("testprefix_test_name_count 2.0", result)
+        self.assertIn("testprefix_test_name_sum 3.75", result)
+
+    def test_ddsketch_aggregator_to_prometheus(self):
+        meter = get_meter_provider().get_meter(__name__)
+        metric = meter.create_valuerecorder(
+            "test@name", "testdesc", "unit", int, []
+        )
+        labels = {"environment": "staging"}
+        key_labels = get_dict_as_key(labels)
+        aggregator = DDSketchAggregator({"quantiles": [0.5, 1]})
+        aggregator.update(100)
+        aggregator.update(200)
+        aggregator.update(300)
+        aggregator.take_checkpoint()
+        record = ExportRecord(
+            metric, key_labels, aggregator, get_meter_provider().resource
+        )
+        collector = CustomCollector("testprefix")
+        collector.add_metrics_data([record])
+        result_bytes = generate_latest(collector)
+        result = result_bytes.decode("utf-8")
+        self.assertIn(
+            'testprefix_test_name{environment="staging",quantile="0.5"} '
+            "198.368",
+            result,
+        )
+        self.assertIn(
+            'testprefix_test_name{environment="staging",quantile="1.0"} 300.0',
+            result,
+        )
+        self.assertIn(
+            'testprefix_test_name_count{environment="staging"} 3.0', result
+        )
+        self.assertIn(
+            'testprefix_test_name_sum{environment="staging"} 600.0', result
+        )
+
     def test_counter_to_prometheus(self):
         meter = get_meter_provider().get_meter(__name__)
         metric = meter.create_counter("test@name", "testdesc", "unit", int,)
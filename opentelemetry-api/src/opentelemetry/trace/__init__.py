@@ -81,7 +81,11 @@ from contextlib import contextmanager
 from logging import getLogger
 
 from opentelemetry.context.context import Context
-from opentelemetry.trace.ids_generator import IdsGenerator, RandomIdsGenerator
+from opentelemetry.trace.ids_generator import (
+    FastRandomIdsGenerator,
+    IdsGenerator,
+    RandomIdsGenerator,
+)
 from opentelemetry.trace.propagation import (
     get_current_span,
     set_span_in_context,
@@ -459,6 +463,7 @@ def get_tracer_provider() -> TracerProvider:
 __all__ = [
     "DEFAULT_TRACE_OPTIONS",
     "DEFAULT_TRACE_STATE",
+    "FastRandomIdsGenerator",
     "IdsGenerator",
     "INVALID_SPAN",
     "INVALID_SPAN_CONTEXT",
@@ -13,7 +13,10 @@
 # limitations under the License.
 
 import abc
+import functools
+import os
 import random
+import weakref
 
 
 class IdsGenerator(abc.ABC):
@@ -50,3 +53,61 @@ class RandomIdsGenerator(IdsGenerator):
 
     def generate_trace_id(self) -> int:
         return random.getrandbits(128)
+
+
+class FastRandomIdsGenerator(IdsGenerator):
+    """An IDs generator which randomly generates all bits when generating IDs,
+    like `RandomIdsGenerator`, but with a random number generator of its own
+    instead of the global one of the `random` module.
+
+    IDs are generated without going through a Python function call, which
+    makes them cheaper than with `RandomIdsGenerator`. The generator is
+    seeded from `os.urandom` and reseeded in child processes after a fork, so
+    that a child process doesn't generate the same IDs as its parent. On
+    Python versions without `os.register_at_fork`, only forks made by
+    `multiprocessing` are detected.
+    """
+
+    def __init__(self):
+        self._random = random.Random()
+        # shadow the methods below with direct calls to the generator
+        self.generate_span_id = functools.partial(
+            self._random.getrandbits, 64
+        )
+        self.generate_trace_id = functools.partial(
+            self._random.getrandbits, 128
+        )
+        _register_after_fork(self)
+
+    def _reseed(self) -> None:
+        self._random.seed()
+
+    def generate_span_id(self) -> int:  # pylint: disable=method-hidden
+        return self._random.getrandbits(64)
+
+    def generate_trace_id(self) -> int:  # pylint: disable=method-hidden
+        return self._random.getrandbits(128)
+
+
+if hasattr(os, "register_at_fork"):
+    _FAST_GENERATORS = weakref.WeakSet()  # type: weakref.WeakSet
+
+    def _reseed_fast_generators() -> None:
+        # pylint: disable=protected-access
+        for generator in list(_FAST_GENERATORS):
+            generator._reseed()
+
+    os.register_at_fork(  # pylint: disable=no-member
+        after_in_child=_reseed_fast_generators
+    )
+
+    def _register_after_fork(generator: FastRandomIdsGenerator) -> None:
+        _FAST_GENERATORS.add(generator)
+
+
+else:
+    from multiprocessing.util import register_after_fork
+
+    def _register_after_fork(generator: FastRandomIdsGenerator) -> None:
+        # pylint: disable=protected-access
+        register_after_fork(generator, FastRandomIdsGenerator._reseed)
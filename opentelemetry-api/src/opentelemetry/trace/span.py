@@ -12,6 +12,8 @@ _logger = logging.getLogger(__name__)
 class Span(abc.ABC):
     """A span represents a single operation within a trace."""
 
+    __slots__ = ()
+
     @abc.abstractmethod
     def end(self, end_time: typing.Optional[int] = None) -> None:
         """Sets the current time as the span's end time.
@@ -42,6 +44,17 @@ class Span(abc.ABC):
         Note: The behavior of `None` value attributes is undefined, and hence strongly discouraged.
         """
 
+    def set_attributes(self, attributes: types.Attributes) -> None:
+        """Sets Attributes.
+
+        Sets all the Attributes of the given mapping, as if `set_attribute`
+        was called for each of them. Implementations may do so more
+        efficiently than separate `set_attribute` calls.
+        """
+        if attributes:
+            for key, value in attributes.items():
+                self.set_attribute(key, value)
+
     @abc.abstractmethod
     def add_event(
         self,
@@ -253,6 +266,8 @@ class DefaultSpan(Span):
     All operations are no-op except context propagation.
     """
 
+    __slots__ = ("_context", "__weakref__")
+
     def __init__(self, context: "SpanContext") -> None:
         self._context = context
 
@@ -268,6 +283,9 @@ class DefaultSpan(Span):
     def set_attribute(self, key: str, value: types.AttributeValue) -> None:
         pass
 
+    def set_attributes(self, attributes: types.Attributes) -> None:
+        pass
+
     def add_event(
         self,
         name: str,
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import unittest
+import weakref
 
 from opentelemetry import trace
 
@@ -33,3 +34,7 @@ class TestDefaultSpan(unittest.TestCase):
         self.assertIsNotNone(trace.INVALID_SPAN)
         self.assertIsNotNone(trace.INVALID_SPAN.get_span_context())
         self.assertFalse(trace.INVALID_SPAN.get_span_context().is_valid)
+
+    def test_weakref(self):
+        span = trace.DefaultSpan(trace.INVALID_SPAN_CONTEXT)
+        self.assertIs(weakref.ref(span)(), span)
@@ -0,0 +1,64 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import random
+import unittest
+
+from opentelemetry import trace
+
+
+class TestFastRandomIdsGenerator(unittest.TestCase):
+    def test_generate_ids(self):
+        ids_generator = trace.FastRandomIdsGenerator()
+
+        span_ids = [ids_generator.generate_span_id() for _ in range(10)]
+        trace_ids = [ids_generator.generate_trace_id() for _ in range(10)]
+
+        self.assertEqual(len(set(span_ids)), 10)
+        self.assertEqual(len(set(trace_ids)), 10)
+        for span_id in span_ids:
+            self.assertLess(span_id, 1 << 64)
+        for trace_id in trace_ids:
+            self.assertLess(trace_id, 1 << 128)
+
+    def test_independent_of_global_random(self):
+        ids_generator = trace.FastRandomIdsGenerator()
+        other_ids_generator = trace.FastRandomIdsGenerator()
+
+        random.seed(0)
+        span_id = ids_generator.generate_span_id()
+        random.seed(0)
+        self.assertNotEqual(span_id, ids_generator.generate_span_id())
+        self.assertNotEqual(
+            ids_generator.generate_trace_id(),
+            other_ids_generator.generate_trace_id(),
+        )
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_fork(self):
+        ids_generator = trace.FastRandomIdsGenerator()
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, str(ids_generator.generate_span_id()).encode())
+            os._exit(0)  # pylint: disable=protected-access
+
+        span_id = ids_generator.generate_span_id()
+        os.waitpid(pid, 0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as read_file:
+            # the child is reseeded, so it doesn't generate the parent's IDs
+            self.assertNotEqual(int(read_file.read()), span_id)
@@ -56,6 +56,7 @@ def parse_args():
         Examples:
 
             --ids-generator=random
+            --ids-generator=fast_random
         """,
     )
 
@@ -15,9 +15,13 @@
 import atexit
 import logging
 import threading
-from typing import Dict, Sequence, Tuple, Type, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Sequence, Tuple, Type, TypeVar
 
 from opentelemetry import metrics as metrics_api
+from opentelemetry.configuration import Configuration
 from opentelemetry.sdk.metrics.export import (
     ConsoleMetricsExporter,
     MetricsExporter,
@@ -36,6 +40,44 @@ from opentelemetry.sdk.util.instrumentation import InstrumentationInfo
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of label sets whose keys are cached by each metric for the
+# unbound `add`/`record` calls.
+_LABEL_KEY_CACHE_SIZE = 1024
+
+# The labels of the series that records the label sets of an instrument
+# beyond its cardinality limit.
+OVERFLOW_LABELS = (("otel.metric.overflow", "true"),)
+
+
+def _get_series_key(
+    instrument: metrics_api.InstrumentT, key: Tuple[Tuple[str, str]],
+) -> Tuple[Tuple[str, str]]:
+    """Returns the key under which a label set that has no bound instrument
+    or aggregator is recorded, which is `OVERFLOW_LABELS` if the instrument
+    already keeps as many series as its cardinality limit.
+    """
+    limit = instrument.cardinality_limit
+    if limit is None:
+        return key
+    series_labels = instrument.series_labels
+    if (
+        len(series_labels) < limit
+        or key in series_labels
+        or key == OVERFLOW_LABELS
+    ):
+        series_labels.add(key)
+        return key
+    instrument.overflow_count += 1
+    if instrument.overflow_count == 1:
+        logger.warning(
+            "Cardinality limit of %s reached for %s, further label sets are "
+            "recorded with the %s labels.",
+            limit,
+            instrument,
+            OVERFLOW_LABELS,
+        )
+    return OVERFLOW_LABELS
+
 
 class BaseBoundInstrument:
     """Class containing common behavior for all bound metric instruments.
@@ -43,6 +85,11 @@ class BaseBoundInstrument:
     Bound metric instruments are responsible for operating on data for metric
     instruments for a specific set of labels.
 
+    A bound instrument is added to the ``dirty_bound_instruments`` of its
+    metric when it is created, updated or released, so that collections only
+    go through the bound instruments which may have something to collect or
+    may be removed.
+
     Args:
         labels: A set of labels as keys that bind this metric instrument.
         metric: The metric that created this bound instrument.
@@ -54,9 +101,9 @@ class BaseBoundInstrument:
         self.view_datas = metric.meter.view_manager.get_view_datas(
             metric, labels
         )
-        self._view_datas_lock = threading.Lock()
         self._ref_count = 0
         self._ref_count_lock = threading.Lock()
+        self.dirty = False
 
     def _validate_update(self, value: metrics_api.ValueT) -> bool:
         if not self._metric.enabled:
@@ -70,13 +117,22 @@ class BaseBoundInstrument:
         return True
 
     def update(self, value: metrics_api.ValueT):
-        with self._view_datas_lock:
-            # record the value for each view_data belonging to this aggregator
-            for view_data in self.view_datas:
-                view_data.record(value)
+        # view_datas is never modified once created, and each aggregator
+        # synchronizes its own updates
+        for view_data in self.view_datas:
+            view_data.record(value)
+        if not self.dirty:
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        # concurrent calls may add the bound instrument twice, which only
+        # costs a second check on collection
+        self.dirty = True
+        self._metric.dirty_bound_instruments.append((self._labels, self))
 
     def release(self):
         self.decrease_ref_count()
+        self._mark_dirty()
 
     def decrease_ref_count(self):
         with self._ref_count_lock:
@@ -97,6 +153,8 @@ class BoundCounter(metrics_api.BoundCounter, BaseBoundInstrument):
         if self._validate_update(value):
             self.update(value)
 
+    UPDATE_FUNCTION = add
+
     def _validate_update(self, value: metrics_api.ValueT) -> bool:
         if not super()._validate_update(value):
             return False
@@ -116,6 +174,8 @@ class BoundUpDownCounter(metrics_api.BoundUpDownCounter, BaseBoundInstrument):
         if self._validate_update(value):
             self.update(value)
 
+    UPDATE_FUNCTION = add
+
 
 class BoundValueRecorder(metrics_api.BoundValueRecorder, BaseBoundInstrument):
     def record(self, value: metrics_api.ValueT) -> None:
@@ -123,6 +183,8 @@ class BoundValueRecorder(metrics_api.BoundValueRecorder, BaseBoundInstrument):
         if self._validate_update(value):
             self.update(value)
 
+    UPDATE_FUNCTION = record
+
 
 class Metric(metrics_api.Metric):
     """Base class for all synchronous metric types.
@@ -135,6 +197,13 @@ class Metric(metrics_api.Metric):
 
     Each metric has a set of bound metrics that are created from the metric.
     See `BaseBoundInstrument` for information on bound metric instruments.
+
+    If ``cardinality_limit`` is set, at most that many label sets are kept
+    in ``series_labels``. Other label sets are recorded in a single series
+    with the `OVERFLOW_LABELS` and counted in ``overflow_count``. The label
+    sets of released bound instruments are removed on collection with
+    stateless processors, while stateful processors keep their series, and
+    so their label sets, for the lifetime of the process.
     """
 
     BOUND_INSTR_TYPE = BaseBoundInstrument
@@ -147,6 +216,7 @@ class Metric(metrics_api.Metric):
         value_type: Type[metrics_api.ValueT],
         meter: "Accumulator",
         enabled: bool = True,
+        cardinality_limit: Optional[int] = None,
     ):
         self.name = name
         self.description = description
@@ -154,20 +224,85 @@ class Metric(metrics_api.Metric):
         self.value_type = value_type
         self.meter = meter
         self.enabled = enabled
+        self.cardinality_limit = cardinality_limit
+        self.overflow_count = 0
+        # label sets which count against the cardinality limit, only
+        # tracked when it is set
+        self.series_labels = set()
         self.bound_instruments = {}
         self.bound_instruments_lock = threading.Lock()
+        # (labels, bound instrument) updated or released since the last
+        # collection, see `BaseBoundInstrument`
+        self.dirty_bound_instruments = deque()
+        # labels as passed by the caller -> key in bound_instruments
+        self._label_keys = OrderedDict()
 
     def bind(self, labels: Dict[str, str]) -> BaseBoundInstrument:
         """See `opentelemetry.metrics.Metric.bind`."""
-        key = get_dict_as_key(labels)
-        with self.bound_instruments_lock:
-            bound_instrument = self.bound_instruments.get(key)
-            if bound_instrument is None:
-                bound_instrument = self.BOUND_INSTR_TYPE(key, self)
-                self.bound_instruments[key] = bound_instrument
+        bound_instrument = self._get_or_create_bound_instrument(
+            get_dict_as_key(labels)
+        )
         bound_instrument.increase_ref_count()
         return bound_instrument
 
+    def _get_or_create_bound_instrument(
+        self, key: Tuple[Tuple[str, str]]
+    ) -> BaseBoundInstrument:
+        bound_instrument = self.bound_instruments.get(key)
+        if bound_instrument is None:
+            with self.bound_instruments_lock:
+                bound_instrument = self.bound_instruments.get(key)
+                if bound_instrument is None:
+                    key = _get_series_key(self, key)
+                    bound_instrument = self.bound_instruments.get(key)
+                if bound_instrument is None:
+                    bound_instrument = self.BOUND_INSTR_TYPE(key, self)
+                    self.bound_instruments[key] = bound_instrument
+                    # so that it is removed on collection even if it gets
+                    # no valid update and is never bound
+                    # pylint: disable=protected-access
+                    bound_instrument._mark_dirty()
+        return bound_instrument
+
+    def _get_label_key(
+        self, labels: Dict[str, str]
+    ) -> Tuple[Tuple[str, str]]:
+        """Returns the same key as `get_dict_as_key`, looking it up in a
+        LRU cache keyed on the labels in their given order so that repeated
+        label sets are not sorted again.
+        """
+        try:
+            cache_key = tuple(labels.items())
+            key = self._label_keys[cache_key]
+        except TypeError:
+            # unhashable label values, e.g. lists
+            return get_dict_as_key(labels)
+        except KeyError:
+            key = get_dict_as_key(labels)
+            with self.bound_instruments_lock:
+                self._label_keys[cache_key] = key
+                if len(self._label_keys) > _LABEL_KEY_CACHE_SIZE:
+                    self._label_keys.popitem(last=False)
+            return key
+        try:
+            self._label_keys.move_to_end(cache_key)
+        except KeyError:
+            # evicted by another thread in the meantime
+            pass
+        return key
+
+    def _get_bound_instrument(
+        self, labels: Dict[str, str]
+    ) -> BaseBoundInstrument:
+        """Returns the bound instrument for the unbound `add`/`record` calls.
+
+        Unlike `bind`, no reference is taken, so the bound instrument is
+        removed on the next collection unless it is bound elsewhere.
+        """
+        return self._get_or_create_bound_instrument(
+            self._get_label_key(labels)
+        )
+
     def __repr__(self):
         return '{}(name="{}", description="{}")'.format(
             type(self).__name__, self.name, self.description
@@ -184,9 +319,7 @@ class Counter(Metric, metrics_api.Counter):
 
     def add(self, value: metrics_api.ValueT, labels: Dict[str, str]) -> None:
         """See `opentelemetry.metrics.Counter.add`."""
-        bound_intrument = self.bind(labels)
-        bound_intrument.add(value)
-        bound_intrument.release()
+        self._get_bound_instrument(labels).add(value)
 
     UPDATE_FUNCTION = add
 
@@ -199,9 +332,7 @@ class UpDownCounter(Metric, metrics_api.UpDownCounter):
 
     def add(self, value: metrics_api.ValueT, labels: Dict[str, str]) -> None:
         """See `opentelemetry.metrics.UpDownCounter.add`."""
-        bound_intrument = self.bind(labels)
-        bound_intrument.add(value)
-        bound_intrument.release()
+        self._get_bound_instrument(labels).add(value)
 
     UPDATE_FUNCTION = add
 
@@ -215,9 +346,7 @@ class ValueRecorder(Metric, metrics_api.ValueRecorder):
         self, value: metrics_api.ValueT, labels: Dict[str, str]
     ) -> None:
         """See `opentelemetry.metrics.ValueRecorder.record`."""
-        bound_intrument = self.bind(labels)
-        bound_intrument.record(value)
-        bound_intrument.release()
+        self._get_bound_instrument(labels).record(value)
 
     UPDATE_FUNCTION = record
 
@@ -232,8 +361,14 @@ class Observer(metrics_api.Observer):
     that they are reported by a callback, once per collection interval, and
     lack context. They are permitted to report only one value per distinct
     label set per period.
+
+    The series of label sets that are not observed during a collection are
+    removed, unless ``REMOVE_UNOBSERVED_SERIES`` is False.
+    ``cardinality_limit`` bounds the number of series like for `Metric`.
     """
 
+    REMOVE_UNOBSERVED_SERIES = True
+
     def __init__(
         self,
         callback: metrics_api.ObserverCallbackT,
@@ -244,6 +379,7 @@ class Observer(metrics_api.Observer):
         meter: "Accumulator",
         label_keys: Sequence[str] = (),
         enabled: bool = True,
+        cardinality_limit: Optional[int] = None,
     ):
         self.callback = callback
         self.name = name
@@ -253,6 +389,11 @@ class Observer(metrics_api.Observer):
         self.meter = meter
         self.label_keys = label_keys
         self.enabled = enabled
+        self.cardinality_limit = cardinality_limit
+        self.overflow_count = 0
+        # label sets which count against the cardinality limit, only
+        # tracked when it is set
+        self.series_labels = set()
 
         self.aggregators = {}
 
@@ -264,7 +405,8 @@ class Observer(metrics_api.Observer):
             return
 
         if key not in self.aggregators:
-            # TODO: how to cleanup aggregators?
+            key = _get_series_key(self, key)
+        if key not in self.aggregators:
             self.aggregators[key] = get_default_aggregator(self)()
         aggregator = self.aggregators[key]
         aggregator.update(value)
@@ -301,7 +443,13 @@ class Observer(metrics_api.Observer):
 
 
 class SumObserver(Observer, metrics_api.SumObserver):
-    """See `opentelemetry.metrics.SumObserver`."""
+    """See `opentelemetry.metrics.SumObserver`.
+
+    The series which are not observed during a collection are kept, so that
+    the values observed later are checked against their last value.
+    """
+
+    REMOVE_UNOBSERVED_SERIES = False
 
     def _validate_observe(
         self, value: metrics_api.ValueT, key: Tuple[Tuple[str, str]]
@@ -309,11 +457,13 @@ class SumObserver(Observer, metrics_api.SumObserver):
         if not super()._validate_observe(value, key):
             return False
         # Must be non-decreasing because monotonic
-        if (
-            key in self.aggregators
-            and self.aggregators[key].current is not None
-        ):
-            if value < self.aggregators[key].current:
+        aggregator = self.aggregators.get(key)
+        if aggregator is not None:
+            last = aggregator.current
+            if last is None:
+                # last value of the previous collections
+                last = aggregator.checkpoint
+            if last is not None and value < last:
                 logger.warning("Value passed must be non-decreasing.")
                 return False
         return True
@@ -341,6 +491,54 @@ class Accumulation:
         self.aggregator = aggregator
 
 
+class BoundBatch:
+    """A set of labels bound to record batches of measurements.
+
+    Created by `Accumulator.bind_batch`. The metric instruments recorded with
+    a bound batch are bound to its labels the first time they are recorded,
+    and stay bound until `release` is called.
+
+    Args:
+        labels: The labels as keys of all the measurements of the batches.
+    """
+
+    def __init__(self, labels: Tuple[Tuple[str, str]]):
+        self._labels = labels
+        self._bound_instruments = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        record_tuples: Sequence[Tuple[metrics_api.Metric, metrics_api.ValueT]],
+    ) -> None:
+        """Records a batch of `Metric` and value pairs with the bound
+        labels."""
+        for metric, value in record_tuples:
+            bound_instrument = self._bound_instruments.get(metric)
+            if bound_instrument is None:
+                bound_instrument = self._bind(metric)
+            bound_instrument.UPDATE_FUNCTION(value)
+
+    def _bind(self, metric: "MetricT") -> BaseBoundInstrument:
+        with self._lock:
+            bound_instrument = self._bound_instruments.get(metric)
+            if bound_instrument is None:
+                # pylint: disable=protected-access
+                bound_instrument = metric._get_or_create_bound_instrument(
+                    self._labels
+                )
+                bound_instrument.increase_ref_count()
+                self._bound_instruments[metric] = bound_instrument
+        return bound_instrument
+
+    def release(self) -> None:
+        """Releases the bound instruments of the batch."""
+        with self._lock:
+            for bound_instrument in self._bound_instruments.values():
+                bound_instrument.release()
+            self._bound_instruments.clear()
+
+
 class Accumulator(metrics_api.Meter):
     """See `opentelemetry.metrics.Meter`.
 
@@ -361,6 +559,11 @@ class Accumulator(metrics_api.Meter):
         self.metrics_lock = threading.Lock()
         self.observers_lock = threading.Lock()
         self.view_manager = ViewManager()
+        self.cardinality_limit = source.cardinality_limit
+        self._observer_executor = source.observer_executor
+        self._observer_timeout = source.observer_timeout
+        # observer -> future of its callback which is still running
+        self._observer_futures = {}
 
     def collect(self) -> None:
         """Collects all the metrics created with this `Meter` for export.
@@ -377,48 +580,114 @@ class Accumulator(metrics_api.Meter):
         for metric in self.metrics:
             if not metric.enabled:
                 continue
-            to_remove = []
+            dirty = metric.dirty_bound_instruments
             with metric.bound_instruments_lock:
-                for (
-                    labels,
-                    bound_instrument,
-                ) in metric.bound_instruments.items():
+                # bound instruments made dirty during the collection are
+                # left for the next one
+                for _ in range(len(dirty)):
+                    labels, bound_instrument = dirty.popleft()
+                    bound_instrument.dirty = False
                     for view_data in bound_instrument.view_datas:
+                        if view_data.aggregator.checkpointed:
+                            # not updated since the last collection
+                            continue
                         accumulation = Accumulation(
                             metric, view_data.labels, view_data.aggregator
                         )
                         self.processor.process(accumulation)
 
-                    if bound_instrument.ref_count() == 0:
-                        to_remove.append(labels)
-
-            # Remove handles that were released
-            for labels in to_remove:
-                del metric.bound_instruments[labels]
+                    # Remove handles that were released
+                    if (
+                        bound_instrument.ref_count() == 0
+                        and metric.bound_instruments.get(labels)
+                        is bound_instrument
+                    ):
+                        del metric.bound_instruments[labels]
+                        self.view_manager.release_view_datas(
+                            metric, bound_instrument.view_datas
+                        )
+                        if not self.processor.stateful:
+                            # the processor drops the series too
+                            metric.series_labels.discard(labels)
 
     def _collect_observers(self) -> None:
         with self.observers_lock:
-            for observer in self.observers:
-                if not observer.enabled:
-                    continue
-
-                if not observer.run():
-                    continue
-
-                for labels, aggregator in observer.aggregators.items():
+            observers = [
+                observer for observer in self.observers if observer.enabled
+            ]
+            for observer in self._run_observers(observers):
+                for labels, aggregator in list(observer.aggregators.items()):
+                    if aggregator.checkpointed:
+                        # not observed since the last collection
+                        if observer.REMOVE_UNOBSERVED_SERIES:
+                            del observer.aggregators[labels]
+                            if not self.processor.stateful:
+                                observer.series_labels.discard(labels)
+                        continue
                     accumulation = Accumulation(observer, labels, aggregator)
                     self.processor.process(accumulation)
 
+    def _run_observers(
+        self, observers: Sequence[Observer]
+    ) -> Sequence[Observer]:
+        """Runs the callbacks of the observers and returns the observers whose
+        callback succeeded.
+
+        If the meter provider has an observer executor, the callbacks run
+        concurrently on it, and callbacks which do not finish within the
+        observer timeout are not waited for. A callback which is still running
+        is not run again until it finishes.
+        """
+        if self._observer_executor is None:
+            return [observer for observer in observers if observer.run()]
+
+        futures = []
+        for observer in observers:
+            future = self._observer_futures.get(observer)
+            if future is not None and not future.done():
+                logger.warning(
+                    "Callback of %s is still running, skipping it.", observer
+                )
+                continue
+            future = self._observer_executor.submit(observer.run)
+            self._observer_futures[observer] = future
+            futures.append((observer, future))
+
+        succeeded = []
+        for observer, future in futures:
+            try:
+                if future.result(timeout=self._observer_timeout):
+                    succeeded.append(observer)
+            except FutureTimeoutError:
+                logger.warning(
+                    "Timed out waiting for the callback of %s.", observer
+                )
+                continue
+            del self._observer_futures[observer]
+        return succeeded
+
     def record_batch(
         self,
         labels: Dict[str, str],
         record_tuples: Sequence[Tuple[metrics_api.Metric, metrics_api.ValueT]],
     ) -> None:
         """See `opentelemetry.metrics.Meter.record_batch`."""
-        # TODO: Avoid enconding the labels for each instrument, encode once
-        # and reuse.
+        key = get_dict_as_key(labels)
         for metric, value in record_tuples:
-            metric.UPDATE_FUNCTION(value, labels)
+            # pylint: disable=protected-access
+            metric._get_or_create_bound_instrument(key).UPDATE_FUNCTION(value)
+
+    def bind_batch(self, labels: Dict[str, str]) -> "BoundBatch":
+        """Binds a set of labels to record batches of measurements with.
+
+        Unlike `record_batch`, the bound instruments of the metrics recorded
+        with the returned `BoundBatch` are only looked up once.
+
+        Args:
+            labels: Labels associated with all measurements recorded with
+                the `BoundBatch`.
+        """
+        return BoundBatch(get_dict_as_key(labels))
 
     def create_counter(
         self,
@@ -430,7 +699,13 @@ class Accumulator(metrics_api.Meter):
     ) -> metrics_api.Counter:
         """See `opentelemetry.metrics.Meter.create_counter`."""
         counter = Counter(
-            name, description, unit, value_type, self, enabled=enabled
+            name,
+            description,
+            unit,
+            value_type,
+            self,
+            enabled=enabled,
+            cardinality_limit=self.cardinality_limit,
         )
         with self.metrics_lock:
             self.metrics.add(counter)
@@ -446,7 +721,13 @@ class Accumulator(metrics_api.Meter):
     ) -> metrics_api.UpDownCounter:
         """See `opentelemetry.metrics.Meter.create_updowncounter`."""
         counter = UpDownCounter(
-            name, description, unit, value_type, self, enabled=enabled
+            name,
+            description,
+            unit,
+            value_type,
+            self,
+            enabled=enabled,
+            cardinality_limit=self.cardinality_limit,
         )
         with self.metrics_lock:
             self.metrics.add(counter)
@@ -462,7 +743,13 @@ class Accumulator(metrics_api.Meter):
     ) -> metrics_api.ValueRecorder:
         """See `opentelemetry.metrics.Meter.create_valuerecorder`."""
         recorder = ValueRecorder(
-            name, description, unit, value_type, self, enabled=enabled
+            name,
+            description,
+            unit,
+            value_type,
+            self,
+            enabled=enabled,
+            cardinality_limit=self.cardinality_limit,
         )
         with self.metrics_lock:
             self.metrics.add(recorder)
@@ -487,6 +774,7 @@ class Accumulator(metrics_api.Meter):
             self,
             label_keys,
             enabled,
+            self.cardinality_limit,
         )
         with self.observers_lock:
             self.observers.add(ob)
@@ -511,6 +799,7 @@ class Accumulator(metrics_api.Meter):
             self,
             label_keys,
             enabled,
+            self.cardinality_limit,
         )
         with self.observers_lock:
             self.observers.add(ob)
@@ -535,6 +824,7 @@ class Accumulator(metrics_api.Meter):
             self,
             label_keys,
             enabled,
+            self.cardinality_limit,
         )
         with self.observers_lock:
             self.observers.add(ob)
@@ -559,6 +849,17 @@ class MeterProvider(metrics_api.MeterProvider):
         resource: Resource for this MeterProvider
         shutdown_on_exit: Register an atexit hook to shut down when the
             application exists
+        cardinality_limit: The maximum number of label sets of each
+            instrument of the meters created, see `Metric`. Defaults to the
+            ``OTEL_METRICS_CARDINALITY_LIMIT`` environment variable. The
+            label sets are not limited if it is not set or 0.
+        observer_workers: The number of threads that run the callbacks of the
+            observers of the meters created concurrently. Defaults to the
+            ``OTEL_METRICS_OBSERVER_WORKERS`` environment variable, or 0 to run
+            them one after the other in the collecting thread.
+        observer_timeout: The time in seconds to wait for each observer
+            callback when they run on threads. Defaults to the
+            ``OTEL_METRICS_OBSERVER_TIMEOUT`` environment variable, or 10.
     """
 
     def __init__(
@@ -566,9 +867,31 @@ class MeterProvider(metrics_api.MeterProvider):
         stateful=True,
         resource: Resource = Resource.create({}),
         shutdown_on_exit: bool = True,
+        cardinality_limit: Optional[int] = None,
+        observer_workers: Optional[int] = None,
+        observer_timeout: Optional[float] = None,
     ):
         self.stateful = stateful
         self.resource = resource
+        if cardinality_limit is None:
+            cardinality_limit = Configuration().get(
+                "METRICS_CARDINALITY_LIMIT", 0
+            )
+        self.cardinality_limit = cardinality_limit or None
+        if observer_workers is None:
+            observer_workers = Configuration().get(
+                "METRICS_OBSERVER_WORKERS", 0
+            )
+        self.observer_executor = None
+        if observer_workers:
+            self.observer_executor = ThreadPoolExecutor(
+                max_workers=observer_workers
+            )
+        if observer_timeout is None:
+            observer_timeout = Configuration().get(
+                "METRICS_OBSERVER_TIMEOUT", 10.0
+            )
+        self.observer_timeout = observer_timeout
         self._controllers = []
         self._exporters = set()
         self._atexit_handler = None
@@ -615,6 +938,8 @@ class MeterProvider(metrics_api.MeterProvider):
             controller.shutdown()
         for exporter in self._exporters:
             exporter.shutdown()
+        if self.observer_executor is not None:
+            self.observer_executor.shutdown(wait=False)
         if self._atexit_handler is not None:
             atexit.unregister(self._atexit_handler)
             self._atexit_handler = None
@@ -15,11 +15,19 @@
 import abc
 import logging
 import threading
+from bisect import bisect_right
 from collections import OrderedDict, namedtuple
-from math import inf
+from math import ceil, frexp, inf, isfinite, log, log2
+from operator import add
 
+from opentelemetry.sdk.util import get_dict_as_key
 from opentelemetry.util import time_ns
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,10 +44,14 @@ class Aggregator(abc.ABC):
         self.initial_checkpoint_timestamp = 0
         self.first_timestamp = time_ns()
         self.checkpointed = True
-        if config is not None:
+        if config:
             self.config = config
+            # aggregators with the same config are kept apart from those
+            # with another one by the processor, precompute its key for it
+            self.config_key = get_dict_as_key(config)
         else:
             self.config = {}
+            self.config_key = ()
 
     @abc.abstractmethod
     def update(self, value):
@@ -65,6 +77,18 @@ class Aggregator(abc.ABC):
             other.initial_checkpoint_timestamp,
         )
 
+    def reset_checkpoint(self):
+        """Empties the checkpoint so that the aggregator can be reused as if
+        it had just been created.
+
+        Subclasses override it to empty their checkpoint, stateless
+        processors replace the aggregators whose class doesn't instead of
+        reusing them.
+        """
+        self.last_update_timestamp = 0
+        self.initial_checkpoint_timestamp = 0
+        self.first_timestamp = time_ns()
+
     def _verify_type(self, other):
         if isinstance(other, self.__class__):
             return True
@@ -76,24 +100,99 @@ class Aggregator(abc.ABC):
         return False
 
 
+class _Stripe:
+    """The partial aggregation of a single thread."""
+
+    __slots__ = ("current", "lock", "thread")
+
+    def __init__(self, current):
+        self.current = current
+        self.lock = threading.Lock()
+        self.thread = threading.current_thread()
+
+
+class _Stripes:
+    """Per-thread partial aggregations of an aggregator.
+
+    Each thread updates its own stripe, so threads updating the same
+    aggregator don't contend on a single lock. The stripes are merged when
+    the aggregator takes a checkpoint.
+    """
+
+    def __init__(self, empty):
+        self._empty = empty
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stripes = []
+
+    def get(self) -> _Stripe:
+        """Returns the stripe of the calling thread."""
+        try:
+            return self._local.stripe
+        except AttributeError:
+            stripe = _Stripe(self._empty)
+            self._local.stripe = stripe
+            with self._lock:
+                self._stripes.append(stripe)
+            return stripe
+
+    def collect(self) -> list:
+        """Returns and resets the partial aggregations of all threads."""
+        values = []
+        with self._lock:
+            alive = []
+            for stripe in self._stripes:
+                with stripe.lock:
+                    values.append(stripe.current)
+                    stripe.current = self._empty
+                # stripes of finished threads won't be updated anymore
+                if stripe.thread.is_alive():
+                    alive.append(stripe)
+            self._stripes = alive
+        return values
+
+
 class SumAggregator(Aggregator):
-    """Aggregator for counter metrics."""
+    """Aggregator for counter metrics.
+
+    If the ``per_thread`` config is set, each thread accumulates its own sum,
+    which are added up when taking a checkpoint. Until then, ``current`` only
+    contains the sum of previously merged values.
+    """
 
     def __init__(self, config=None):
         super().__init__(config=config)
         self.current = 0
         self.checkpoint = 0
+        self._stripes = None
+        if self.config.get("per_thread"):
+            self._stripes = _Stripes(0)
+            self.update = self._update_stripe
 
     def update(self, value):
         with self._lock:
             self.current += value
             super().update(value)
 
+    def _update_stripe(self, value):
+        stripe = self._stripes.get()
+        with stripe.lock:
+            stripe.current += value
+            super().update(value)
+
     def take_checkpoint(self):
         with self._lock:
+            # checkpointed is set before collecting the stripes, so that the
+            # values added to them afterwards mark the aggregator as updated
+            super().take_checkpoint()
+            if self._stripes is not None:
+                self.current += sum(self._stripes.collect())
             self.checkpoint = self.current
             self.current = 0
-            super().take_checkpoint()
+
+    def reset_checkpoint(self):
+        self.checkpoint = 0
+        super().reset_checkpoint()
 
     def merge(self, other):
         if self._verify_type(other):
@@ -103,7 +202,10 @@ class SumAggregator(Aggregator):
 
 
 class MinMaxSumCountAggregator(Aggregator):
-    """Aggregator for ValueRecorder metrics that keeps min, max, sum, count."""
+    """Aggregator for ValueRecorder metrics that keeps min, max, sum, count.
+
+    Supports the ``per_thread`` config like `SumAggregator`.
+    """
 
     _TYPE = namedtuple("minmaxsumcount", "min max sum count")
     _EMPTY = _TYPE(inf, -inf, 0, 0)
@@ -112,6 +214,10 @@ class MinMaxSumCountAggregator(Aggregator):
         super().__init__(config=config)
         self.current = self._EMPTY
         self.checkpoint = self._EMPTY
+        self._stripes = None
+        if self.config.get("per_thread"):
+            self._stripes = _Stripes(self._EMPTY)
+            self.update = self._update_stripe
 
     def update(self, value):
         with self._lock:
@@ -123,11 +229,36 @@ class MinMaxSumCountAggregator(Aggregator):
             )
             super().update(value)
 
+    def _update_stripe(self, value):
+        stripe = self._stripes.get()
+        with stripe.lock:
+            current = stripe.current
+            stripe.current = self._TYPE(
+                min(current.min, value),
+                max(current.max, value),
+                current.sum + value,
+                current.count + 1,
+            )
+            super().update(value)
+
     def take_checkpoint(self):
         with self._lock:
+            # see SumAggregator.take_checkpoint
+            super().take_checkpoint()
+            if self._stripes is not None:
+                for current in self._stripes.collect():
+                    self.current = self._TYPE(
+                        min(self.current.min, current.min),
+                        max(self.current.max, current.max),
+                        self.current.sum + current.sum,
+                        self.current.count + current.count,
+                    )
             self.checkpoint = self.current
             self.current = self._EMPTY
-            super().take_checkpoint()
+
+    def reset_checkpoint(self):
+        self.checkpoint = self._EMPTY
+        super().reset_checkpoint()
 
     def merge(self, other):
         if self._verify_type(other):
@@ -142,7 +273,12 @@ class MinMaxSumCountAggregator(Aggregator):
 
 
 class HistogramAggregator(Aggregator):
-    """Aggregator for ValueRecorder metrics that keeps a histogram of values."""
+    """Aggregator for ValueRecorder metrics that keeps a histogram of values.
+
+    The counts of each bucket are kept in lists indexed like the sorted
+    bucket bounds, so a value's bucket is found with a binary search.
+    `current` and `checkpoint` map each upper bound to its count.
+    """
 
     def __init__(self, config=None):
         super().__init__(config=config)
@@ -161,33 +297,91 @@ class HistogramAggregator(Aggregator):
                     " order. Using default."
                 )
 
-        self.current = OrderedDict([(bb, 0) for bb in bounds])
-        self.current[inf] = 0
-        self.checkpoint = OrderedDict([(bb, 0) for bb in bounds])
-        self.checkpoint[inf] = 0
+        self._bounds = tuple(bounds) + (inf,)
+        self._current_counts = [0] * len(self._bounds)
+        self._checkpoint_counts = [0] * len(self._bounds)
+
+    def _as_dict(self, counts):
+        return OrderedDict(zip(self._bounds, counts))
+
+    def _from_dict(self, buckets):
+        return [buckets.get(bound, 0) for bound in self._bounds]
+
+    @property
+    def current(self):
+        return self._as_dict(self._current_counts)
+
+    @current.setter
+    def current(self, buckets):
+        self._current_counts = self._from_dict(buckets)
+
+    @property
+    def checkpoint(self):
+        return self._as_dict(self._checkpoint_counts)
+
+    @checkpoint.setter
+    def checkpoint(self, buckets):
+        self._checkpoint_counts = self._from_dict(buckets)
 
     def update(self, value):
+        # find first bucket that value is less than, values that are not
+        # less than any bound (inf, nan) are not counted
+        index = bisect_right(self._bounds, value)
         with self._lock:
-            for bb in self.current.keys():
-                # find first bucket that value is less than
-                if value < bb:
-                    self.current[bb] += 1
-                    break
+            if index < len(self._bounds):
+                self._current_counts[index] += 1
             super().update(value)
 
+    def update_many(self, values):
+        """Updates the histogram with all the given values at once.
+
+        NumPy arrays are bucketed with vectorized operations.
+        """
+        bounds = self._bounds
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            if not values.size:
+                return
+            counts = numpy.bincount(
+                numpy.searchsorted(bounds, values, side="right"),
+                minlength=len(bounds) + 1,
+            )[: len(bounds)].tolist()
+        else:
+            counts = [0] * (len(bounds) + 1)
+            for value in values:
+                counts[bisect_right(bounds, value)] += 1
+            # the values not less than any bound (inf, nan) are not counted
+            del counts[-1]
+        if not any(counts):
+            # no value was counted
+            return
+        with self._lock:
+            self._current_counts = list(
+                map(add, self._current_counts, counts)
+            )
+            super().update(None)
+
     def take_checkpoint(self):
         with self._lock:
-            self.checkpoint = self.current.copy()
-            for bb in self.current.keys():
-                self.current[bb] = 0
+            self._checkpoint_counts = self._current_counts
+            self._current_counts = [0] * len(self._bounds)
             super().take_checkpoint()
 
+    def reset_checkpoint(self):
+        self._checkpoint_counts = [0] * len(self._bounds)
+        super().reset_checkpoint()
+
     def merge(self, other):
+        # pylint: disable=protected-access
         if self._verify_type(other):
             with self._lock:
-                if self.checkpoint.keys() == other.checkpoint.keys():
-                    for ii, bb in other.checkpoint.items():
-                        self.checkpoint[ii] += bb
+                if self._bounds == other._bounds:
+                    self._checkpoint_counts = list(
+                        map(
+                            add,
+                            self._checkpoint_counts,
+                            other._checkpoint_counts,
+                        )
+                    )
                     super().merge(other)
                 else:
                     logger.warning(
@@ -195,6 +389,468 @@ class HistogramAggregator(Aggregator):
                     )
 
 
+class ExponentialBuckets:
+    """A contiguous range of exponential histogram buckets.
+
+    ``counts[i]`` is the count of the bucket with index ``offset + i``.
+    """
+
+    __slots__ = ("offset", "counts")
+
+    def __init__(self, offset=0, counts=None):
+        self.offset = offset
+        self.counts = counts if counts is not None else []
+
+    def __repr__(self):
+        return "{}(offset={}, counts={})".format(
+            type(self).__name__, self.offset, self.counts
+        )
+
+    def __eq__(self, other):
+        return (self.offset, self.counts) == (other.offset, other.counts)
+
+    def copy(self):
+        return ExponentialBuckets(self.offset, list(self.counts))
+
+    @property
+    def end(self):
+        """The index after the last bucket."""
+        return self.offset + len(self.counts)
+
+    def increment(self, index, count=1):
+        if not self.counts:
+            self.offset = index
+            self.counts.append(count)
+        elif index < self.offset:
+            self.counts[:0] = [0] * (self.offset - index)
+            self.offset = index
+            self.counts[0] += count
+        elif index >= self.end:
+            self.counts.extend([0] * (index - self.end))
+            self.counts.append(count)
+        else:
+            self.counts[index - self.offset] += count
+
+    def downscale(self, change):
+        """Merges each ``2 ** change`` neighboring buckets."""
+        if change <= 0 or not self.counts:
+            return
+        offset = self.offset >> change
+        counts = [0] * (((self.end - 1) >> change) - offset + 1)
+        for index, count in enumerate(self.counts, self.offset):
+            counts[(index >> change) - offset] += count
+        self.offset = offset
+        self.counts = counts
+
+
+def _get_scale_change(buckets, low, high, max_size):
+    """Returns by how much the scale must be reduced for the buckets to also
+    span the indexes from ``low`` to ``high`` with at most ``max_size``
+    buckets.
+    """
+    if buckets.counts:
+        low = min(low, buckets.offset)
+        high = max(high, buckets.end - 1)
+    change = 0
+    while (high >> change) - (low >> change) + 1 > max_size:
+        change += 1
+    return change
+
+
+class ExponentialHistogram:
+    """The state of an `ExponentialHistogramAggregator`.
+
+    At a given ``scale``, the bucket boundaries are the powers of
+    ``base = 2 ** (2 ** -scale)`` and the positive bucket with index ``i``
+    counts the values in ``(base ** i, base ** (i + 1)]``. Negative values
+    are counted by their absolute value in the negative buckets.
+    """
+
+    __slots__ = (
+        "scale",
+        "zero_count",
+        "positive",
+        "negative",
+        "sum",
+        "count",
+        "min",
+        "max",
+    )
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.zero_count = 0
+        self.positive = ExponentialBuckets()
+        self.negative = ExponentialBuckets()
+        self.sum = 0
+        self.count = 0
+        self.min = inf
+        self.max = -inf
+
+    def copy(self):
+        histogram = ExponentialHistogram(self.scale)
+        histogram.zero_count = self.zero_count
+        histogram.positive = self.positive.copy()
+        histogram.negative = self.negative.copy()
+        histogram.sum = self.sum
+        histogram.count = self.count
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    def bucket_index(self, value):
+        """Returns the index of the bucket of a positive value."""
+        mantissa, exponent = frexp(value)
+        if mantissa == 0.5:
+            # exact powers of two are the upper bound of their bucket
+            if self.scale > 0:
+                return ((exponent - 1) << self.scale) - 1
+            return (exponent - 2) >> -self.scale
+        if self.scale > 0:
+            return ceil(log2(value) * (1 << self.scale)) - 1
+        return (exponent - 1) >> -self.scale
+
+    def bucket_bound(self, index):
+        """Returns the lower bound of the positive bucket ``index``."""
+        return 2.0 ** (index * 2.0 ** -self.scale)
+
+    def downscale(self, change):
+        if change > 0:
+            self.positive.downscale(change)
+            self.negative.downscale(change)
+            self.scale -= change
+
+    def to_explicit_buckets(self):
+        """Converts the histogram to explicit bucket bounds.
+
+        Returns the increasing upper bounds and the counts of the buckets,
+        with one more count than bounds for the values above the last bound.
+        """
+        bounds = []
+        counts = []
+        negative = self.negative
+        for index in range(negative.end - 1, negative.offset - 1, -1):
+            bounds.append(-self.bucket_bound(index))
+            counts.append(negative.counts[index - negative.offset])
+        bounds.append(0.0)
+        counts.append(self.zero_count)
+        positive = self.positive
+        for index in range(positive.offset, positive.end):
+            bounds.append(self.bucket_bound(index + 1))
+            counts.append(positive.counts[index - positive.offset])
+        counts.append(0)
+        return bounds, counts
+
+
+class ExponentialHistogramAggregator(Aggregator):
+    """Aggregator for ValueRecorder metrics that keeps a histogram of values
+    with exponentially growing buckets.
+
+    The histogram starts at the highest resolution (``max_scale`` config,
+    20 by default) and halves it whenever the recorded values would need
+    more than ``max_size`` positive or negative buckets (160 by default), so
+    its memory is bounded whatever the range of the values.
+
+    ``current`` and ``checkpoint`` are `ExponentialHistogram` instances.
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config=config)
+        self._max_size = self.config.get("max_size", 160)
+        self._max_scale = self.config.get("max_scale", 20)
+        if self._max_size < 2:
+            logger.warning("max_size must be at least 2. Using 2.")
+            self._max_size = 2
+        self.current = ExponentialHistogram(self._max_scale)
+        self.checkpoint = ExponentialHistogram(self._max_scale)
+
+    def update(self, value):
+        if not isfinite(value):
+            return
+        with self._lock:
+            histogram = self.current
+            if value == 0:
+                histogram.zero_count += 1
+            else:
+                if value > 0:
+                    buckets = histogram.positive
+                else:
+                    buckets = histogram.negative
+                index = histogram.bucket_index(abs(value))
+                if not buckets.offset <= index < buckets.end:
+                    change = _get_scale_change(
+                        buckets, index, index, self._max_size
+                    )
+                    if change:
+                        histogram.downscale(change)
+                        index = histogram.bucket_index(abs(value))
+                buckets.increment(index)
+
+            histogram.sum += value
+            histogram.count += 1
+            if value < histogram.min:
+                histogram.min = value
+            if value > histogram.max:
+                histogram.max = value
+            super().update(value)
+
+    def take_checkpoint(self):
+        with self._lock:
+            self.checkpoint = self.current
+            self.current = ExponentialHistogram(self._max_scale)
+            super().take_checkpoint()
+
+    def reset_checkpoint(self):
+        self.checkpoint = ExponentialHistogram(self._max_scale)
+        super().reset_checkpoint()
+
+    def merge(self, other):
+        if self._verify_type(other):
+            with self._lock:
+                histogram = self.checkpoint
+                other_histogram = other.checkpoint
+                histogram.downscale(histogram.scale - other_histogram.scale)
+                # other is not modified, its indexes are shifted when merged
+                other_change = other_histogram.scale - histogram.scale
+                change = 0
+                for buckets, other_buckets in (
+                    (histogram.positive, other_histogram.positive),
+                    (histogram.negative, other_histogram.negative),
+                ):
+                    if other_buckets.counts:
+                        change = max(
+                            change,
+                            _get_scale_change(
+                                buckets,
+                                other_buckets.offset >> other_change,
+                                (other_buckets.end - 1) >> other_change,
+                                self._max_size,
+                            ),
+                        )
+                histogram.downscale(change)
+                other_change += change
+
+                for buckets, other_buckets in (
+                    (histogram.positive, other_histogram.positive),
+                    (histogram.negative, other_histogram.negative),
+                ):
+                    for index, count in enumerate(
+                        other_buckets.counts, other_buckets.offset
+                    ):
+                        if count:
+                            buckets.increment(index >> other_change, count)
+
+                histogram.zero_count += other_histogram.zero_count
+                histogram.sum += other_histogram.sum
+                histogram.count += other_histogram.count
+                histogram.min = min(histogram.min, other_histogram.min)
+                histogram.max = max(histogram.max, other_histogram.max)
+                super().merge(other)
+
+
+class _SketchStore:
+    """The bucket counts of one sign of a `DDSketch`."""
+
+    __slots__ = ("counts", "collapse_index")
+
+    def __init__(self):
+        self.counts = {}
+        # once collapsed, the indexes below this one are counted in it
+        self.collapse_index = None
+
+    def add(self, index, count, max_buckets):
+        if self.collapse_index is not None and index < self.collapse_index:
+            index = self.collapse_index
+        counts = self.counts
+        if index in counts:
+            counts[index] += count
+            return
+        counts[index] = count
+        if len(counts) > max_buckets:
+            # merge the lowest buckets, which hold the values closest to zero
+            indexes = sorted(counts)
+            collapse_index = indexes[len(indexes) - max_buckets]
+            for lower_index in indexes[: len(indexes) - max_buckets]:
+                counts[collapse_index] += counts.pop(lower_index)
+            self.collapse_index = collapse_index
+
+
+class DDSketch:
+    """A quantile sketch with relative accuracy guarantees, based on
+    `DDSketch <https://arxiv.org/abs/1908.10693>`_.
+
+    Values are counted in buckets whose bounds are the powers of
+    ``gamma = (1 + relative_accuracy) / (1 - relative_accuracy)``, so any
+    quantile is estimated within ``relative_accuracy`` of its actual value as
+    long as at most ``max_buckets`` buckets per sign are needed. Beyond that,
+    the buckets closest to zero are merged so that the higher quantiles stay
+    accurate.
+    """
+
+    __slots__ = (
+        "gamma",
+        "max_buckets",
+        "_multiplier",
+        "zero_count",
+        "positive",
+        "negative",
+        "sum",
+        "count",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy, max_buckets):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.max_buckets = max_buckets
+        self._multiplier = 1 / log(self.gamma)
+        self.zero_count = 0
+        self.positive = _SketchStore()
+        self.negative = _SketchStore()
+        self.sum = 0
+        self.count = 0
+        self.min = inf
+        self.max = -inf
+
+    def add(self, value):
+        if value > 0:
+            self.positive.add(
+                ceil(log(value) * self._multiplier), 1, self.max_buckets
+            )
+        elif value < 0:
+            self.negative.add(
+                ceil(log(-value) * self._multiplier), 1, self.max_buckets
+            )
+        else:
+            self.zero_count += 1
+        self.sum += value
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Adds the values of a sketch with the same accuracy."""
+        for store, other_store in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for index, count in other_store.counts.items():
+                store.add(index, count, self.max_buckets)
+        self.zero_count += other.zero_count
+        self.sum += other.sum
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _bucket_value(self, index):
+        # the value with the same relative error to both bucket bounds
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, quantile):
+        """Returns the estimated value of a quantile between 0 and 1, or
+        None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if quantile <= 0:
+            return self.min
+        if quantile >= 1:
+            return self.max
+        rank = quantile * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative.counts, reverse=True):
+            seen += self.negative.counts[index]
+            if seen > rank:
+                return max(-self._bucket_value(index), self.min)
+        seen += self.zero_count
+        if seen > rank:
+            return 0
+        for index in sorted(self.positive.counts):
+            seen += self.positive.counts[index]
+            if seen > rank:
+                return min(self._bucket_value(index), self.max)
+        return self.max
+
+    def to_explicit_buckets(self):
+        """Converts the sketch to explicit bucket bounds.
+
+        Returns the increasing upper bounds and the counts of the buckets,
+        with one more count than bounds for the values above the last bound.
+        """
+        bounds = []
+        counts = []
+        for index in sorted(self.negative.counts, reverse=True):
+            bounds.append(-self.gamma ** (index - 1))
+            counts.append(self.negative.counts[index])
+        bounds.append(0.0)
+        counts.append(self.zero_count)
+        for index in sorted(self.positive.counts):
+            bounds.append(self.gamma ** index)
+            counts.append(self.positive.counts[index])
+        counts.append(0)
+        return bounds, counts
+
+
+class DDSketchAggregator(Aggregator):
+    """Aggregator for ValueRecorder metrics that keeps a `DDSketch` of the
+    values to estimate their quantiles.
+
+    The config accepts the ``relative_accuracy`` of the sketch (0.01 by
+    default), its ``max_buckets`` per sign (2048 by default) and the
+    ``quantiles`` reported by exporters (0.5, 0.9 and 0.99 by default).
+    Sketches are mergeable, so quantiles can be computed over values
+    aggregated by different processes.
+
+    ``current`` and ``checkpoint`` are `DDSketch` instances.
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config=config)
+        self._relative_accuracy = self.config.get("relative_accuracy", 0.01)
+        if not 0 < self._relative_accuracy < 1:
+            logger.warning(
+                "relative_accuracy must be between 0 and 1. Using 0.01."
+            )
+            self._relative_accuracy = 0.01
+        self._max_buckets = self.config.get("max_buckets", 2048)
+        self.quantiles = tuple(self.config.get("quantiles", (0.5, 0.9, 0.99)))
+        self.current = self._new_sketch()
+        self.checkpoint = self._new_sketch()
+
+    def _new_sketch(self):
+        return DDSketch(self._relative_accuracy, self._max_buckets)
+
+    def update(self, value):
+        if not isfinite(value):
+            return
+        with self._lock:
+            self.current.add(value)
+            super().update(value)
+
+    def take_checkpoint(self):
+        with self._lock:
+            self.checkpoint = self.current
+            self.current = self._new_sketch()
+            super().take_checkpoint()
+
+    def reset_checkpoint(self):
+        self.checkpoint = self._new_sketch()
+        super().reset_checkpoint()
+
+    def merge(self, other):
+        if self._verify_type(other):
+            with self._lock:
+                if self.checkpoint.gamma == other.checkpoint.gamma:
+                    self.checkpoint.merge(other.checkpoint)
+                    super().merge(other)
+                else:
+                    logger.warning(
+                        "Cannot merge sketches with different accuracies."
+                    )
+
+
 class LastValueAggregator(Aggregator):
     """Aggregator that stores last value results."""
 
@@ -214,6 +870,10 @@ class LastValueAggregator(Aggregator):
             self.current = None
             super().take_checkpoint()
 
+    def reset_checkpoint(self):
+        self.checkpoint = None
+        super().reset_checkpoint()
+
     def merge(self, other):
         last = self.checkpoint
         super().merge(other)
@@ -243,6 +903,11 @@ class ValueObserverAggregator(Aggregator):
         self.checkpoint = self._TYPE(*(self.mmsc.checkpoint + (self.current,)))
         super().take_checkpoint()
 
+    def reset_checkpoint(self):
+        self.mmsc.reset_checkpoint()
+        self.checkpoint = self._TYPE(None, None, None, 0, None)
+        super().reset_checkpoint()
+
     def merge(self, other):
         if self._verify_type(other):
             self.mmsc.merge(other.mmsc)
@@ -15,8 +15,17 @@
 from typing import Sequence
 
 from opentelemetry.sdk.metrics.export import ExportRecord
+from opentelemetry.sdk.metrics.export.aggregate import Aggregator
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.util import get_dict_as_key
+
+
+def _resets_checkpoint(aggregator: Aggregator) -> bool:
+    """Returns True if the class of the aggregator empties its checkpoint in
+    `Aggregator.reset_checkpoint`, which the base implementation can't do."""
+    return (
+        aggregator.__class__.reset_checkpoint
+        is not Aggregator.reset_checkpoint
+    )
 
 
 class Processor:
@@ -25,10 +34,19 @@ class Processor:
     The processor is responsible for storing the aggregators and aggregated
     values received from updates from metrics in the accumulator. The stored values
     will be sent to an exporter for exporting.
+
+    Stateless processors keep the aggregators of a collection after it is
+    finished, and reuse them for the records with the same keys in the next
+    one instead of creating new aggregators, if their class overrides
+    `Aggregator.reset_checkpoint`. Aggregators which were not used during a
+    collection are dropped when it is finished.
     """
 
     def __init__(self, stateful: bool, resource: Resource):
         self._batch_map = {}
+        # keys of the batch map processed during the current collection,
+        # only used by stateless processors
+        self._active_keys = set()
         # stateful=True indicates the processor computes checkpoints from over
         # the process lifetime. False indicates the processor computes
         # checkpoints which describe the updates of a single collection period
@@ -43,11 +61,12 @@ class Processor:
         data in all of the aggregators in this processor.
         """
         export_records = []
-        # pylint: disable=W0612
-        for (
-            (instrument, aggregator_type, _, labels),
-            aggregator,
-        ) in self._batch_map.items():
+        for key, aggregator in self._batch_map.items():
+            # aggregators kept from the previous collection but unused in
+            # this one have nothing to export
+            if not self.stateful and key not in self._active_keys:
+                continue
+            instrument, _, _, labels = key
             export_records.append(
                 ExportRecord(instrument, labels, aggregator, self._resource)
             )
@@ -56,10 +75,18 @@ class Processor:
     def finished_collection(self):
         """Performs certain post-export logic.
 
-        For processors that are stateless, resets the batch map.
+        For processors that are stateless, drops the aggregators which were
+        not used during the collection and marks the others for reuse.
         """
         if not self.stateful:
-            self._batch_map = {}
+            active_keys = self._active_keys
+            if len(active_keys) < len(self._batch_map):
+                self._batch_map = {
+                    key: aggregator
+                    for key, aggregator in self._batch_map.items()
+                    if key in active_keys
+                }
+            self._active_keys = set()
 
     def process(self, record) -> None:
         """Stores record information to be ready for exporting."""
@@ -74,12 +101,23 @@ class Processor:
         key = (
             record.instrument,
             aggregator.__class__,
-            get_dict_as_key(aggregator.config),
+            aggregator.config_key,
             record.labels,
         )
 
         batch_value = self._batch_map.get(key)
 
+        if not self.stateful:
+            if key not in self._active_keys:
+                self._active_keys.add(key)
+                if batch_value:
+                    if _resets_checkpoint(batch_value):
+                        # Reuse the aggregator of the previous collection
+                        batch_value.reset_checkpoint()
+                    else:
+                        # its checkpoint can't be emptied, so replace it
+                        batch_value = None
+
         if batch_value:
             # Update the stored checkpointed value if exists. The call to merge
             # here combines only identical records (same key).
@@ -42,6 +42,8 @@ class ViewData:
     def __init__(self, labels: Tuple[Tuple[str, str]], aggregator: Aggregator):
         self.labels = labels
         self.aggregator = aggregator
+        # number of bound instruments recording to this view data
+        self.ref_count = 0
 
     def record(self, value: ValueT):
         self.aggregator.update(value)
@@ -81,31 +83,38 @@ class View:
         if label_keys is None:
             label_keys = []
         self.label_keys = sorted(label_keys)
+        self._label_keys_set = frozenset(self.label_keys)
         self.view_config = view_config
-        self.view_datas = set()
+        # Map[Tuple[Tuple[str, str]], ViewData], keyed by the active labels
+        self.view_datas = {}
 
     def get_view_data(self, labels):
         """Find an existing ViewData for this set of labels. If that ViewData
             does not exist, create a new one to represent the labels
         """
-        active_labels = []
+        active_labels = self._get_active_labels(labels)
+        view_data = self.view_datas.get(active_labels)
+        if view_data is None:
+            view_data = self.view_datas.setdefault(
+                active_labels,
+                ViewData(
+                    active_labels, self.aggregator(self.aggregator_config)
+                ),
+            )
+        return view_data
+
+    def _get_active_labels(self, labels):
+        active_labels = ()
         if self.view_config == ViewConfig.LABEL_KEYS:
-            # reduce the set of labels to only labels specified in label_keys
-            active_labels = {
-                (lk, lv) for lk, lv in labels if lk in set(self.label_keys)
-            }
-            active_labels = tuple(active_labels)
+            # reduce the set of labels to only labels specified in label_keys,
+            # labels are sorted by key so the result is too
+            label_keys = self._label_keys_set
+            active_labels = tuple(
+                (lk, lv) for lk, lv in labels if lk in label_keys
+            )
         elif self.view_config == ViewConfig.UNGROUPED:
             active_labels = labels
-
-        for view_data in self.view_datas:
-            if view_data.labels == active_labels:
-                return view_data
-        new_view_data = ViewData(
-            active_labels, self.aggregator(self.aggregator_config)
-        )
-        self.view_datas.add(new_view_data)
-        return new_view_data
+        return active_labels
 
     # Uniqueness is based on metric, aggregator type, aggregator config,
     # ordered label keys and ViewConfig
@@ -162,10 +171,28 @@ class ViewManager:
             views = [default_view]
 
         for view in views:
-            view_datas.add(view.get_view_data(labels))
+            view_data = view.get_view_data(labels)
+            view_data.ref_count += 1
+            view_datas.add(view_data)
 
         return view_datas
 
+    def release_view_datas(self, metric, view_datas):
+        """Releases the view datas of a bound instrument which is removed.
+
+        The view datas which no bound instrument records to anymore are
+        removed from their views, their checkpoints have already been passed
+        to the processor.
+        """
+        for view_data in view_datas:
+            view_data.ref_count -= 1
+            if view_data.ref_count > 0:
+                continue
+            for view in self.views.get(metric, ()):
+                if view.view_datas.get(view_data.labels) is view_data:
+                    del view.view_datas[view_data.labels]
+                    break
+
 
 def get_default_aggregator(instrument: InstrumentT) -> Aggregator:
     """Returns an aggregator based on metric instrument's type.
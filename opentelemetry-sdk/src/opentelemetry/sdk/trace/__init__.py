@@ -16,6 +16,7 @@
 import abc
 import atexit
 import concurrent.futures
+import functools
 import json
 import logging
 import threading
@@ -26,6 +27,7 @@ from types import MappingProxyType, TracebackType
 from typing import (
     Any,
     Callable,
+    Iterable,
     Iterator,
     MutableSequence,
     Optional,
@@ -53,6 +55,9 @@ MAX_NUM_ATTRIBUTES = 1000
 MAX_NUM_EVENTS = 1000
 MAX_NUM_LINKS = 1000
 VALID_ATTR_VALUE_TYPES = (bool, str, int, float)
+_EMPTY_ATTRIBUTES = MappingProxyType({})
+_UNSET_STATUS = Status(StatusCode.UNSET)
+_SAMPLED_TRACE_FLAGS = trace_api.TraceFlags(trace_api.TraceFlags.SAMPLED)
 
 
 class SpanProcessor:
@@ -301,6 +306,44 @@ class Event(EventBase):
         return self._attributes
 
 
+# kinds of attribute values, see _get_attribute_value_kind
+_VALID_SCALAR = 0
+_SEQUENCE = 1
+_MUTABLE_SEQUENCE = 2
+_INVALID = 3
+
+# attribute value kinds by type, so that the ABC checks only run once per type
+_ATTRIBUTE_VALUE_KINDS = {
+    bool: _VALID_SCALAR,
+    str: _VALID_SCALAR,
+    int: _VALID_SCALAR,
+    float: _VALID_SCALAR,
+    tuple: _SEQUENCE,
+    list: _MUTABLE_SEQUENCE,
+}
+# bounds the cache in case types are created dynamically
+_MAX_ATTRIBUTE_VALUE_KINDS = 256
+
+
+def _get_attribute_value_kind(value_type: type) -> int:
+    """Classifies an attribute value type as a valid scalar, an immutable or
+    mutable sequence whose elements must be checked, or an invalid type.
+    """
+    kind = _ATTRIBUTE_VALUE_KINDS.get(value_type)
+    if kind is None:
+        if issubclass(value_type, VALID_ATTR_VALUE_TYPES):
+            kind = _VALID_SCALAR
+        elif issubclass(value_type, MutableSequence):
+            kind = _MUTABLE_SEQUENCE
+        elif issubclass(value_type, Sequence):
+            kind = _SEQUENCE
+        else:
+            kind = _INVALID
+        if len(_ATTRIBUTE_VALUE_KINDS) < _MAX_ATTRIBUTE_VALUE_KINDS:
+            _ATTRIBUTE_VALUE_KINDS[value_type] = kind
+    return kind
+
+
 def _is_valid_attribute_value(value: types.AttributeValue) -> bool:
     """Checks if attribute value is valid.
 
@@ -310,39 +353,10 @@ def _is_valid_attribute_value(value: types.AttributeValue) -> bool:
       - are not a sequence
     """
 
-    if isinstance(value, Sequence):
-        if len(value) == 0:
-            return True
-
-        sequence_first_valid_type = None
-        for element in value:
-            if element is None:
-                continue
-            element_type = type(element)
-            if element_type not in VALID_ATTR_VALUE_TYPES:
-                logger.warning(
-                    "Invalid type %s in attribute value sequence. Expected one of "
-                    "%s or None",
-                    element_type.__name__,
-                    [
-                        valid_type.__name__
-                        for valid_type in VALID_ATTR_VALUE_TYPES
-                    ],
-                )
-                return False
-            # The type of the sequence must be homogeneous. The first non-None
-            # element determines the type of the sequence
-            if sequence_first_valid_type is None:
-                sequence_first_valid_type = element_type
-            elif not isinstance(element, sequence_first_valid_type):
-                logger.warning(
-                    "Mixed types %s and %s in attribute value sequence",
-                    sequence_first_valid_type.__name__,
-                    type(element).__name__,
-                )
-                return False
-
-    elif not isinstance(value, VALID_ATTR_VALUE_TYPES):
+    kind = _get_attribute_value_kind(type(value))
+    if kind == _VALID_SCALAR:
+        return True
+    if kind == _INVALID:
         logger.warning(
             "Invalid type %s for attribute value. Expected one of %s or a "
             "sequence of those types",
@@ -350,19 +364,125 @@ def _is_valid_attribute_value(value: types.AttributeValue) -> bool:
             [valid_type.__name__ for valid_type in VALID_ATTR_VALUE_TYPES],
         )
         return False
+
+    sequence_first_valid_type = None
+    for element in value:
+        if element is None:
+            continue
+        element_type = type(element)
+        # homogeneous sequences only need the identity check
+        if element_type is sequence_first_valid_type:
+            continue
+        if element_type not in VALID_ATTR_VALUE_TYPES:
+            logger.warning(
+                "Invalid type %s in attribute value sequence. Expected one of "
+                "%s or None",
+                element_type.__name__,
+                [valid_type.__name__ for valid_type in VALID_ATTR_VALUE_TYPES],
+            )
+            return False
+        # The type of the sequence must be homogeneous. The first non-None
+        # element determines the type of the sequence
+        if sequence_first_valid_type is None:
+            sequence_first_valid_type = element_type
+        elif not isinstance(element, sequence_first_valid_type):
+            logger.warning(
+                "Mixed types %s and %s in attribute value sequence",
+                sequence_first_valid_type.__name__,
+                element_type.__name__,
+            )
+            return False
     return True
 
 
 def _filter_attribute_values(attributes: types.Attributes):
     if attributes:
         for attr_key, attr_value in list(attributes.items()):
+            kind = _get_attribute_value_kind(type(attr_value))
+            if kind == _VALID_SCALAR:
+                continue
             if _is_valid_attribute_value(attr_value):
-                if isinstance(attr_value, MutableSequence):
+                if kind == _MUTABLE_SEQUENCE:
                     attributes[attr_key] = tuple(attr_value)
             else:
                 attributes.pop(attr_key)
 
 
+# returned by _clean_attribute for attributes that must not be set
+_INVALID_ATTRIBUTE = object()
+
+
+def _clean_attribute(
+    key: str, value: types.AttributeValue, trusted: bool = False
+) -> types.AttributeValue:
+    """Validates an attribute set on a span and returns the value to store,
+    or `_INVALID_ATTRIBUTE` if the attribute must be ignored.
+    """
+    if not trusted and not _is_valid_attribute_value(value):
+        return _INVALID_ATTRIBUTE
+
+    if not key:
+        logger.warning("invalid key (empty or null)")
+        return _INVALID_ATTRIBUTE
+
+    # Freeze mutable sequences defensively
+    kind = _get_attribute_value_kind(type(value))
+    if kind == _MUTABLE_SEQUENCE:
+        value = tuple(value)
+    elif kind == _SEQUENCE and isinstance(value, bytes):
+        try:
+            value = value.decode()
+        except ValueError:
+            logger.warning("Byte attribute could not be decoded.")
+            return _INVALID_ATTRIBUTE
+    return value
+
+
+def _clean_attributes(
+    items: Iterable[Tuple[str, types.AttributeValue]], trusted: bool = False
+) -> Tuple[Tuple[str, types.AttributeValue], ...]:
+    """Returns the attributes of ``items`` to store, see `_clean_attribute`."""
+    cleaned = []
+    for key, value in items:
+        value = _clean_attribute(key, value, trusted)
+        if value is not _INVALID_ATTRIBUTE:
+            cleaned.append((key, value))
+    return tuple(cleaned)
+
+
+class _AttributeSetCache:
+    """Interns the validated form of frequently repeated attribute sets,
+    keeping the ``maxsize`` most recently used ones.
+
+    Only attribute sets whose values are all of the scalar types in
+    `VALID_ATTR_VALUE_TYPES` are interned, as equal values of different types
+    (e.g. ``1`` and ``True``) must not share an entry.
+    """
+
+    def __init__(self, maxsize: int):
+        self._clean = functools.lru_cache(maxsize=maxsize)(self._clean_key)
+
+    @staticmethod
+    def _clean_key(key):
+        return _clean_attributes(
+            (attr_key, value) for attr_key, _, value in key
+        )
+
+    def get(
+        self, attributes: types.Attributes
+    ) -> Optional[Tuple[Tuple[str, types.AttributeValue], ...]]:
+        """Returns the attributes to store for ``attributes``, or `None` if
+        they can't be interned.
+        """
+        key = []
+        for attr_key, value in attributes.items():
+            value_type = type(value)
+            if value_type not in VALID_ATTR_VALUE_TYPES:
+                return None
+            key.append((attr_key, value_type, value))
+        return self._clean(tuple(key))
+
+
 def _create_immutable_attributes(attributes):
     return MappingProxyType(attributes.copy() if attributes else {})
 
@@ -401,8 +521,36 @@ class Span(trace_api.Span):
         links: Links to other spans to be exported
         span_processor: `SpanProcessor` to invoke when starting and ending
             this `Span`.
+        trusted_attributes: Whether the attribute values given to this `Span`
+            are known to be valid, in which case they are not validated.
+        attribute_sets: Cache of interned attribute sets used by
+            `set_attributes`.
     """
 
+    __slots__ = (
+        "name",
+        "context",
+        "parent",
+        "sampler",
+        "trace_config",
+        "resource",
+        "kind",
+        "_record_exception",
+        "_set_status_on_exception",
+        "_trusted_attributes",
+        "_attribute_sets",
+        "span_processor",
+        "status",
+        "_lock",
+        "_attributes",
+        "_events",
+        "_links",
+        "_end_time",
+        "_start_time",
+        "instrumentation_info",
+        "__weakref__",
+    )
+
     def __new__(cls, *args, **kwargs):
         if cls is Span:
             raise TypeError("Span must be instantiated via a tracer.")
@@ -425,6 +573,8 @@ class Span(trace_api.Span):
         instrumentation_info: InstrumentationInfo = None,
         record_exception: bool = True,
         set_status_on_exception: bool = True,
+        trusted_attributes: bool = False,
+        attribute_sets: Optional[_AttributeSetCache] = None,
     ) -> None:
 
         self.name = name
@@ -436,33 +586,42 @@ class Span(trace_api.Span):
         self.kind = kind
         self._record_exception = record_exception
         self._set_status_on_exception = set_status_on_exception
+        self._trusted_attributes = trusted_attributes
+        self._attribute_sets = attribute_sets
 
         self.span_processor = span_processor
-        self.status = Status(StatusCode.UNSET)
+        self.status = _UNSET_STATUS
+        # the attributes, events and links containers share this lock and are
+        # only created once there is something to put in them
         self._lock = threading.Lock()
 
-        _filter_attribute_values(attributes)
+        if not trusted_attributes:
+            _filter_attribute_values(attributes)
         if not attributes:
-            self.attributes = self._new_attributes()
+            self._attributes = None  # type: Optional[BoundedDict]
         else:
-            self.attributes = BoundedDict.from_map(
-                MAX_NUM_ATTRIBUTES, attributes
+            self._attributes = BoundedDict.from_map(
+                MAX_NUM_ATTRIBUTES, attributes, self._lock
             )
 
-        self.events = self._new_events()
+        self._events = None  # type: Optional[BoundedList]
         if events:
+            self._events = self._new_events()
             for event in events:
-                _filter_attribute_values(event.attributes)
+                if not trusted_attributes:
+                    _filter_attribute_values(event.attributes)
                 # pylint: disable=protected-access
                 event._attributes = _create_immutable_attributes(
                     event.attributes
                 )
-                self.events.append(event)
+                self._events.append(event)
 
-        if links is None:
-            self.links = self._new_links()
+        if not links:
+            self._links = None  # type: Optional[BoundedList]
         else:
-            self.links = BoundedList.from_seq(MAX_NUM_LINKS, links)
+            self._links = BoundedList.from_seq(
+                MAX_NUM_LINKS, links, self._lock
+            )
 
         self._end_time = None  # type: Optional[int]
         self._start_time = None  # type: Optional[int]
@@ -476,22 +635,34 @@ class Span(trace_api.Span):
     def end_time(self):
         return self._end_time
 
+    @property
+    def attributes(self) -> types.Attributes:
+        if self._attributes is None:
+            return _EMPTY_ATTRIBUTES
+        return self._attributes
+
+    @property
+    def events(self) -> Sequence[EventBase]:
+        if self._events is None:
+            return ()
+        return self._events
+
+    @property
+    def links(self) -> Sequence[trace_api.Link]:
+        if self._links is None:
+            return ()
+        return self._links
+
     def __repr__(self):
         return '{}(name="{}", context={})'.format(
             type(self).__name__, self.name, self.context
         )
 
-    @staticmethod
-    def _new_attributes():
-        return BoundedDict(MAX_NUM_ATTRIBUTES)
+    def _new_attributes(self):
+        return BoundedDict(MAX_NUM_ATTRIBUTES, self._lock)
 
-    @staticmethod
-    def _new_events():
-        return BoundedList(MAX_NUM_EVENTS)
-
-    @staticmethod
-    def _new_links():
-        return BoundedList(MAX_NUM_LINKS)
+    def _new_events(self):
+        return BoundedList(MAX_NUM_EVENTS, self._lock)
 
     @staticmethod
     def _format_context(context):
@@ -574,32 +745,49 @@ class Span(trace_api.Span):
         return self.context
 
     def set_attribute(self, key: str, value: types.AttributeValue) -> None:
-        if not _is_valid_attribute_value(value):
+        value = _clean_attribute(key, value, self._trusted_attributes)
+        if value is _INVALID_ATTRIBUTE:
             return
 
-        if not key:
-            logger.warning("invalid key (empty or null)")
+        with self._lock:
+            if self.end_time is not None:
+                logger.warning("Setting attribute on ended span.")
+                return
+
+            if self._attributes is None:
+                self._attributes = self._new_attributes()
+            # pylint: disable=protected-access
+            self._attributes._set(key, value)
+
+    def set_attributes(self, attributes: types.Attributes) -> None:
+        if not attributes:
             return
 
+        items = None
+        if self._attribute_sets is not None:
+            items = self._attribute_sets.get(attributes)
+        if items is None:
+            items = _clean_attributes(
+                attributes.items(), self._trusted_attributes
+            )
+
         with self._lock:
             if self.end_time is not None:
                 logger.warning("Setting attribute on ended span.")
                 return
 
-            # Freeze mutable sequences defensively
-            if isinstance(value, MutableSequence):
-                value = tuple(value)
-            if isinstance(value, bytes):
-                try:
-                    value = value.decode()
-                except ValueError:
-                    logger.warning("Byte attribute could not be decoded.")
-                    return
-            self.attributes[key] = value
+            if self._attributes is None:
+                self._attributes = self._new_attributes()
+            for key, value in items:
+                # pylint: disable=protected-access
+                self._attributes._set(key, value)
 
     @_check_span_ended
     def _add_event(self, event: EventBase) -> None:
-        self.events.append(event)
+        if self._events is None:
+            self._events = self._new_events()
+        # pylint: disable=protected-access
+        self._events._append(event)
 
     def add_event(
         self,
@@ -607,7 +795,8 @@ class Span(trace_api.Span):
         attributes: types.Attributes = None,
         timestamp: Optional[int] = None,
     ) -> None:
-        _filter_attribute_values(attributes)
+        if not self._trusted_attributes:
+            _filter_attribute_values(attributes)
         attributes = _create_immutable_attributes(attributes)
         self._add_event(
             Event(
@@ -718,6 +907,8 @@ class _Span(Span):
     This constructor should only be used internally.
     """
 
+    __slots__ = ()
+
 
 class Tracer(trace_api.Tracer):
     """See `opentelemetry.trace.Tracer`.
@@ -732,12 +923,16 @@ class Tracer(trace_api.Tracer):
         ],
         ids_generator: trace_api.IdsGenerator,
         instrumentation_info: InstrumentationInfo,
+        trusted_attributes: bool = False,
+        attribute_sets: Optional[_AttributeSetCache] = None,
     ) -> None:
         self.sampler = sampler
         self.resource = resource
         self.span_processor = span_processor
         self.ids_generator = ids_generator
         self.instrumentation_info = instrumentation_info
+        self.trusted_attributes = trusted_attributes
+        self.attribute_sets = attribute_sets
 
     def start_as_current_span(
         self,
@@ -789,11 +984,9 @@ class Tracer(trace_api.Tracer):
         if parent_span_context is None or not parent_span_context.is_valid:
             parent_span_context = None
             trace_id = self.ids_generator.generate_trace_id()
-            trace_flags = None
             trace_state = None
         else:
             trace_id = parent_span_context.trace_id
-            trace_flags = parent_span_context.trace_flags
             trace_state = parent_span_context.trace_state
 
         # The sampler decides whether to create a real or no-op span at the
@@ -804,40 +997,42 @@ class Tracer(trace_api.Tracer):
         sampling_result = self.sampler.should_sample(
             context, trace_id, name, attributes, links, trace_state
         )
+        decision = sampling_result.decision
 
-        trace_flags = (
-            trace_api.TraceFlags(trace_api.TraceFlags.SAMPLED)
-            if sampling_result.decision.is_sampled()
-            else trace_api.TraceFlags(trace_api.TraceFlags.DEFAULT)
-        )
         span_context = trace_api.SpanContext(
             trace_id,
             self.ids_generator.generate_span_id(),
             is_remote=False,
-            trace_flags=trace_flags,
+            trace_flags=_SAMPLED_TRACE_FLAGS
+            if decision.is_sampled()
+            else trace_api.DEFAULT_TRACE_OPTIONS,
             trace_state=sampling_result.trace_state,
         )
 
-        # Only record if is_recording() is true
-        if sampling_result.decision.is_recording():
-            # pylint:disable=protected-access
-            span = _Span(
-                name=name,
-                context=span_context,
-                parent=parent_span_context,
-                sampler=self.sampler,
-                resource=self.resource,
-                attributes=sampling_result.attributes.copy(),
-                span_processor=self.span_processor,
-                kind=kind,
-                links=links,
-                instrumentation_info=self.instrumentation_info,
-                record_exception=record_exception,
-                set_status_on_exception=set_status_on_exception,
-            )
-            span.start(start_time=start_time, parent_context=context)
-        else:
-            span = trace_api.DefaultSpan(context=span_context)
+        # Only record if is_recording() is true. Other spans only propagate
+        # their context, so they don't need anything else from the sampling
+        # result.
+        if not decision.is_recording():
+            return trace_api.DefaultSpan(context=span_context)
+
+        # pylint:disable=protected-access
+        span = _Span(
+            name=name,
+            context=span_context,
+            parent=parent_span_context,
+            sampler=self.sampler,
+            resource=self.resource,
+            attributes=sampling_result.attributes.copy(),
+            span_processor=self.span_processor,
+            kind=kind,
+            links=links,
+            instrumentation_info=self.instrumentation_info,
+            record_exception=record_exception,
+            set_status_on_exception=set_status_on_exception,
+            trusted_attributes=self.trusted_attributes,
+            attribute_sets=self.attribute_sets,
+        )
+        span.start(start_time=start_time, parent_context=context)
         return span
 
     @contextmanager
@@ -880,6 +1075,19 @@ class Tracer(trace_api.Tracer):
 
 
 class TracerProvider(trace_api.TracerProvider):
+    """See `opentelemetry.trace.TracerProvider`.
+
+    Attribute values are validated on every span operation. Instrumentations
+    that already guarantee valid, immutable attribute values can skip this
+    validation by listing their ``instrumenting_module_name`` in
+    ``trusted_instrumentations``.
+
+    If ``max_interned_attribute_sets`` is positive, the validated form of up
+    to that many attribute sets passed to `Span.set_attributes` is cached, so
+    that repeated sets, e.g. the same HTTP method and peer name, are only
+    validated once.
+    """
+
     def __init__(
         self,
         sampler: sampling.Sampler = sampling.DEFAULT_ON,
@@ -889,6 +1097,8 @@ class TracerProvider(trace_api.TracerProvider):
             SynchronousMultiSpanProcessor, ConcurrentMultiSpanProcessor
         ] = None,
         ids_generator: trace_api.IdsGenerator = None,
+        trusted_instrumentations: Sequence[str] = (),
+        max_interned_attribute_sets: int = 0,
     ):
         self._active_span_processor = (
             active_span_processor or SynchronousMultiSpanProcessor()
@@ -899,6 +1109,12 @@ class TracerProvider(trace_api.TracerProvider):
             self.ids_generator = ids_generator
         self.resource = resource
         self.sampler = sampler
+        self.trusted_instrumentations = frozenset(trusted_instrumentations)
+        self._attribute_sets = None  # type: Optional[_AttributeSetCache]
+        if max_interned_attribute_sets > 0:
+            self._attribute_sets = _AttributeSetCache(
+                max_interned_attribute_sets
+            )
         self._atexit_handler = None
         if shutdown_on_exit:
             self._atexit_handler = atexit.register(self.shutdown)
@@ -919,6 +1135,8 @@ class TracerProvider(trace_api.TracerProvider):
             InstrumentationInfo(
                 instrumenting_module_name, instrumenting_library_version
             ),
+            instrumenting_module_name in self.trusted_instrumentations,
+            self._attribute_sets,
         )
 
     def add_span_processor(self, span_processor: SpanProcessor) -> None:
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import collections
+import concurrent.futures
+import itertools
 import logging
 import os
 import sys
@@ -20,10 +22,11 @@ import threading
 import typing
 from enum import Enum
 
+from opentelemetry import metrics as metrics_api
 from opentelemetry.configuration import Configuration
 from opentelemetry.context import Context, attach, detach, set_value
 from opentelemetry.sdk.trace import Span, SpanProcessor
-from opentelemetry.util import time_ns
+from opentelemetry.util import time_ns, types
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +62,91 @@ class SpanExporter:
         Called when the SDK is shut down.
         """
 
+    def cancel_retries(self) -> None:
+        """Makes the exports in progress and all the next ones give up
+        instead of waiting to retry.
+
+        Called by `BatchExportSpanProcessor` when it shuts down, before it
+        exports the remaining spans and shuts the exporter down. The call is
+        final, the exporter is not expected to retry exports afterwards.
+        """
+
+    def estimate_encoded_size(self, span: Span) -> int:
+        """Returns an estimate of the number of bytes the span takes once
+        encoded by this exporter.
+
+        `BatchExportSpanProcessor` uses it to keep batches within
+        ``max_export_batch_bytes``. Exporters should override it if their
+        encoding differs significantly from the default estimate of
+        `estimate_span_size`.
+        """
+        return estimate_span_size(span)
+
+
+# encoded size of the fields every span has: ids, timestamps, kind, status
+# and message framing
+_SPAN_OVERHEAD_BYTES = 64
+_EVENT_OVERHEAD_BYTES = 16
+_LINK_OVERHEAD_BYTES = 32
+_ATTRIBUTE_OVERHEAD_BYTES = 7
+_NUMERIC_ATTRIBUTE_BYTES = 8
+
+
+def _estimate_attribute_value_size(value: types.AttributeValue) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return _NUMERIC_ATTRIBUTE_BYTES
+    if isinstance(value, (tuple, list)):
+        return sum(
+            _estimate_attribute_value_size(element) + 2 for element in value
+        )
+    return len(str(value))
+
+
+def estimate_attributes_size(attributes: types.Attributes) -> int:
+    """Estimates the number of bytes of encoded span, event or link
+    attributes.
+    """
+    if not attributes:
+        return 0
+    return sum(
+        len(key)
+        + _estimate_attribute_value_size(value)
+        + _ATTRIBUTE_OVERHEAD_BYTES
+        for key, value in attributes.items()
+    )
+
+
+def estimate_span_size(span: Span) -> int:
+    """Estimates the number of bytes of a span in a binary encoding such as
+    OTLP protobuf or Jaeger thrift.
+
+    The estimate accounts for the span name, attributes, events and links,
+    but not for the resource, which most encodings share across the spans of
+    a batch.
+    """
+    size = (
+        _SPAN_OVERHEAD_BYTES
+        + len(span.name)
+        + estimate_attributes_size(span.attributes)
+    )
+    for event in span.events:
+        size += (
+            _EVENT_OVERHEAD_BYTES
+            + len(event.name)
+            + estimate_attributes_size(event.attributes)
+        )
+    for link in span.links:
+        size += _LINK_OVERHEAD_BYTES + estimate_attributes_size(
+            link.attributes
+        )
+    return size
+
 
 class SimpleExportSpanProcessor(SpanProcessor):
     """Simple SpanProcessor implementation.
@@ -104,11 +192,328 @@ class _FlushRequest:
         self.num_spans = 0
 
 
+BatchExportSpanProcessorStats = collections.namedtuple(
+    "BatchExportSpanProcessorStats",
+    [
+        "spans_enqueued",
+        "spans_dropped",
+        "spans_exported",
+        "spans_failed",
+        "batches_exported",
+        "queue_size",
+    ],
+)
+BatchExportSpanProcessorStats.__doc__ = """Snapshot of the counters of a
+`BatchExportSpanProcessor`.
+
+Args:
+    spans_enqueued: Number of sampled spans handed to the processor.
+    spans_dropped: Number of spans dropped because the queue was full.
+    spans_exported: Number of spans passed to a successful export call.
+    spans_failed: Number of spans passed to a failed export call.
+    batches_exported: Number of export calls made.
+    queue_size: Number of spans waiting in the queue.
+"""
+
+# histogram bucket bounds for the export latency in milliseconds
+_EXPORT_DURATION_BOUNDS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class _SpanQueue:
+    """Bounded FIFO of ended spans shared by all producer threads.
+
+    When the queue is full the oldest span is dropped to make room for the new
+    one.
+    """
+
+    __slots__ = ("_deque", "_requeued")
+
+    def __init__(self, maxlen: int):
+        self._deque = collections.deque([], maxlen)  # type: typing.Deque[Span]
+        # spans put back by the consumer, only accessed by the consumer
+        self._requeued = collections.deque()  # type: typing.Deque[Span]
+
+    def __len__(self) -> int:
+        return len(self._deque) + len(self._requeued)
+
+    def approximate_size(self) -> int:
+        return len(self._deque)
+
+    def put(self, span: Span) -> bool:
+        """Adds a span to the queue, returns `False` if a span was dropped."""
+        dropped = len(self._deque) == self._deque.maxlen
+        self._deque.appendleft(span)
+        return not dropped
+
+    def drain(
+        self, spans_list: typing.List[typing.Optional[Span]], max_spans: int
+    ) -> int:
+        """Moves at most max_spans spans into spans_list, oldest first, and
+        returns the number of moved spans.
+
+        Must only be called from a single consumer thread.
+        """
+        idx = 0
+        while idx < max_spans and self._requeued:
+            spans_list[idx] = self._requeued.popleft()
+            idx += 1
+        while idx < max_spans and self._deque:
+            spans_list[idx] = self._deque.pop()
+            idx += 1
+        return idx
+
+    def requeue(self, spans: typing.Sequence[Span]) -> None:
+        """Puts drained spans back so that the next drain returns them first.
+
+        The put back spans don't count against ``maxlen``. Must only be called
+        from a single consumer thread.
+        """
+        self._requeued.extendleft(reversed(spans))
+
+
+class _SpanQueueShard:
+    """Spans ended by a single producer thread."""
+
+    __slots__ = ("spans", "owner")
+
+    def __init__(self, owner: threading.Thread):
+        self.spans = collections.deque()  # type: typing.Deque[Span]
+        self.owner = owner
+
+
+class _ShardedSpanQueue:
+    """Bounded span queue with one shard per producer thread.
+
+    Producers only append to the shard owned by their thread, so `put` never
+    takes a shared lock: `collections.deque` appends and pops are atomic and
+    the single consumer drains all shards in bulk.
+
+    The number of queued spans is the difference between a ticket counter
+    incremented by producers for every accepted span and a counter of spans
+    taken by the consumer. Producers publish their ticket without
+    synchronization, so the ``maxlen`` bound may be exceeded transiently by at
+    most one span per concurrent producer. When the queue is full the oldest
+    span of the producer's shard is dropped to make room for the new one.
+    """
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._local = threading.local()
+        self._shards = []  # type: typing.List[_SpanQueueShard]
+        self._shards_lock = threading.Lock()
+        self._tickets = itertools.count(1)
+        # last ticket handed out to a producer
+        self._accepted = 0
+        # number of spans taken by the consumer, only written by the consumer
+        self._taken = 0
+        # shard the next drain starts from, so that no shard starves
+        self._next_shard = 0
+        # spans put back by the consumer, only accessed by the consumer
+        self._requeued = collections.deque()  # type: typing.Deque[Span]
+
+    def __len__(self) -> int:
+        return len(self._requeued) + sum(
+            len(shard.spans) for shard in self._shards
+        )
+
+    def approximate_size(self) -> int:
+        return max(self._accepted - self._taken, 0)
+
+    def _add_shard(self) -> _SpanQueueShard:
+        shard = _SpanQueueShard(threading.current_thread())
+        with self._shards_lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def put(self, span: Span) -> bool:
+        """Adds a span to the queue, returns `False` if a span was dropped."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._add_shard()
+
+        if self._accepted - self._taken >= self.maxlen:
+            try:
+                shard.spans.popleft()
+            except IndexError:
+                # the consumer emptied this shard meanwhile, drop the new span
+                return False
+            shard.spans.append(span)
+            return False
+
+        self._accepted = next(self._tickets)
+        shard.spans.append(span)
+        return True
+
+    def drain(
+        self, spans_list: typing.List[typing.Optional[Span]], max_spans: int
+    ) -> int:
+        """Moves at most max_spans spans into spans_list and returns the
+        number of moved spans.
+
+        Spans of a single producer thread keep their order. Must only be
+        called from a single consumer thread.
+        """
+        idx = 0
+        while idx < max_spans and self._requeued:
+            spans_list[idx] = self._requeued.popleft()
+            idx += 1
+
+        shards = self._shards[:]
+        num_shards = len(shards)
+        stale = []
+        for offset in range(num_shards):
+            shard = shards[(self._next_shard + offset) % num_shards]
+            spans = shard.spans
+            while idx < max_spans and spans:
+                spans_list[idx] = spans.popleft()
+                idx += 1
+            if idx == max_spans:
+                self._next_shard = (self._next_shard + offset) % num_shards
+                break
+            if not shard.owner.is_alive() and not spans:
+                stale.append(shard)
+
+        self._taken += idx
+        if stale:
+            with self._shards_lock:
+                for shard in stale:
+                    self._shards.remove(shard)
+        return idx
+
+    def requeue(self, spans: typing.Sequence[Span]) -> None:
+        """Puts drained spans back so that the next drain returns them first.
+
+        Must only be called from a single consumer thread.
+        """
+        self._requeued.extendleft(reversed(spans))
+        self._taken -= len(spans)
+
+
+class _AdaptiveSchedule:
+    """Tunes the delay between exports and the queue size at which producers
+    wake up the worker thread.
+
+    The delay is the time it takes to fill a batch at the observed span
+    arrival rate, bounded by ``min_delay`` and ``max_delay`` seconds. The
+    wake-up threshold leaves room in the queue for the spans that arrive
+    while the worker wakes up and exports a batch, and is at most one batch.
+    """
+
+    __slots__ = (
+        "min_delay",
+        "max_delay",
+        "max_queue_size",
+        "max_export_batch_size",
+        "arrival_rate",
+        "export_latency",
+        "delay",
+        "wakeup_threshold",
+        "_last_enqueued",
+        "_last_update",
+    )
+
+    # weight of a new export latency sample
+    _LATENCY_WEIGHT = 0.2
+
+    def __init__(
+        self,
+        min_delay: float,
+        max_delay: float,
+        max_queue_size: int,
+        max_export_batch_size: int,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.max_export_batch_size = max_export_batch_size
+        # spans per second
+        self.arrival_rate = 0.0
+        # seconds
+        self.export_latency = 0.0
+        self.delay = max_delay
+        self.wakeup_threshold = max_export_batch_size
+        self._last_enqueued = 0
+        self._last_update = time_ns()
+
+    def record_export(self, duration: float) -> None:
+        """Takes the duration of an export call in seconds into account."""
+        self.export_latency += self._LATENCY_WEIGHT * (
+            duration - self.export_latency
+        )
+
+    def update(self, num_enqueued: int, now: int) -> None:
+        """Recomputes the delay and the wake-up threshold given the total
+        number of enqueued spans at ``now`` nanoseconds.
+        """
+        elapsed = (now - self._last_update) / 1e9
+        if elapsed <= 0:
+            return
+        rate = (num_enqueued - self._last_enqueued) / elapsed
+        self._last_enqueued = num_enqueued
+        self._last_update = now
+
+        # follow bursts right away but let the rate decay by halves, so that
+        # the delay backs off exponentially once the traffic stops
+        if rate >= self.arrival_rate:
+            self.arrival_rate = rate
+        else:
+            self.arrival_rate = (self.arrival_rate + rate) / 2
+
+        if self.arrival_rate > 0:
+            delay = self.max_export_batch_size / self.arrival_rate
+        else:
+            delay = self.max_delay
+        self.delay = min(max(delay, self.min_delay), self.max_delay)
+
+        headroom = self.arrival_rate * (self.export_latency + self.min_delay)
+        self.wakeup_threshold = max(
+            1,
+            min(
+                self.max_export_batch_size,
+                int(self.max_queue_size - headroom),
+            ),
+        )
+
+
 class BatchExportSpanProcessor(SpanProcessor):
     """Batch span processor implementation.
 
     BatchExportSpanProcessor is an implementation of `SpanProcessor` that
     batches ended spans and pushes them to the configured `SpanExporter`.
+
+    If ``sharded_queue`` is `True`, every thread ending spans writes to its
+    own queue shard without taking a lock, and the worker thread drains all
+    shards in bulk. This avoids lock contention when many threads end spans
+    concurrently, at the cost of spans from different threads not being
+    exported in the order they ended.
+
+    If ``max_concurrent_exports`` is greater than one, the worker thread hands
+    batches over to a pool of that many export threads instead of calling
+    the exporter itself, so that a slow export does not stall draining the
+    queue. At most ``max_concurrent_exports`` batches are in flight at a time,
+    the worker waits for a free slot otherwise. The exporter must support
+    concurrent calls to `SpanExporter.export` in this mode, and batches may
+    complete out of order. `force_flush` and `shutdown` wait for all batches
+    in flight.
+
+    If ``max_export_batch_bytes`` is set, batches are also cut so that the
+    sum of the encoded span sizes reported by
+    `SpanExporter.estimate_encoded_size` stays within that many bytes. A span
+    that exceeds the budget on its own is exported in a batch of its own.
+
+    If ``adaptive_schedule`` is `True`, the delay between exports and the
+    queue size at which the worker thread is woken up early are tuned from the
+    observed span arrival rate and export latency. The delay is kept between
+    ``min_schedule_delay_millis`` and ``schedule_delay_millis``: spans are
+    exported sooner under load, while idle periods keep waking up the worker
+    at most every ``schedule_delay_millis``.
+
+    The processor counts enqueued, dropped, exported and failed spans, see
+    `stats`. If a ``meter`` is given, these counts are also reported through
+    observers created with it, along with the export latency and batch size.
+    With an SDK meter, the latter two are aggregated as histograms.
     """
 
     def __init__(
@@ -118,6 +523,12 @@ class BatchExportSpanProcessor(SpanProcessor):
         schedule_delay_millis: float = None,
         max_export_batch_size: int = None,
         export_timeout_millis: float = None,
+        sharded_queue: bool = None,
+        meter: typing.Optional[metrics_api.Meter] = None,
+        max_concurrent_exports: int = None,
+        max_export_batch_bytes: int = None,
+        adaptive_schedule: bool = None,
+        min_schedule_delay_millis: float = None,
     ):
 
         if max_queue_size is None:
@@ -138,6 +549,30 @@ class BatchExportSpanProcessor(SpanProcessor):
                 "BSP_EXPORT_TIMEOUT_MILLIS", 30000
             )
 
+        if sharded_queue is None:
+            sharded_queue = Configuration().get("BSP_SHARDED_QUEUE", False)
+
+        if max_concurrent_exports is None:
+            max_concurrent_exports = Configuration().get(
+                "BSP_MAX_CONCURRENT_EXPORTS", 1
+            )
+
+        if max_export_batch_bytes is None:
+            max_export_batch_bytes = Configuration().get(
+                "BSP_MAX_EXPORT_BATCH_BYTES", 0
+            )
+
+        if adaptive_schedule is None:
+            adaptive_schedule = Configuration().get(
+                "BSP_ADAPTIVE_SCHEDULE", False
+            )
+
+        if min_schedule_delay_millis is None:
+            min_schedule_delay_millis = Configuration().get(
+                "BSP_MIN_SCHEDULE_DELAY_MILLIS",
+                min(100, schedule_delay_millis),
+            )
+
         if max_queue_size <= 0:
             raise ValueError("max_queue_size must be a positive integer.")
 
@@ -154,10 +589,32 @@ class BatchExportSpanProcessor(SpanProcessor):
                 "max_export_batch_size must be less than or equal to max_queue_size."
             )
 
+        if max_concurrent_exports <= 0:
+            raise ValueError(
+                "max_concurrent_exports must be a positive integer."
+            )
+
+        if max_export_batch_bytes < 0:
+            raise ValueError(
+                "max_export_batch_bytes must be a non-negative integer."
+            )
+
+        if min_schedule_delay_millis <= 0:
+            raise ValueError("min_schedule_delay_millis must be positive.")
+
+        if min_schedule_delay_millis > schedule_delay_millis:
+            raise ValueError(
+                "min_schedule_delay_millis must be less than or equal to schedule_delay_millis."
+            )
+
         self.span_exporter = span_exporter
-        self.queue = collections.deque(
-            [], max_queue_size
-        )  # type: typing.Deque[Span]
+        if sharded_queue:
+            self.queue = _ShardedSpanQueue(
+                max_queue_size
+            )  # type: typing.Union[_SpanQueue, _ShardedSpanQueue]
+        else:
+            self.queue = _SpanQueue(max_queue_size)
+        self.sharded_queue = sharded_queue
         self.worker_thread = threading.Thread(target=self.worker, daemon=True)
         self.condition = threading.Condition(threading.Lock())
         self._flush_request = None  # type: typing.Optional[_FlushRequest]
@@ -165,9 +622,66 @@ class BatchExportSpanProcessor(SpanProcessor):
         self.max_export_batch_size = max_export_batch_size
         self.max_queue_size = max_queue_size
         self.export_timeout_millis = export_timeout_millis
+        self.max_concurrent_exports = max_concurrent_exports
+        self.max_export_batch_bytes = max_export_batch_bytes
+        self.adaptive_schedule = adaptive_schedule
+        self.min_schedule_delay_millis = min_schedule_delay_millis
+        self._schedule = None  # type: typing.Optional[_AdaptiveSchedule]
+        # queue size at which producers wake up the worker thread
+        self._wakeup_threshold = max_queue_size // 2
+        if adaptive_schedule:
+            self._schedule = _AdaptiveSchedule(
+                min_schedule_delay_millis / 1e3,
+                schedule_delay_millis / 1e3,
+                max_queue_size,
+                max_export_batch_size,
+            )
+            self._wakeup_threshold = self._schedule.wakeup_threshold
+        # exporters that don't extend SpanExporter may not provide an estimate
+        self._estimate_encoded_size = getattr(
+            span_exporter, "estimate_encoded_size", estimate_span_size
+        )
+        self._export_executor = (
+            None
+        )  # type: typing.Optional[concurrent.futures.ThreadPoolExecutor]
+        if max_concurrent_exports > 1:
+            self._export_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_concurrent_exports
+            )
+        # bounds the number of batches in flight, it is acquired by the worker
+        # thread and released when an export finishes
+        self._export_slots = threading.BoundedSemaphore(max_concurrent_exports)
+        self._exports_in_flight = (
+            set()
+        )  # type: typing.Set[concurrent.futures.Future]
+        self._exports_in_flight_lock = threading.Lock()
         self.done = False
+        # flag that indicates that producers already woke up the worker. It is
+        # only set with a sharded queue or an adaptive schedule, so that
+        # producers don't contend on the condition or wake up the worker
+        # constantly while the queue is above the wake-up threshold. Otherwise
+        # producers keep notifying on every span, which lets the worker catch
+        # up before the queue overflows.
+        self._wakeup_pending = False
+        self._coalesce_wakeups = sharded_queue or adaptive_schedule
         # flag that indicates that spans are being dropped
         self._spans_dropped = False
+        # spans are only dropped by producers when the queue is full, so this
+        # lock is not taken on the common path
+        self._spans_dropped_lock = threading.Lock()
+        self._num_spans_dropped = 0
+        # only written by the worker thread
+        self._num_spans_dequeued = 0
+        # written by the threads calling the exporter
+        self._export_stats_lock = threading.Lock()
+        self._num_spans_exported = 0
+        self._num_spans_failed = 0
+        self._num_batches_exported = 0
+        self._metric_labels = {}  # type: typing.Dict[str, str]
+        self._export_duration_recorder = None
+        self._batch_size_recorder = None
+        if meter is not None:
+            self._register_metrics(meter)
         # precallocated list to send spans to exporter
         self.spans_list = [
             None
@@ -185,25 +699,30 @@ class BatchExportSpanProcessor(SpanProcessor):
             return
         if not span.context.trace_flags.sampled:
             return
-        if len(self.queue) == self.max_queue_size:
+        if not self.queue.put(span):
+            with self._spans_dropped_lock:
+                self._num_spans_dropped += 1
             if not self._spans_dropped:
                 logger.warning("Queue is full, likely spans will be dropped.")
                 self._spans_dropped = True
 
-        self.queue.appendleft(span)
-
-        if len(self.queue) >= self.max_queue_size // 2:
+        if (
+            not self._wakeup_pending
+            and self.queue.approximate_size() >= self._wakeup_threshold
+        ):
+            self._wakeup_pending = self._coalesce_wakeups
             with self.condition:
                 self.condition.notify()
 
     def worker(self):
-        timeout = self.schedule_delay_millis / 1e3
+        timeout = self._next_schedule_delay()
         flush_request = None  # type: typing.Optional[_FlushRequest]
         while not self.done:
             with self.condition:
                 if self.done:
                     # done flag may have changed, avoid waiting
                     break
+                self._wakeup_pending = False
                 flush_request = self._get_and_unset_flush_request()
                 if (
                     len(self.queue) < self.max_export_batch_size
@@ -214,7 +733,7 @@ class BatchExportSpanProcessor(SpanProcessor):
                     flush_request = self._get_and_unset_flush_request()
                     if not self.queue:
                         # spurious notification, let's wait again, reset timeout
-                        timeout = self.schedule_delay_millis / 1e3
+                        timeout = self._next_schedule_delay()
                         self._notify_flush_request_finished(flush_request)
                         flush_request = None
                         continue
@@ -225,9 +744,11 @@ class BatchExportSpanProcessor(SpanProcessor):
             # subtract the duration of this export call to the next timeout
             start = time_ns()
             self._export(flush_request)
+            if flush_request is not None:
+                self._wait_for_exports_in_flight()
             end = time_ns()
             duration = (end - start) / 1e9
-            timeout = self.schedule_delay_millis / 1e3 - duration
+            timeout = self._next_schedule_delay() - duration
 
             self._notify_flush_request_finished(flush_request)
             flush_request = None
@@ -239,9 +760,25 @@ class BatchExportSpanProcessor(SpanProcessor):
 
         # be sure that all spans are sent
         self._drain_queue()
+        self._wait_for_exports_in_flight()
         self._notify_flush_request_finished(flush_request)
         self._notify_flush_request_finished(shutdown_flush_request)
 
+    def _next_schedule_delay(self) -> float:
+        """Returns the number of seconds the worker thread waits for spans
+        before the next export.
+        """
+        if self._schedule is None:
+            return self.schedule_delay_millis / 1e3
+        self._schedule.update(
+            len(self.queue)
+            + self._num_spans_dropped
+            + self._num_spans_dequeued,
+            time_ns(),
+        )
+        self._wakeup_threshold = self._schedule.wakeup_threshold
+        return self._schedule.delay
+
     def _get_and_unset_flush_request(self,) -> typing.Optional[_FlushRequest]:
         """Returns the current flush request and makes it invisible to the
         worker thread for subsequent calls.
@@ -301,26 +838,186 @@ class BatchExportSpanProcessor(SpanProcessor):
     def _export_batch(self) -> int:
         """Exports at most max_export_batch_size spans and returns the number of
          exported spans.
+
+         With concurrent exports, the batch is handed over to an export thread
+         and may still be in flight when this method returns.
          """
-        idx = 0
-        # currently only a single thread acts as consumer, so queue.pop() will
-        # not raise an exception
-        while idx < self.max_export_batch_size and self.queue:
-            self.spans_list[idx] = self.queue.pop()
-            idx += 1
+        # currently only a single thread acts as consumer
+        idx = self.queue.drain(self.spans_list, self.max_export_batch_size)
+        if self.max_export_batch_bytes:
+            idx = self._cut_batch(idx)
+        self._num_spans_dequeued += idx
+        # Ignore type b/c the Optional[None]+slicing is too "clever"
+        # for mypy
+        batch = self.spans_list[:idx]  # type: ignore
+
+        # clean up list
+        for index in range(idx):
+            self.spans_list[index] = None
+
+        if self._export_executor is None:
+            self._export_spans(batch)
+        elif batch:
+            self._export_slots.acquire()
+            future = self._export_executor.submit(self._export_spans, batch)
+            with self._exports_in_flight_lock:
+                self._exports_in_flight.add(future)
+            future.add_done_callback(self._export_finished)
+        return idx
+
+    def _cut_batch(self, num_spans: int) -> int:
+        """Shortens the batch in spans_list to max_export_batch_bytes, puts the
+        remaining spans back into the queue and returns the new batch length.
+        """
+        estimate_encoded_size = self._estimate_encoded_size
+        budget = self.max_export_batch_bytes
+        batch_bytes = 0
+        for idx in range(num_spans):
+            batch_bytes += estimate_encoded_size(self.spans_list[idx])
+            # a batch has at least one span, even if it exceeds the budget
+            if batch_bytes > budget and idx > 0:
+                self.queue.requeue(self.spans_list[idx:num_spans])
+                for index in range(idx, num_spans):
+                    self.spans_list[index] = None
+                return idx
+        return num_spans
+
+    def _export_spans(self, batch: typing.List[Span]) -> None:
         token = attach(set_value("suppress_instrumentation", True))
+        start = time_ns()
         try:
-            # Ignore type b/c the Optional[None]+slicing is too "clever"
-            # for mypy
-            self.span_exporter.export(self.spans_list[:idx])  # type: ignore
+            result = self.span_exporter.export(batch)
         except Exception:  # pylint: disable=broad-except
             logger.exception("Exception while exporting Span batch.")
+            result = SpanExportResult.FAILURE
         detach(token)
+        if batch:
+            duration = time_ns() - start
+            if self._schedule is not None:
+                self._schedule.record_export(duration / 1e9)
+            self._record_export(len(batch), result, duration / 1e6)
+
+    def _export_finished(self, future: concurrent.futures.Future) -> None:
+        with self._exports_in_flight_lock:
+            self._exports_in_flight.discard(future)
+        self._export_slots.release()
+
+    def _wait_for_exports_in_flight(self) -> None:
+        """Waits until all batches handed over to export threads so far have
+        been exported.
+        """
+        with self._exports_in_flight_lock:
+            exports_in_flight = list(self._exports_in_flight)
+        if exports_in_flight:
+            concurrent.futures.wait(exports_in_flight)
 
-        # clean up list
-        for index in range(idx):
-            self.spans_list[index] = None
-        return idx
+    def _record_export(
+        self,
+        num_spans: int,
+        result: typing.Optional[SpanExportResult],
+        duration_millis: float,
+    ) -> None:
+        with self._export_stats_lock:
+            self._num_batches_exported += 1
+            if result is SpanExportResult.FAILURE:
+                self._num_spans_failed += num_spans
+            else:
+                self._num_spans_exported += num_spans
+        if self._export_duration_recorder is not None:
+            self._export_duration_recorder.record(
+                duration_millis, self._metric_labels
+            )
+            self._batch_size_recorder.record(num_spans, self._metric_labels)
+
+    def stats(self) -> BatchExportSpanProcessorStats:
+        """Returns a snapshot of the counters of this processor.
+
+        The counters are read without synchronization, so they may be
+        slightly inconsistent with each other while spans are being ended.
+        """
+        queue_size = len(self.queue)
+        spans_dropped = self._num_spans_dropped
+        return BatchExportSpanProcessorStats(
+            spans_enqueued=queue_size
+            + spans_dropped
+            + self._num_spans_dequeued,
+            spans_dropped=spans_dropped,
+            spans_exported=self._num_spans_exported,
+            spans_failed=self._num_spans_failed,
+            batches_exported=self._num_batches_exported,
+            queue_size=queue_size,
+        )
+
+    def _register_metrics(self, meter: metrics_api.Meter) -> None:
+        # the metrics SDK is only loaded when metrics are enabled
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.sdk.metrics import Accumulator
+        from opentelemetry.sdk.metrics.export.aggregate import (
+            HistogramAggregator,
+        )
+        from opentelemetry.sdk.metrics.view import View
+
+        self._metric_labels = {"exporter": type(self.span_exporter).__name__}
+
+        def observe_stat(field: str, observer_type: str) -> None:
+            def callback(observer: metrics_api.Observer) -> None:
+                observer.observe(
+                    getattr(self.stats(), field), self._metric_labels
+                )
+
+            getattr(meter, observer_type)(
+                callback=callback,
+                name="otel.bsp.{}".format(field),
+                description="Batch span processor {}".format(
+                    field.replace("_", " ")
+                ),
+                unit="1",
+                value_type=int,
+            )
+
+        for field in (
+            "spans_enqueued",
+            "spans_dropped",
+            "spans_exported",
+            "spans_failed",
+            "batches_exported",
+        ):
+            observe_stat(field, "register_sumobserver")
+        observe_stat("queue_size", "register_updownsumobserver")
+
+        self._export_duration_recorder = meter.create_valuerecorder(
+            name="otel.bsp.export_duration",
+            description="Batch span processor export call duration",
+            unit="ms",
+            value_type=float,
+        )
+        self._batch_size_recorder = meter.create_valuerecorder(
+            name="otel.bsp.batch_size",
+            description="Batch span processor exported batch size",
+            unit="1",
+            value_type=int,
+        )
+        if isinstance(meter, Accumulator):
+            meter.register_view(
+                View(
+                    self._export_duration_recorder,
+                    HistogramAggregator,
+                    aggregator_config={"bounds": _EXPORT_DURATION_BOUNDS},
+                )
+            )
+            batch_size_bounds = []
+            bound = 1
+            while bound < self.max_export_batch_size:
+                batch_size_bounds.append(bound)
+                bound *= 4
+            batch_size_bounds.append(self.max_export_batch_size)
+            meter.register_view(
+                View(
+                    self._batch_size_recorder,
+                    HistogramAggregator,
+                    aggregator_config={"bounds": tuple(batch_size_bounds)},
+                )
+            )
 
     def _drain_queue(self):
         """"Export all elements until queue is empty.
@@ -354,9 +1051,16 @@ class BatchExportSpanProcessor(SpanProcessor):
     def shutdown(self) -> None:
         # signal the worker thread to finish and then wait for it
         self.done = True
+        # the remaining spans are exported without waiting to retry failed
+        # exports
+        cancel_retries = getattr(self.span_exporter, "cancel_retries", None)
+        if cancel_retries is not None:
+            cancel_retries()
         with self.condition:
             self.condition.notify_all()
         self.worker_thread.join()
+        if self._export_executor is not None:
+            self._export_executor.shutdown()
         self.span_exporter.shutdown()
 
 
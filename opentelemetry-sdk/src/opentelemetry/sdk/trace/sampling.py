@@ -87,6 +87,9 @@ class Decision(enum.Enum):
         return self is Decision.RECORD_AND_SAMPLE
 
 
+_EMPTY_ATTRIBUTES = MappingProxyType({})
+
+
 class SamplingResult:
     """A sampling result as applied to a newly-created Span.
 
@@ -98,6 +101,8 @@ class SamplingResult:
             Could possibly have been modified by the sampler.
     """
 
+    __slots__ = ("decision", "attributes", "trace_state")
+
     def __repr__(self) -> str:
         return "{}({}, attributes={})".format(
             type(self).__name__, str(self.decision), str(self.attributes)
@@ -111,7 +116,7 @@ class SamplingResult:
     ) -> None:
         self.decision = decision
         if attributes is None:
-            self.attributes = MappingProxyType({})
+            self.attributes = _EMPTY_ATTRIBUTES
         else:
             self.attributes = MappingProxyType(attributes)
         self.trace_state = trace_state
@@ -205,12 +210,11 @@ class TraceIdRatioBased(Sampler):
         links: Sequence["Link"] = None,
         trace_state: "TraceState" = None,
     ) -> "SamplingResult":
-        decision = Decision.DROP
         if trace_id & self.TRACE_ID_LIMIT < self.bound:
-            decision = Decision.RECORD_AND_SAMPLE
-        if decision is Decision.DROP:
-            attributes = None
-        return SamplingResult(decision, attributes, trace_state)
+            return SamplingResult(
+                Decision.RECORD_AND_SAMPLE, attributes, trace_state
+            )
+        return SamplingResult(Decision.DROP, None, trace_state)
 
     def get_description(self) -> str:
         return "TraceIdRatioBased{{{}}}".format(self._rate)
@@ -49,13 +49,16 @@ class BoundedList(Sequence):
     """An append only list with a fixed max size.
 
     Calls to `append` and `extend` will drop the oldest elements if there is
-    not enough room.
+    not enough room. If ``lock`` is given, it is used instead of a lock of
+    the list's own, e.g. to share the lock of the object owning the list.
     """
 
-    def __init__(self, maxlen):
+    __slots__ = ("dropped", "_dq", "_lock")
+
+    def __init__(self, maxlen, lock=None):
         self.dropped = 0
         self._dq = deque(maxlen=maxlen)  # type: deque
-        self._lock = threading.Lock()
+        self._lock = threading.Lock() if lock is None else lock
 
     def __repr__(self):
         return "{}({}, maxlen={})".format(
@@ -74,9 +77,13 @@ class BoundedList(Sequence):
 
     def append(self, item):
         with self._lock:
-            if len(self._dq) == self._dq.maxlen:
-                self.dropped += 1
-            self._dq.append(item)
+            self._append(item)
+
+    def _append(self, item):
+        """Appends ``item`` without taking the lock, which the caller holds."""
+        if len(self._dq) == self._dq.maxlen:
+            self.dropped += 1
+        self._dq.append(item)
 
     def extend(self, seq):
         with self._lock:
@@ -86,11 +93,11 @@ class BoundedList(Sequence):
             self._dq.extend(seq)
 
     @classmethod
-    def from_seq(cls, maxlen, seq):
+    def from_seq(cls, maxlen, seq, lock=None):
         seq = tuple(seq)
         if len(seq) > maxlen:
             raise ValueError
-        bounded_list = cls(maxlen)
+        bounded_list = cls(maxlen, lock)
         # pylint: disable=protected-access
         bounded_list._dq = deque(seq, maxlen=maxlen)
         return bounded_list
@@ -100,10 +107,13 @@ class BoundedDict(MutableMapping):
     """An ordered dict with a fixed max capacity.
 
     Oldest elements are dropped when the dict is full and a new element is
-    added.
+    added. If ``lock`` is given, it is used instead of a lock of the dict's
+    own, e.g. to share the lock of the object owning the dict.
     """
 
-    def __init__(self, maxlen):
+    __slots__ = ("maxlen", "dropped", "_dict", "_lock")
+
+    def __init__(self, maxlen, lock=None):
         if not isinstance(maxlen, int):
             raise ValueError
         if maxlen < 0:
@@ -111,7 +121,7 @@ class BoundedDict(MutableMapping):
         self.maxlen = maxlen
         self.dropped = 0
         self._dict = OrderedDict()  # type: OrderedDict
-        self._lock = threading.Lock()  # type: threading.Lock
+        self._lock = threading.Lock() if lock is None else lock
 
     def __repr__(self):
         return "{}({}, maxlen={})".format(
@@ -123,16 +133,20 @@ class BoundedDict(MutableMapping):
 
     def __setitem__(self, key, value):
         with self._lock:
-            if self.maxlen == 0:
-                self.dropped += 1
-                return
+            self._set(key, value)
+
+    def _set(self, key, value):
+        """Sets ``key`` without taking the lock, which the caller holds."""
+        if self.maxlen == 0:
+            self.dropped += 1
+            return
 
-            if key in self._dict:
-                del self._dict[key]
-            elif len(self._dict) == self.maxlen:
-                del self._dict[next(iter(self._dict.keys()))]
-                self.dropped += 1
-            self._dict[key] = value
+        if key in self._dict:
+            del self._dict[key]
+        elif len(self._dict) == self.maxlen:
+            del self._dict[next(iter(self._dict.keys()))]
+            self.dropped += 1
+        self._dict[key] = value
 
     def __delitem__(self, key):
         del self._dict[key]
@@ -145,11 +159,11 @@ class BoundedDict(MutableMapping):
         return len(self._dict)
 
     @classmethod
-    def from_map(cls, maxlen, mapping):
+    def from_map(cls, maxlen, mapping, lock=None):
         mapping = OrderedDict(mapping)
         if len(mapping) > maxlen:
             raise ValueError
-        bounded_dict = cls(maxlen)
+        bounded_dict = cls(maxlen, lock)
         # pylint: disable=protected-access
         bounded_dict._dict = mapping
         return bounded_dict
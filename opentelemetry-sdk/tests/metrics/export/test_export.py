@@ -15,6 +15,7 @@
 import concurrent.futures
 import random
 import unittest
+from collections import OrderedDict
 from math import inf
 from unittest import mock
 
@@ -25,6 +26,11 @@ from opentelemetry.sdk.metrics.export import (
     ExportRecord,
 )
 from opentelemetry.sdk.metrics.export.aggregate import (
+    Aggregator,
+    DDSketchAggregator,
+    ExponentialBuckets,
+    ExponentialHistogramAggregator,
+    HistogramAggregator,
     LastValueAggregator,
     MinMaxSumCountAggregator,
     SumAggregator,
@@ -34,6 +40,11 @@ from opentelemetry.sdk.metrics.export.controller import PushController
 from opentelemetry.sdk.metrics.export.processor import Processor
 from opentelemetry.sdk.resources import Resource
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 # pylint: disable=protected-access
 class TestConsoleMetricsExporter(unittest.TestCase):
@@ -189,6 +200,85 @@ class TestProcessor(unittest.TestCase):
         self.assertEqual(processor._batch_map.get(batch_key).current, 0)
         self.assertEqual(processor._batch_map.get(batch_key).checkpoint, 1.0)
 
+    def test_processor_stateless_reuses_aggregators(self):
+        meter_provider = metrics.MeterProvider()
+        meter = meter_provider.get_meter(__name__)
+        processor = Processor(False, meter_provider.resource)
+        metric = metrics.Counter(
+            "available memory", "available memory", "bytes", int, meter
+        )
+        labels = (("key", "value"),)
+        aggregator = SumAggregator()
+        batch_key = (metric, SumAggregator, (), labels)
+
+        aggregator.update(1)
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        aggregator.update(2)
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        batch_value = processor._batch_map[batch_key]
+        self.assertEqual(batch_value.checkpoint, 3)
+        self.assertEqual(len(processor.checkpoint_set()), 1)
+        processor.finished_collection()
+
+        # the aggregator is kept but not exported until it is used again
+        self.assertIs(processor._batch_map[batch_key], batch_value)
+        self.assertEqual(len(processor.checkpoint_set()), 0)
+
+        aggregator.update(5)
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        self.assertIs(processor._batch_map[batch_key], batch_value)
+        self.assertEqual(batch_value.checkpoint, 5)
+        records = processor.checkpoint_set()
+        self.assertEqual(len(records), 1)
+        self.assertIs(records[0].aggregator, batch_value)
+        processor.finished_collection()
+
+        # aggregators not used during a collection are dropped
+        processor.finished_collection()
+        self.assertEqual(len(processor._batch_map), 0)
+
+    def test_processor_stateless_replaces_aggregators_not_reset(self):
+        class CustomAggregator(SumAggregator):
+            reset_checkpoint = Aggregator.reset_checkpoint
+
+        meter_provider = metrics.MeterProvider()
+        meter = meter_provider.get_meter(__name__)
+        processor = Processor(False, meter_provider.resource)
+        metric = metrics.Counter(
+            "available memory", "available memory", "bytes", int, meter
+        )
+        labels = (("key", "value"),)
+        aggregator = CustomAggregator()
+        batch_key = (metric, CustomAggregator, (), labels)
+
+        aggregator.update(1)
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        batch_value = processor._batch_map[batch_key]
+        processor.finished_collection()
+
+        aggregator.update(5)
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        self.assertIsNot(processor._batch_map[batch_key], batch_value)
+        # the checkpoint only has the updates of this collection
+        self.assertEqual(processor._batch_map[batch_key].checkpoint, 5)
+
+    def test_processor_config_key(self):
+        meter_provider = metrics.MeterProvider()
+        meter = meter_provider.get_meter(__name__)
+        processor = Processor(True, meter_provider.resource)
+        metric = metrics.ValueRecorder(
+            "available memory", "available memory", "bytes", int, meter
+        )
+        labels = ()
+        aggregator = HistogramAggregator(config={"bounds": [1, 2]})
+        aggregator2 = HistogramAggregator(config={"bounds": [3]})
+        self.assertEqual(aggregator.config_key, (("bounds", (1, 2)),))
+        self.assertEqual(SumAggregator().config_key, ())
+
+        processor.process(metrics.Accumulation(metric, labels, aggregator))
+        processor.process(metrics.Accumulation(metric, labels, aggregator2))
+        self.assertEqual(len(processor._batch_map), 2)
+
 
 class TestSumAggregator(unittest.TestCase):
     @staticmethod
@@ -254,6 +344,62 @@ class TestSumAggregator(unittest.TestCase):
 
         self.assertEqual(fut.result(), checkpoint_total)
 
+    def test_per_thread_concurrent_update(self):
+        sum_agg = SumAggregator({"per_thread": True})
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(self.call_update, sum_agg) for _ in range(4)
+            ]
+            update_total = sum(fut.result() for fut in futures)
+
+        sum_agg.take_checkpoint()
+        self.assertEqual(update_total, sum_agg.checkpoint)
+        # the stripes of the finished threads were dropped
+        sum_agg.take_checkpoint()
+        self.assertEqual(sum_agg.checkpoint, 0)
+        # pylint: disable=protected-access
+        self.assertEqual(sum_agg._stripes._stripes, [])
+
+    def test_per_thread_concurrent_update_and_checkpoint(self):
+        sum_agg = SumAggregator({"per_thread": True})
+        checkpoint_total = 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            fut1 = executor.submit(self.call_update, sum_agg)
+            fut2 = executor.submit(self.call_update, sum_agg)
+
+            while not (fut1.done() and fut2.done()):
+                sum_agg.take_checkpoint()
+                checkpoint_total += sum_agg.checkpoint
+
+        sum_agg.take_checkpoint()
+        checkpoint_total += sum_agg.checkpoint
+
+        self.assertEqual(fut1.result() + fut2.result(), checkpoint_total)
+
+
+    def test_per_thread_update_after_collect(self):
+        sum_agg = SumAggregator({"per_thread": True})
+        sum_agg.update(1)
+        # pylint: disable=protected-access
+        collect = sum_agg._stripes.collect
+
+        def _collect():
+            values = collect()
+            # updated once the stripes are collected, before the checkpoint
+            # is taken
+            sum_agg.update(2)
+            return values
+
+        with mock.patch.object(sum_agg._stripes, "collect", _collect):
+            sum_agg.take_checkpoint()
+        self.assertEqual(sum_agg.checkpoint, 1)
+        # the value left in the stripe is collected next time
+        self.assertFalse(sum_agg.checkpointed)
+        sum_agg.take_checkpoint()
+        self.assertEqual(sum_agg.checkpoint, 2)
+        self.assertTrue(sum_agg.checkpointed)
 
 class TestMinMaxSumCountAggregator(unittest.TestCase):
     @staticmethod
@@ -424,6 +570,333 @@ class TestMinMaxSumCountAggregator(unittest.TestCase):
 
             self.assertEqual(mmsc0.checkpoint, fut.result())
 
+    def test_per_thread_concurrent_update(self):
+        mmsc = MinMaxSumCountAggregator({"per_thread": True})
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+            fut1 = ex.submit(self.call_update, mmsc)
+            fut2 = ex.submit(self.call_update, mmsc)
+            expected = MinMaxSumCountAggregator._TYPE(
+                min(fut1.result().min, fut2.result().min),
+                max(fut1.result().max, fut2.result().max),
+                fut1.result().sum + fut2.result().sum,
+                fut1.result().count + fut2.result().count,
+            )
+
+        mmsc.take_checkpoint()
+        self.assertEqual(mmsc.checkpoint, expected)
+        self.assertEqual(mmsc.current, MinMaxSumCountAggregator._EMPTY)
+
+    def test_per_thread_update_after_collect(self):
+        mmsc = MinMaxSumCountAggregator({"per_thread": True})
+        # pylint: disable=protected-access
+        collect = mmsc._stripes.collect
+
+        def _collect():
+            values = collect()
+            mmsc.update(2)
+            return values
+
+        with mock.patch.object(mmsc._stripes, "collect", _collect):
+            mmsc.take_checkpoint()
+        self.assertEqual(mmsc.checkpoint, MinMaxSumCountAggregator._EMPTY)
+        self.assertFalse(mmsc.checkpointed)
+        mmsc.take_checkpoint()
+        self.assertEqual(
+            mmsc.checkpoint, MinMaxSumCountAggregator._TYPE(2, 2, 2, 1)
+        )
+
+
+class TestHistogramAggregator(unittest.TestCase):
+    @mock.patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_update(self, time_mock):
+        time_mock.return_value = 123
+        histogram = HistogramAggregator({"bounds": [10, 20]})
+        for value in (-1, 9.9, 10, 19, 25, float("nan"), inf):
+            histogram.update(value)
+        self.assertEqual(
+            tuple(histogram.current.items()), ((10, 2), (20, 2), (inf, 1))
+        )
+        self.assertEqual(histogram.last_update_timestamp, 123)
+
+    @mock.patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_reset_checkpoint(self, time_mock):
+        time_mock.return_value = 123
+        histogram = HistogramAggregator({"bounds": [10, 20]})
+        histogram.update(15)
+        histogram.take_checkpoint()
+        time_mock.return_value = 456
+        histogram.reset_checkpoint()
+        self.assertEqual(
+            tuple(histogram.checkpoint.items()), ((10, 0), (20, 0), (inf, 0))
+        )
+        self.assertEqual(histogram.last_update_timestamp, 0)
+        self.assertEqual(histogram.initial_checkpoint_timestamp, 0)
+        self.assertEqual(histogram.first_timestamp, 456)
+
+    def test_invalid_bounds(self):
+        histogram = HistogramAggregator({"bounds": [20, 10]})
+        histogram.update(-1)
+        self.assertEqual(tuple(histogram.current.items()), ((0, 1), (inf, 0)))
+
+    def test_update_many(self):
+        histogram = HistogramAggregator({"bounds": [10, 20]})
+        histogram.update_many([-1, 9.9, 10, 19, 25, float("nan"), inf])
+        histogram.update_many(value for value in (5, 30))
+        self.assertEqual(
+            tuple(histogram.current.items()), ((10, 3), (20, 2), (inf, 2))
+        )
+
+    def test_update_many_not_counted(self):
+        histogram = HistogramAggregator({"bounds": [10, 20]})
+        histogram.update_many([float("nan"), inf])
+        histogram.update_many([])
+        # the aggregator is not updated without counted values
+        self.assertTrue(histogram.checkpointed)
+        self.assertEqual(histogram.last_update_timestamp, 0)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_update_many_numpy(self):
+        histogram = HistogramAggregator({"bounds": [10, 20]})
+        histogram.update_many(
+            numpy.array([-1, 9.9, 10, 19, 25, float("nan"), inf])
+        )
+        histogram.update_many(numpy.array([]))
+        self.assertEqual(
+            tuple(histogram.current.items()), ((10, 2), (20, 2), (inf, 1))
+        )
+        histogram.take_checkpoint()
+        histogram.update_many(numpy.array([float("nan"), inf]))
+        self.assertTrue(histogram.checkpointed)
+
+    def test_checkpoint(self):
+        histogram = HistogramAggregator({"bounds": [10]})
+        histogram.update(5)
+        histogram.take_checkpoint()
+        self.assertEqual(
+            tuple(histogram.checkpoint.items()), ((10, 1), (inf, 0))
+        )
+        self.assertEqual(tuple(histogram.current.items()), ((10, 0), (inf, 0)))
+
+    def test_merge(self):
+        histogram = HistogramAggregator({"bounds": [10]})
+        histogram2 = HistogramAggregator({"bounds": [10]})
+        histogram.checkpoint = OrderedDict([(10, 1), (inf, 2)])
+        histogram2.checkpoint = OrderedDict([(10, 3), (inf, 4)])
+        histogram2.last_update_timestamp = 123
+        histogram.merge(histogram2)
+        self.assertEqual(
+            tuple(histogram.checkpoint.items()), ((10, 4), (inf, 6))
+        )
+        self.assertEqual(histogram.last_update_timestamp, 123)
+
+    def test_merge_different_bounds(self):
+        histogram = HistogramAggregator({"bounds": [10]})
+        histogram2 = HistogramAggregator({"bounds": [20]})
+        histogram2.update(5)
+        histogram2.take_checkpoint()
+        histogram.merge(histogram2)
+        self.assertEqual(
+            tuple(histogram.checkpoint.items()), ((10, 0), (inf, 0))
+        )
+
+
+class TestExponentialHistogramAggregator(unittest.TestCase):
+    @mock.patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_update(self, time_mock):
+        time_mock.return_value = 123
+        histogram = ExponentialHistogramAggregator({"max_scale": 0})
+        for value in (1, 2, 3, 4, 5, 0, -1.5, float("nan"), inf):
+            histogram.update(value)
+        current = histogram.current
+        self.assertEqual(current.scale, 0)
+        # (0.5, 1], (1, 2], (2, 4], (4, 8]
+        self.assertEqual(
+            current.positive, ExponentialBuckets(-1, [1, 1, 2, 1])
+        )
+        self.assertEqual(current.negative, ExponentialBuckets(0, [1]))
+        self.assertEqual(current.zero_count, 1)
+        self.assertEqual(current.count, 7)
+        self.assertEqual(current.sum, 13.5)
+        self.assertEqual(current.min, -1.5)
+        self.assertEqual(current.max, 5)
+        self.assertEqual(histogram.last_update_timestamp, 123)
+
+    def test_bucket_index(self):
+        histogram = ExponentialHistogramAggregator()
+        current = histogram.current
+        for value in (1e-300, 0.001, 0.5, 1, 1.1, 2, 3, 1000, 1e300):
+            index = current.bucket_index(value)
+            self.assertLess(current.bucket_bound(index), value)
+            self.assertLessEqual(value, current.bucket_bound(index + 1))
+
+    def test_scale_reduction(self):
+        histogram = ExponentialHistogramAggregator({"max_size": 4})
+        values = [2 ** exponent for exponent in range(-10, 10)]
+        for value in values:
+            histogram.update(value)
+        current = histogram.current
+        self.assertLessEqual(len(current.positive.counts), 4)
+        self.assertEqual(sum(current.positive.counts), len(values))
+        for value in values:
+            index = current.bucket_index(value)
+            self.assertLess(current.bucket_bound(index), value)
+            self.assertLessEqual(value, current.bucket_bound(index + 1))
+
+    def test_checkpoint(self):
+        histogram = ExponentialHistogramAggregator({"max_size": 4})
+        for value in (0.001, 1000):
+            histogram.update(value)
+        histogram.take_checkpoint()
+        self.assertEqual(histogram.checkpoint.count, 2)
+        self.assertEqual(histogram.current.count, 0)
+        # the resolution is restored after each checkpoint
+        self.assertEqual(histogram.current.scale, 20)
+        self.assertLess(histogram.checkpoint.scale, 20)
+
+    def test_merge(self):
+        values = [1.5 ** exponent for exponent in range(-20, 20)]
+        histogram = ExponentialHistogramAggregator({"max_size": 10})
+        histogram2 = ExponentialHistogramAggregator({"max_size": 10})
+        expected = ExponentialHistogramAggregator({"max_size": 10})
+        for value in values[:5]:
+            histogram.update(value)
+            expected.update(value)
+        for value in values[5:] + [0, -1]:
+            histogram2.update(value)
+            expected.update(value)
+        histogram.take_checkpoint()
+        histogram2.take_checkpoint()
+        expected.take_checkpoint()
+
+        histogram.merge(histogram2)
+        checkpoint = histogram.checkpoint
+        self.assertEqual(checkpoint.scale, expected.checkpoint.scale)
+        self.assertEqual(checkpoint.positive, expected.checkpoint.positive)
+        self.assertEqual(checkpoint.negative, expected.checkpoint.negative)
+        self.assertEqual(checkpoint.zero_count, 1)
+        self.assertEqual(checkpoint.count, len(values) + 2)
+        self.assertEqual(checkpoint.min, -1)
+        self.assertEqual(checkpoint.max, values[-1])
+        # the merged histogram is not modified
+        self.assertEqual(histogram2.checkpoint.count, len(values) - 3)
+
+    def test_merge_with_empty(self):
+        histogram = ExponentialHistogramAggregator()
+        histogram2 = ExponentialHistogramAggregator()
+        histogram.update(3)
+        histogram.take_checkpoint()
+        histogram.merge(histogram2)
+        self.assertEqual(histogram.checkpoint.count, 1)
+        self.assertEqual(histogram.checkpoint.scale, 20)
+
+    def test_to_explicit_buckets(self):
+        histogram = ExponentialHistogramAggregator({"max_scale": 0})
+        for value in (-3, -1, 0, 0.75, 3):
+            histogram.update(value)
+        self.assertEqual(
+            histogram.current.to_explicit_buckets(),
+            (
+                [-2.0, -1.0, -0.5, 0.0, 1.0, 2.0, 4.0],
+                [1, 0, 1, 1, 1, 0, 1, 0],
+            ),
+        )
+
+
+class TestDDSketchAggregator(unittest.TestCase):
+    @staticmethod
+    def call_update(sketch):
+        values = []
+        for _ in range(0, 10000):
+            val = random.lognormvariate(0, 3) - 0.1
+            sketch.update(val)
+            values.append(val)
+        return values
+
+    def assert_quantiles(self, sketch, values, relative_accuracy):
+        values = sorted(values)
+        for quantile in (0.001, 0.1, 0.5, 0.9, 0.99, 0.999):
+            actual = values[int(quantile * (len(values) - 1))]
+            self.assertLessEqual(
+                abs(sketch.quantile(quantile) - actual),
+                abs(actual) * relative_accuracy,
+            )
+
+    @mock.patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
+    def test_update(self, time_mock):
+        time_mock.return_value = 123
+        sketch_agg = DDSketchAggregator()
+        for value in (-1, 0, 1, 2, float("nan"), inf):
+            sketch_agg.update(value)
+        current = sketch_agg.current
+        self.assertEqual(current.count, 4)
+        self.assertEqual(current.sum, 2)
+        self.assertEqual(current.min, -1)
+        self.assertEqual(current.max, 2)
+        self.assertEqual(current.zero_count, 1)
+        self.assertEqual(current.quantile(0), -1)
+        self.assertEqual(current.quantile(0.5), 0)
+        self.assertEqual(current.quantile(1), 2)
+        self.assertEqual(sketch_agg.last_update_timestamp, 123)
+
+    def test_quantiles(self):
+        sketch_agg = DDSketchAggregator({"relative_accuracy": 0.02})
+        values = self.call_update(sketch_agg)
+        self.assert_quantiles(sketch_agg.current, values, 0.02)
+        self.assertIsNone(DDSketchAggregator().current.quantile(0.5))
+
+    def test_max_buckets(self):
+        sketch_agg = DDSketchAggregator({"max_buckets": 100})
+        values = self.call_update(sketch_agg)
+        current = sketch_agg.current
+        self.assertEqual(len(current.positive.counts), 100)
+        self.assertEqual(current.count, len(values))
+        # the highest quantiles are still accurate
+        values.sort()
+        self.assertLessEqual(
+            abs(current.quantile(0.999) - values[9989]), values[9989] * 0.01
+        )
+
+    def test_checkpoint(self):
+        sketch_agg = DDSketchAggregator()
+        sketch_agg.update(2)
+        sketch_agg.take_checkpoint()
+        self.assertEqual(sketch_agg.checkpoint.count, 1)
+        self.assertEqual(sketch_agg.current.count, 0)
+
+    def test_merge(self):
+        sketch_agg = DDSketchAggregator()
+        sketch_agg2 = DDSketchAggregator()
+        values = self.call_update(sketch_agg) + self.call_update(sketch_agg2)
+        sketch_agg2.update(0)
+        values.append(0)
+        sketch_agg.take_checkpoint()
+        sketch_agg2.take_checkpoint()
+        sketch_agg.merge(sketch_agg2)
+        checkpoint = sketch_agg.checkpoint
+        self.assertEqual(checkpoint.count, len(values))
+        self.assertEqual(checkpoint.zero_count, 1)
+        self.assertEqual(checkpoint.min, min(values))
+        self.assertEqual(checkpoint.max, max(values))
+        self.assert_quantiles(checkpoint, values, 0.01)
+
+    def test_merge_different_accuracy(self):
+        sketch_agg = DDSketchAggregator()
+        sketch_agg2 = DDSketchAggregator({"relative_accuracy": 0.05})
+        sketch_agg2.update(1)
+        sketch_agg2.take_checkpoint()
+        sketch_agg.merge(sketch_agg2)
+        self.assertEqual(sketch_agg.checkpoint.count, 0)
+
+    def test_to_explicit_buckets(self):
+        sketch_agg = DDSketchAggregator({"relative_accuracy": 1 / 3})
+        # gamma is 2
+        for value in (-3, 0, 1, 3):
+            sketch_agg.update(value)
+        bounds, counts = sketch_agg.current.to_explicit_buckets()
+        self.assertEqual([round(bound, 6) for bound in bounds], [-2, 0, 1, 4])
+        self.assertEqual(counts, [1, 1, 1, 1, 0])
+
 
 class TestValueObserverAggregator(unittest.TestCase):
     @mock.patch("opentelemetry.sdk.metrics.export.aggregate.time_ns")
@@ -447,6 +920,15 @@ class TestValueObserverAggregator(unittest.TestCase):
 
         self.assertEqual(observer.current, values[-1])
 
+    def test_reset_checkpoint(self):
+        observer = ValueObserverAggregator()
+        observer.update(3)
+        observer.take_checkpoint()
+        self.assertEqual(observer.checkpoint, (3, 3, 3, 1, 3))
+        observer.reset_checkpoint()
+        self.assertEqual(observer.checkpoint, (None, None, None, 0, None))
+        self.assertEqual(observer.mmsc.checkpoint, (inf, -inf, 0, 0))
+
     def test_checkpoint(self):
         observer = ValueObserverAggregator()
 
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from logging import WARNING
 from unittest.mock import Mock, patch
 
 from opentelemetry import metrics as metrics_api
+from opentelemetry.configuration import Configuration
 from opentelemetry.sdk import metrics, resources
 from opentelemetry.sdk.metrics.export.aggregate import (
     MinMaxSumCountAggregator,
@@ -64,6 +68,47 @@ class TestMeterProvider(unittest.TestCase):
         self.assertEqual(exporter.shutdown.call_count, 1)
         self.assertIsNone(meter_provider._atexit_handler)
 
+    def test_cardinality_limit(self):
+        meter = metrics.MeterProvider(cardinality_limit=10).get_meter(__name__)
+        self.assertEqual(meter.cardinality_limit, 10)
+        counter = meter.create_counter("name", "desc", "unit", int)
+        self.assertEqual(counter.cardinality_limit, 10)
+        observer = meter.register_valueobserver(
+            None, "name", "desc", "unit", int
+        )
+        self.assertEqual(observer.cardinality_limit, 10)
+
+        meter_provider = metrics.MeterProvider(cardinality_limit=0)
+        self.assertIsNone(meter_provider.cardinality_limit)
+
+    def test_cardinality_limit_default(self):
+        self.assertIsNone(metrics.MeterProvider().cardinality_limit)
+        with patch.dict(
+            "os.environ", {"OTEL_METRICS_CARDINALITY_LIMIT": "100"}
+        ):
+            # pylint: disable=protected-access
+            Configuration._reset()
+            try:
+                meter_provider = metrics.MeterProvider()
+            finally:
+                Configuration._reset()
+        self.assertEqual(meter_provider.cardinality_limit, 100)
+
+    def test_observer_workers(self):
+        meter_provider = metrics.MeterProvider()
+        self.assertIsNone(meter_provider.observer_executor)
+        self.assertEqual(meter_provider.observer_timeout, 10.0)
+
+        meter_provider = metrics.MeterProvider(
+            observer_workers=2, observer_timeout=1.0
+        )
+        executor = meter_provider.observer_executor
+        self.assertIsInstance(executor, ThreadPoolExecutor)
+        self.assertEqual(meter_provider.observer_timeout, 1.0)
+        meter_provider.shutdown()
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
 
 class TestMeter(unittest.TestCase):
     def test_extends_api(self):
@@ -81,6 +126,32 @@ class TestMeter(unittest.TestCase):
         meter.collect()
         self.assertTrue(processor_mock.process.called)
 
+    def test_collect_metrics_only_updated(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        counter = meter.create_counter("name", "desc", "unit", int)
+        bound_counter = counter.bind({"key1": "value1"})
+        bound_counter2 = counter.bind({"key1": "value2"})
+        with patch.object(meter.processor, "process") as process_mock:
+            meter.collect()
+            self.assertFalse(process_mock.called)
+
+            bound_counter.add(1)
+            bound_counter.add(2)
+            meter.collect()
+            self.assertEqual(process_mock.call_count, 1)
+            accumulation = process_mock.call_args[0][0]
+            self.assertEqual(accumulation.labels, (("key1", "value1"),))
+
+            meter.collect()
+            self.assertEqual(process_mock.call_count, 1)
+
+        # released bound instruments are removed even if not updated
+        bound_counter2.release()
+        meter.collect()
+        self.assertEqual(
+            list(counter.bound_instruments), [(("key1", "value1"),)]
+        )
+
     def test_collect_no_metrics(self):
         meter = metrics.MeterProvider().get_meter(__name__)
         processor_mock = Mock()
@@ -126,6 +197,96 @@ class TestMeter(unittest.TestCase):
         meter.collect()
         self.assertTrue(processor_mock.process.called)
 
+    def test_collect_observers_removes_stale_series(self):
+        meter = metrics.MeterProvider(stateful=False).get_meter(__name__)
+        observed_labels = [{"key": "1"}, {"key": "2"}]
+
+        def callback(observer):
+            for labels in observed_labels:
+                observer.observe(1, labels)
+
+        observer = meter.register_valueobserver(
+            callback, "name", "desc", "unit", int
+        )
+        meter.collect()
+        self.assertEqual(len(meter.processor.checkpoint_set()), 2)
+        meter.processor.finished_collection()
+
+        observed_labels.pop()
+        meter.collect()
+        self.assertEqual(len(meter.processor.checkpoint_set()), 1)
+        self.assertEqual(list(observer.aggregators), [(("key", "1"),)])
+
+    def test_collect_sum_observers_keeps_stale_series(self):
+        meter = metrics.MeterProvider(stateful=False).get_meter(__name__)
+        observed_values = [5, None, 3, 6]
+
+        def callback(observer):
+            value = observed_values.pop(0)
+            if value is not None:
+                observer.observe(value, {"key": "1"})
+
+        observer = meter.register_sumobserver(
+            callback, "name", "desc", "unit", int
+        )
+        meter.collect()
+        meter.processor.finished_collection()
+        # not observed, the series is kept but not exported
+        meter.collect()
+        self.assertEqual(len(meter.processor.checkpoint_set()), 0)
+        self.assertIn((("key", "1"),), observer.aggregators)
+        meter.processor.finished_collection()
+
+        # lower than the last value of the series
+        with self.assertLogs(level=WARNING):
+            meter.collect()
+        self.assertEqual(len(meter.processor.checkpoint_set()), 0)
+        meter.processor.finished_collection()
+
+        meter.collect()
+        (record,) = meter.processor.checkpoint_set()
+        self.assertEqual(record.aggregator.checkpoint, 6)
+
+    def test_collect_observers_concurrently(self):
+        meter_provider = metrics.MeterProvider(observer_workers=2)
+        self.addCleanup(meter_provider.shutdown)
+        meter = meter_provider.get_meter(__name__)
+        # each callback only returns once both are running
+        barrier = threading.Barrier(2, timeout=5)
+
+        def callback(observer):
+            barrier.wait()
+            observer.observe(1, {})
+
+        for name in ("name1", "name2"):
+            meter.register_valueobserver(callback, name, "desc", "unit", int)
+        meter.collect()
+        self.assertEqual(len(meter.processor.checkpoint_set()), 2)
+
+    def test_collect_observers_timeout(self):
+        meter_provider = metrics.MeterProvider(
+            observer_workers=1, observer_timeout=0.01
+        )
+        self.addCleanup(meter_provider.shutdown)
+        meter = meter_provider.get_meter(__name__)
+        event = threading.Event()
+        self.addCleanup(event.set)
+        callback = Mock(side_effect=lambda observer: event.wait(5))
+        meter.register_valueobserver(callback, "name", "desc", "unit", int)
+
+        with self.assertLogs(level=WARNING) as logs:
+            meter.collect()
+        self.assertIn("Timed out", logs.output[0])
+        with self.assertLogs(level=WARNING) as logs:
+            meter.collect()
+        self.assertIn("still running", logs.output[0])
+        self.assertEqual(callback.call_count, 1)
+
+        event.set()
+        meter_provider.observer_executor.submit(lambda: None).result()
+        meter.collect()
+        self.assertEqual(callback.call_count, 2)
+
     def test_record_batch(self):
         meter = metrics.MeterProvider().get_meter(__name__)
         labels = {"key1": "value1", "key2": "value2", "key3": "value3"}
@@ -153,6 +314,48 @@ class TestMeter(unittest.TestCase):
             (3.0, 3.0, 3.0, 1),
         )
 
+    def test_record_batch_encodes_labels_once(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        counter = meter.create_counter("name", "desc", "unit", int)
+        valuerecorder = meter.create_valuerecorder("name", "desc", "unit", int)
+        with patch(
+            "opentelemetry.sdk.metrics.get_dict_as_key",
+            wraps=metrics.get_dict_as_key,
+        ) as get_dict_as_key:
+            meter.record_batch({"key": "value"}, [(counter, 1), (counter, 2)])
+            meter.record_batch({"key": "value"}, [(valuerecorder, 3)])
+        self.assertEqual(get_dict_as_key.call_count, 2)
+        bound_counter = counter.bound_instruments[(("key", "value"),)]
+        self.assertEqual(bound_counter.view_datas.pop().aggregator.current, 3)
+
+    def test_bind_batch(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        counter = meter.create_counter("name", "desc", "unit", int)
+        valuerecorder = meter.create_valuerecorder("name", "desc", "unit", int)
+        bound_batch = meter.bind_batch({"key": "value"})
+        bound_batch.record([(counter, 1), (valuerecorder, 3)])
+        bound_batch.record([(counter, 2), (counter, -1)])
+
+        labels_key = (("key", "value"),)
+        bound_counter = counter.bound_instruments[labels_key]
+        self.assertEqual(bound_counter.ref_count(), 1)
+        self.assertEqual(
+            list(bound_counter.view_datas)[0].aggregator.current, 3
+        )
+        bound_valuerecorder = valuerecorder.bound_instruments[labels_key]
+        self.assertEqual(
+            list(bound_valuerecorder.view_datas)[0].aggregator.current,
+            (3, 3, 3, 1),
+        )
+
+        # bound instruments are kept until the batch is released
+        meter.collect()
+        self.assertIn(labels_key, counter.bound_instruments)
+        bound_batch.release()
+        self.assertEqual(bound_counter.ref_count(), 0)
+        meter.collect()
+        self.assertNotIn(labels_key, counter.bound_instruments)
+
     def test_create_counter(self):
         resource = Mock(spec=resources.Resource)
         meter_provider = metrics.MeterProvider(resource=resource)
@@ -273,6 +476,136 @@ class TestMetric(unittest.TestCase):
                 metric.bound_instruments.get(key_labels), bound_instrument
             )
 
+    def test_unbound_calls_reuse_label_keys(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        metric = metrics.Counter("name", "desc", "unit", int, meter)
+        meter.register_view(View(metric, SumAggregator))
+        metric.add(1, {"b": "2", "a": "1"})
+        bound_counter = metric.bind({"a": "1", "b": "2"})
+        self.assertEqual(bound_counter.ref_count(), 1)
+
+        with patch("opentelemetry.sdk.metrics.get_dict_as_key") as mock_key:
+            metric.add(2, {"b": "2", "a": "1"})
+            metric.add(3, {"b": "2", "a": "1"})
+            self.assertFalse(mock_key.called)
+        # unbound calls don't take references
+        self.assertEqual(bound_counter.ref_count(), 1)
+        self.assertEqual(len(metric.bound_instruments), 1)
+        self.assertEqual(bound_counter.view_datas.pop().aggregator.current, 6)
+
+        # unhashable label values are not cached
+        metric.add(1, {"a": ["1", "2"]})
+        self.assertIn((("a", ("1", "2")),), metric.bound_instruments)
+
+    @patch("opentelemetry.sdk.metrics.logger")
+    def test_invalid_unbound_calls_removed(self, logger_mock):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        counter = meter.create_counter("counter", "desc", "unit", int)
+        recorder = meter.create_valuerecorder("recorder", "desc", "unit", int)
+        for i in range(100):
+            counter.add(-1, {"key": str(i)})
+            recorder.record(1.5, {"key": str(i)})
+            meter.record_batch({"batch": str(i)}, [(counter, -1)])
+        self.assertEqual(logger_mock.warning.call_count, 300)
+
+        # the bound instruments created for the invalid values are removed
+        # on collection
+        meter.collect()
+        self.assertEqual(counter.bound_instruments, {})
+        self.assertEqual(recorder.bound_instruments, {})
+
+    @patch("opentelemetry.sdk.metrics._LABEL_KEY_CACHE_SIZE", 2)
+    def test_label_key_cache_eviction(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        metric = meter.create_counter("name", "desc", "unit", int)
+        for value in ("1", "2", "1", "3"):
+            metric.add(1, {"key": value})
+        # pylint: disable=protected-access
+        self.assertEqual(
+            list(metric._label_keys),
+            [(("key", "1"),), (("key", "3"),)],
+        )
+
+        # bound instruments of unbound calls are removed on collection
+        meter.collect()
+        self.assertEqual(metric.bound_instruments, {})
+        metric.add(1, {"key": "1"})
+        self.assertEqual(len(metric.bound_instruments), 1)
+
+    @patch("opentelemetry.sdk.metrics.logger")
+    def test_cardinality_limit(self, logger_mock):
+        meter = metrics.MeterProvider(cardinality_limit=2).get_meter(__name__)
+        metric = meter.create_counter("name", "desc", "unit", int)
+        bound_counter = metric.bind({"key": "1"})
+        for value in ("1", "2", "3", "4"):
+            metric.add(1, {"key": value})
+        self.assertIs(metric.bind({"key": "5"}), metric.bind({"key": "6"}))
+
+        self.assertEqual(
+            set(metric.bound_instruments),
+            {(("key", "1"),), (("key", "2"),), metrics.OVERFLOW_LABELS},
+        )
+        self.assertEqual(metric.overflow_count, 4)
+        self.assertEqual(logger_mock.warning.call_count, 1)
+        overflow_counter = metric.bound_instruments[metrics.OVERFLOW_LABELS]
+        self.assertEqual(
+            overflow_counter.view_datas.pop().aggregator.current, 2
+        )
+
+        # the stateful processor keeps the series that are not bound
+        # anymore, so they still count against the limit
+        metric.bound_instruments[metrics.OVERFLOW_LABELS].release()
+        metric.bound_instruments[metrics.OVERFLOW_LABELS].release()
+        meter.collect()
+        self.assertEqual(list(metric.bound_instruments), [(("key", "1"),)])
+        metric.add(1, {"key": "7"})
+        self.assertNotIn((("key", "7"),), metric.bound_instruments)
+        metric.add(1, {"key": "2"})
+        self.assertIn((("key", "2"),), metric.bound_instruments)
+        bound_counter.release()
+
+    def test_cardinality_limit_stateless(self):
+        meter = metrics.MeterProvider(
+            stateful=False, cardinality_limit=2
+        ).get_meter(__name__)
+        metric = meter.create_counter("name", "desc", "unit", int)
+        bound_counter = metric.bind({"key": "1"})
+        for value in ("2", "3"):
+            metric.add(1, {"key": value})
+        self.assertIn(metrics.OVERFLOW_LABELS, metric.bound_instruments)
+
+        # series that are not bound anymore are removed on collection, which
+        # makes room for new label sets
+        meter.collect()
+        self.assertEqual(list(metric.bound_instruments), [(("key", "1"),)])
+        metric.add(1, {"key": "7"})
+        self.assertIn((("key", "7"),), metric.bound_instruments)
+        bound_counter.release()
+
+    def test_cardinality_limit_bounds_memory(self):
+        for stateful in (True, False):
+            meter = metrics.MeterProvider(
+                stateful=stateful, cardinality_limit=10
+            ).get_meter(__name__)
+            metric = meter.create_counter("name", "desc", "unit", int)
+            for collection in range(100):
+                for index in range(10):
+                    metric.add(1, {"key": "{}-{}".format(collection, index)})
+                meter.collect()
+                meter.processor.finished_collection()
+
+            self.assertEqual(len(metric.bound_instruments), 0)
+            (view,) = meter.view_manager.views[metric]
+            self.assertEqual(len(view.view_datas), 0)
+            # pylint: disable=protected-access
+            if stateful:
+                # the first label sets and the overflow series
+                self.assertEqual(len(meter.processor._batch_map), 11)
+                self.assertEqual(metric.overflow_count, 990)
+            else:
+                self.assertEqual(len(meter.processor._batch_map), 10)
+                self.assertEqual(metric.overflow_count, 0)
+
 
 class TestCounter(unittest.TestCase):
     def test_add(self):
@@ -361,6 +694,18 @@ class TestSumObserver(unittest.TestCase):
 
         self.assertEqual(observer.aggregators[key_labels].current, values[-1])
 
+    def test_cardinality_limit(self):
+        observer = metrics.SumObserver(
+            None, "name", "desc", "unit", int, Mock(), ("key",), True, 2
+        )
+        for value in ("1", "2", "3", "4"):
+            observer.observe(1, {"key": value})
+        self.assertEqual(
+            set(observer.aggregators),
+            {(("key", "1"),), (("key", "2"),), metrics.OVERFLOW_LABELS},
+        )
+        self.assertEqual(observer.overflow_count, 2)
+
     def test_observe_disabled(self):
         observer = metrics.SumObserver(
             None, "name", "desc", "unit", int, Mock(), ("key",), False
@@ -20,6 +20,7 @@ from opentelemetry.sdk import metrics
 from opentelemetry.sdk.metrics import view
 from opentelemetry.sdk.metrics.export import aggregate
 from opentelemetry.sdk.metrics.export.aggregate import (
+    ExponentialHistogramAggregator,
     HistogramAggregator,
     MinMaxSumCountAggregator,
     SumAggregator,
@@ -296,6 +297,96 @@ class TestHistogramView(unittest.TestCase):
             ((20, 1), (40, 1), (60, 0), (80, 0), (100, 0), (inf, 1)),
         )
 
+    def test_exponential_histogram_stateful(self):
+        meter = metrics.MeterProvider(stateful=True).get_meter(__name__)
+        exporter = InMemoryMetricsExporter()
+        controller = PushController(meter, exporter, 30)
+
+        requests_duration = meter.create_valuerecorder(
+            name="requests_duration",
+            description="duration of requests",
+            unit="ms",
+            value_type=float,
+        )
+
+        duration_view = View(
+            requests_duration,
+            ExponentialHistogramAggregator,
+            aggregator_config={"max_size": 8},
+            label_keys=["environment"],
+            view_config=ViewConfig.LABEL_KEYS,
+        )
+
+        meter.register_view(duration_view)
+
+        requests_duration.record(0.5, {"environment": "staging"})
+        requests_duration.record(2.0, {"environment": "staging"})
+        controller.tick()
+        exporter.clear()
+
+        requests_duration.record(1000.0, {"environment": "staging"})
+        controller.tick()
+
+        metrics_list = exporter.get_exported_metrics()
+        self.assertEqual(len(metrics_list), 1)
+        checkpoint = metrics_list[0].aggregator.checkpoint
+        self.assertEqual(checkpoint.count, 3)
+        self.assertEqual(checkpoint.sum, 1002.5)
+        self.assertLessEqual(len(checkpoint.positive.counts), 8)
+        self.assertEqual(sum(checkpoint.positive.counts), 3)
+
+
+
+class TestView(unittest.TestCase):
+    def setUp(self):
+        meter = metrics.MeterProvider().get_meter(__name__)
+        self.counter = meter.create_counter("counter", "", "1", int)
+
+    def test_get_view_data_label_keys(self):
+        counter_view = View(
+            self.counter,
+            SumAggregator,
+            label_keys=["environment", "a"],
+            view_config=ViewConfig.LABEL_KEYS,
+        )
+        view_data = counter_view.get_view_data(
+            (("a", 1), ("customer_id", 123), ("environment", "production"))
+        )
+        self.assertEqual(
+            view_data.labels, (("a", 1), ("environment", "production"))
+        )
+        self.assertIs(
+            counter_view.get_view_data(
+                (("a", 1), ("customer_id", 247), ("environment", "production"))
+            ),
+            view_data,
+        )
+        self.assertIsNot(counter_view.get_view_data((("a", 2),)), view_data)
+        self.assertEqual(len(counter_view.view_datas), 2)
+
+    def test_get_view_data_drop_all(self):
+        counter_view = View(
+            self.counter, SumAggregator, view_config=ViewConfig.DROP_ALL
+        )
+        view_data = counter_view.get_view_data((("a", 1),))
+        self.assertEqual(view_data.labels, ())
+        self.assertIs(counter_view.get_view_data((("b", 2),)), view_data)
+
+    def test_release_view_datas(self):
+        view_manager = view.ViewManager()
+        counter_view = View(
+            self.counter, SumAggregator, view_config=ViewConfig.DROP_ALL
+        )
+        view_manager.register_view(counter_view)
+        view_datas_a = view_manager.get_view_datas(self.counter, (("a", 1),))
+        view_datas_b = view_manager.get_view_datas(self.counter, (("b", 2),))
+        self.assertEqual(view_datas_a, view_datas_b)
+
+        # still used by the other bound instrument
+        view_manager.release_view_datas(self.counter, view_datas_a)
+        self.assertEqual(len(counter_view.view_datas), 1)
+        view_manager.release_view_datas(self.counter, view_datas_b)
+        self.assertEqual(len(counter_view.view_datas), 0)
 
 class DummyMetric(metrics.Metric):
     # pylint: disable=W0231
@@ -0,0 +1,200 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from opentelemetry.sdk import metrics
+from opentelemetry.sdk.metrics.export.aggregate import (
+    DDSketchAggregator,
+    ExponentialHistogramAggregator,
+    HistogramAggregator,
+    SumAggregator,
+)
+from opentelemetry.sdk.metrics.view import View
+
+LABELS = {
+    "http.method": "GET",
+    "http.route": "/users/:id",
+    "http.status_code": "200",
+}
+
+
+NUM_THREADS = 4
+NUM_ADDS = 10000
+NUM_SERIES = 1000
+
+
+def _create_counter(aggregator_config=None):
+    meter = metrics.MeterProvider().get_meter(__name__)
+    counter = meter.create_counter("requests", "desc", "1", int)
+    meter.register_view(
+        View(counter, SumAggregator, aggregator_config=aggregator_config)
+    )
+    return counter
+
+
+def test_counter_add(benchmark):
+    counter = _create_counter()
+
+    def _add():
+        counter.add(1, LABELS)
+
+    benchmark(_add)
+
+
+def test_bound_counter_add(benchmark):
+    bound_counter = _create_counter().bind(LABELS)
+
+    def _add():
+        bound_counter.add(1)
+
+    benchmark(_add)
+
+
+@pytest.mark.parametrize(
+    "per_thread", [False, True], ids=["locked", "striped"]
+)
+def test_bound_counter_add_threads(benchmark, per_thread):
+    bound_counter = _create_counter({"per_thread": per_thread}).bind(LABELS)
+
+    def _add():
+        for _ in range(NUM_ADDS):
+            bound_counter.add(1)
+
+    def _add_threads():
+        threads = [
+            threading.Thread(target=_add) for _ in range(NUM_THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    benchmark(_add_threads)
+
+
+
+def _create_batch_instruments():
+    meter = metrics.MeterProvider().get_meter(__name__)
+    counter = meter.create_counter("requests", "desc", "1", int)
+    valuerecorder = meter.create_valuerecorder("latency", "desc", "ms", float)
+    return meter, [(counter, 1), (valuerecorder, 12.5)]
+
+
+def test_record_batch(benchmark):
+    meter, record_tuples = _create_batch_instruments()
+
+    def _record_batch():
+        meter.record_batch(LABELS, record_tuples)
+
+    benchmark(_record_batch)
+
+
+def test_bound_batch_record(benchmark):
+    meter, record_tuples = _create_batch_instruments()
+    bound_batch = meter.bind_batch(LABELS)
+
+    def _record():
+        bound_batch.record(record_tuples)
+
+    benchmark(_record)
+
+
+def test_collect_few_updated(benchmark):
+    meter = metrics.MeterProvider(cardinality_limit=0).get_meter(__name__)
+    counter = meter.create_counter("requests", "desc", "1", int)
+    bound_counters = [
+        counter.bind({"http.status_code": str(code)})
+        for code in range(NUM_SERIES)
+    ]
+
+    def _collect():
+        for bound_counter in bound_counters[:10]:
+            bound_counter.add(1)
+        meter.collect()
+
+    benchmark(_collect)
+
+def test_histogram_update(benchmark):
+    histogram = HistogramAggregator(
+        {"bounds": [2 ** exponent for exponent in range(40)]}
+    )
+
+    def _update():
+        histogram.update(12345)
+
+    benchmark(_update)
+
+
+def test_histogram_update_many(benchmark):
+    histogram = HistogramAggregator(
+        {"bounds": [2 ** exponent for exponent in range(40)]}
+    )
+    values = list(range(0, 100000, 100))
+
+    def _update_many():
+        histogram.update_many(values)
+
+    benchmark(_update_many)
+
+
+def test_exponential_histogram_update(benchmark):
+    histogram = ExponentialHistogramAggregator()
+    values = [1.001 ** exponent for exponent in range(-5000, 5000, 7)]
+
+    def _update():
+        for value in values:
+            histogram.update(value)
+
+    benchmark(_update)
+
+
+def test_ddsketch_update(benchmark):
+    sketch = DDSketchAggregator()
+    values = [1.001 ** exponent for exponent in range(-5000, 5000, 7)]
+
+    def _update():
+        for value in values:
+            sketch.update(value)
+
+    benchmark(_update)
+
+
+def test_stateless_collect(benchmark):
+    meter = metrics.MeterProvider(stateful=False).get_meter(__name__)
+    valuerecorder = meter.create_valuerecorder("latency", "desc", "ms", float)
+    meter.register_view(
+        View(
+            valuerecorder,
+            HistogramAggregator,
+            aggregator_config={
+                "bounds": [2 ** exponent for exponent in range(40)]
+            },
+        )
+    )
+    bound_valuerecorders = [
+        valuerecorder.bind({"http.status_code": str(code)})
+        for code in range(NUM_SERIES)
+    ]
+
+    def _collect():
+        for bound_valuerecorder in bound_valuerecorders:
+            bound_valuerecorder.record(12.5)
+        meter.collect()
+        meter.processor.checkpoint_set()
+        meter.processor.finished_collection()
+
+    benchmark(_collect)
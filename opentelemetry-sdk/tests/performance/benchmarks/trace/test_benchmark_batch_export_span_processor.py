@@ -0,0 +1,153 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from opentelemetry import trace as trace_api
+from opentelemetry.sdk import trace
+from opentelemetry.sdk.trace import export
+from opentelemetry.util import time_ns
+
+NUM_THREADS = 32
+SPANS_PER_THREAD = 1000
+
+NUM_BURSTS = 10
+SPANS_PER_BURST = 200
+BURST_INTERVAL = 0.05
+
+
+class NoOpSpanExporter(export.SpanExporter):
+    def export(self, spans):
+        return export.SpanExportResult.SUCCESS
+
+
+class LatencySpanExporter(export.SpanExporter):
+    """Records the time between the end of every span and its export."""
+
+    def __init__(self):
+        self.latencies = []
+
+    def export(self, spans):
+        now = time_ns()
+        self.latencies.extend(now - span.end_time for span in spans)
+        return export.SpanExportResult.SUCCESS
+
+
+def _create_ended_span():
+    span = trace._Span(  # pylint: disable=protected-access
+        "benchmark",
+        trace_api.SpanContext(
+            0xDEADBEEF,
+            0xDEADBEEF,
+            is_remote=False,
+            trace_flags=trace_api.TraceFlags(trace_api.TraceFlags.SAMPLED),
+        ),
+    )
+    span.start()
+    span.end()
+    return span
+
+
+def _end_spans_concurrently(executor, span_processor, span):
+    barrier = threading.Barrier(NUM_THREADS)
+
+    def producer():
+        barrier.wait()
+        for _ in range(SPANS_PER_THREAD):
+            span_processor.on_end(span)
+
+    futures = [executor.submit(producer) for _ in range(NUM_THREADS)]
+    for future in futures:
+        future.result()
+
+
+@pytest.mark.parametrize("sharded_queue", [False, True])
+def test_batch_export_span_processor_on_end_contended(
+    benchmark, sharded_queue
+):
+    span_processor = export.BatchExportSpanProcessor(
+        NoOpSpanExporter(), sharded_queue=sharded_queue,
+    )
+    span = _create_ended_span()
+
+    # reuse the producer threads so that starting them is not measured
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+
+        def setup():
+            # avoid measuring a garbage collection pass
+            gc.collect()
+            return (executor, span_processor, span), {}
+
+        benchmark.pedantic(
+            _end_spans_concurrently, setup=setup, rounds=10, warmup_rounds=1,
+        )
+    span_processor.shutdown()
+
+
+def _end_span_bursts(tracer, span_processor):
+    for _ in range(NUM_BURSTS):
+        for _ in range(SPANS_PER_BURST):
+            tracer.start_span("benchmark").end()
+        time.sleep(BURST_INTERVAL)
+    # flushing caps the latency of spans held back by long schedule delays
+    span_processor.force_flush()
+
+
+@pytest.mark.parametrize(
+    "schedule",
+    [
+        {"schedule_delay_millis": 5000},
+        {"schedule_delay_millis": 20},
+        {
+            "schedule_delay_millis": 5000,
+            "adaptive_schedule": True,
+            "min_schedule_delay_millis": 20,
+        },
+    ],
+    ids=["fixed-5000ms", "fixed-20ms", "adaptive-20ms-5000ms"],
+)
+def test_batch_export_span_processor_bursty_latency(benchmark, schedule):
+    exporter = LatencySpanExporter()
+    span_processor = export.BatchExportSpanProcessor(exporter, **schedule)
+    tracer_provider = trace.TracerProvider()
+    tracer_provider.add_span_processor(span_processor)
+    tracer = tracer_provider.get_tracer(__name__)
+
+    # count the times the worker thread returns from waiting for spans
+    wakeups = []
+    wait = span_processor.condition.wait
+
+    def count_wakeups(timeout=None):
+        result = wait(timeout)
+        wakeups.append(result)
+        return result
+
+    span_processor.condition.wait = count_wakeups
+
+    benchmark.pedantic(
+        _end_span_bursts, args=(tracer, span_processor), rounds=1
+    )
+    span_processor.shutdown()
+
+    latencies = sorted(exporter.latencies)
+    assert len(latencies) == NUM_BURSTS * SPANS_PER_BURST
+    benchmark.extra_info["p99_latency_millis"] = (
+        latencies[int(len(latencies) * 0.99)] / 1e6
+    )
+    benchmark.extra_info["worker_wakeups"] = len(wakeups)
@@ -0,0 +1,36 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from opentelemetry import trace as trace_api
+
+IDS_GENERATORS = [
+    trace_api.RandomIdsGenerator,
+    trace_api.FastRandomIdsGenerator,
+]
+
+
+@pytest.mark.parametrize(
+    "ids_generator_class", IDS_GENERATORS, ids=["random", "fast_random"]
+)
+def test_generate_span_id(benchmark, ids_generator_class):
+    benchmark(ids_generator_class().generate_span_id)
+
+
+@pytest.mark.parametrize(
+    "ids_generator_class", IDS_GENERATORS, ids=["random", "fast_random"]
+)
+def test_generate_trace_id(benchmark, ids_generator_class):
+    benchmark(ids_generator_class().generate_trace_id)
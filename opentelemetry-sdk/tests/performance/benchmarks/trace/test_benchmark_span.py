@@ -0,0 +1,120 @@
+# Copyright The OpenTelemetry Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tracemalloc
+
+import pytest
+
+from opentelemetry import trace as trace_api
+from opentelemetry.sdk import trace
+from opentelemetry.sdk.trace import sampling
+
+NUM_SPANS = 1000
+
+CONTEXT = trace_api.SpanContext(
+    0xDEADBEEF,
+    0xDEADBEEF,
+    is_remote=False,
+    trace_flags=trace_api.TraceFlags(trace_api.TraceFlags.SAMPLED),
+)
+
+
+def _create_span():
+    # the common case: a few attributes and no events or links
+    return trace._Span(  # pylint: disable=protected-access
+        "benchmark",
+        CONTEXT,
+        attributes={
+            "http.method": "GET",
+            "http.url": "https://example.com/",
+            "http.status_code": 200,
+        },
+    )
+
+
+def test_span_creation(benchmark):
+    benchmark(_create_span)
+
+
+@pytest.mark.parametrize("rate", [0.0, 0.01, 1.0], ids=["0%", "1%", "100%"])
+def test_start_span_sampling(benchmark, rate):
+    tracer_provider = trace.TracerProvider(
+        sampler=sampling.TraceIdRatioBased(rate)
+    )
+    tracer = tracer_provider.get_tracer(__name__)
+
+    def _start_span():
+        tracer.start_span("benchmark", attributes={"http.method": "GET"})
+
+    benchmark(_start_span)
+
+
+def test_span_set_attribute(benchmark):
+    span = _create_span()
+    span.start()
+
+    def _set_attributes():
+        span.set_attribute("http.method", "GET")
+        span.set_attribute("http.status_code", 200)
+        span.set_attribute("http.flavors", ["1.1", "2"])
+
+    benchmark(_set_attributes)
+
+
+def test_span_set_attributes(benchmark):
+    span = _create_span()
+    span.start()
+
+    def _set_attributes():
+        span.set_attributes(
+            {
+                "http.method": "GET",
+                "http.status_code": 200,
+                "http.flavors": ["1.1", "2"],
+            }
+        )
+
+    benchmark(_set_attributes)
+
+
+def test_span_set_interned_attributes(benchmark):
+    tracer_provider = trace.TracerProvider(max_interned_attribute_sets=16)
+    span = tracer_provider.get_tracer(__name__).start_span("benchmark")
+
+    def _set_attributes():
+        span.set_attributes(
+            {
+                "http.method": "GET",
+                "net.peer.name": "example.com",
+                "http.status_code": 200,
+            }
+        )
+
+    benchmark(_set_attributes)
+
+
+def test_span_memory(benchmark):
+    def _measure():
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            spans = [_create_span() for _ in range(NUM_SPANS)]
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        assert len(spans) == NUM_SPANS
+        return (after - before) / NUM_SPANS
+
+    bytes_per_span = benchmark.pedantic(_measure, rounds=1)
+    benchmark.extra_info["bytes_per_span"] = bytes_per_span
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import collections
+import threading
 import unittest
 
 from opentelemetry.sdk.util import BoundedDict, BoundedList
@@ -211,3 +212,20 @@ class TestBoundedDict(unittest.TestCase):
 
         with self.assertRaises(KeyError):
             _ = bdict["new-name"]
+
+    def test_shared_lock(self):
+        lock = threading.Lock()
+        bdict = BoundedDict(len(self.base), lock)
+        blist = BoundedList.from_seq(4, [1, 2], lock)
+
+        bdict["name"] = "Bruno"
+        blist.append(3)
+        self.assertFalse(lock.locked())
+
+        # the owner of the lock can add elements while holding it
+        with lock:
+            # pylint: disable=protected-access
+            bdict._set("age", 22)
+            blist._append(4)
+        self.assertEqual(dict(bdict), {"name": "Bruno", "age": 22})
+        self.assertEqual(list(blist), [1, 2, 3, 4])
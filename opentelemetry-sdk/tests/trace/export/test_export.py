@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import os
+import subprocess
+import sys
 import threading
 import time
 import unittest
@@ -23,7 +25,8 @@ from unittest import mock
 from opentelemetry import trace as trace_api
 from opentelemetry.configuration import Configuration
 from opentelemetry.context import Context
-from opentelemetry.sdk import trace
+from opentelemetry.sdk import metrics, trace
+from opentelemetry.sdk.metrics.export.aggregate import HistogramAggregator
 from opentelemetry.sdk.trace import export
 
 
@@ -36,12 +39,14 @@ class MySpanExporter(export.SpanExporter):
         max_export_batch_size=None,
         export_timeout_millis=0.0,
         export_event: threading.Event = None,
+        export_result: export.SpanExportResult = export.SpanExportResult.SUCCESS,
     ):
         self.destination = destination
         self.max_export_batch_size = max_export_batch_size
         self.is_shutdown = False
         self.export_timeout = export_timeout_millis / 1e3
         self.export_event = export_event
+        self.export_result = export_result
 
     def export(self, spans: trace.Span) -> export.SpanExportResult:
         if (
@@ -53,7 +58,7 @@ class MySpanExporter(export.SpanExporter):
         self.destination.extend(span.name for span in spans)
         if self.export_event:
             self.export_event.set()
-        return export.SpanExportResult.SUCCESS
+        return self.export_result
 
     def shutdown(self):
         self.is_shutdown = True
@@ -155,6 +160,11 @@ def _create_start_and_end_span(name, span_processor):
 
 
 class TestBatchExportSpanProcessor(unittest.TestCase):
+    def setUp(self) -> None:
+        # the configuration object may have been created by other tests
+        # pylint: disable=protected-access
+        Configuration._reset()
+
     def tearDown(self) -> None:
         # reset global state of configuration object
         # pylint: disable=protected-access
@@ -167,6 +177,11 @@ class TestBatchExportSpanProcessor(unittest.TestCase):
             "OTEL_BSP_SCHEDULE_DELAY_MILLIS": "2",
             "OTEL_BSP_MAX_EXPORT_BATCH_SIZE": "3",
             "OTEL_BSP_EXPORT_TIMEOUT_MILLIS": "4",
+            "OTEL_BSP_SHARDED_QUEUE": "True",
+            "OTEL_BSP_MAX_CONCURRENT_EXPORTS": "5",
+            "OTEL_BSP_MAX_EXPORT_BATCH_BYTES": "6",
+            "OTEL_BSP_ADAPTIVE_SCHEDULE": "True",
+            "OTEL_BSP_MIN_SCHEDULE_DELAY_MILLIS": "1",
         },
     )
     def test_batch_span_processor_environment_variables(self):
@@ -179,6 +194,12 @@ class TestBatchExportSpanProcessor(unittest.TestCase):
         self.assertEqual(batch_span_processor.schedule_delay_millis, 2)
         self.assertEqual(batch_span_processor.max_export_batch_size, 3)
         self.assertEqual(batch_span_processor.export_timeout_millis, 4)
+        self.assertTrue(batch_span_processor.sharded_queue)
+        self.assertEqual(batch_span_processor.max_concurrent_exports, 5)
+        self.assertEqual(batch_span_processor.max_export_batch_bytes, 6)
+        self.assertTrue(batch_span_processor.adaptive_schedule)
+        self.assertEqual(batch_span_processor.min_schedule_delay_millis, 1)
+        batch_span_processor.shutdown()
 
     def test_on_start_accepts_parent_context(self):
         # pylint: disable=no-self-use
@@ -215,6 +236,32 @@ class TestBatchExportSpanProcessor(unittest.TestCase):
         # force_flush()
         self.assertListEqual(span_names, spans_names_list)
 
+    def test_shutdown_cancels_retries(self):
+        retries_cancelled = threading.Event()
+
+        class RetryingSpanExporter(MySpanExporter):
+            def export(self, spans):
+                # waits to retry until the retries are cancelled
+                retries_cancelled.wait(10)
+                return super().export(spans)
+
+            def cancel_retries(self):
+                retries_cancelled.set()
+
+        spans_names_list = []
+        my_exporter = RetryingSpanExporter(destination=spans_names_list)
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter, schedule_delay_millis=10
+        )
+        _create_start_and_end_span("foo", span_processor)
+
+        start = time.time()
+        span_processor.shutdown()
+        self.assertLess(time.time() - start, 5)
+        self.assertTrue(retries_cancelled.is_set())
+        self.assertTrue(my_exporter.is_shutdown)
+        self.assertListEqual(["foo"], spans_names_list)
+
     def test_flush(self):
         spans_names_list = []
 
@@ -418,6 +465,284 @@ class TestBatchExportSpanProcessor(unittest.TestCase):
 
         span_processor.shutdown()
 
+    def test_stats(self):
+        spans_names_list = []
+
+        my_exporter = MySpanExporter(destination=spans_names_list)
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter, max_export_batch_size=2
+        )
+
+        for name in ("xxx", "bar", "foo"):
+            _create_start_and_end_span(name, span_processor)
+
+        self.assertTrue(span_processor.force_flush())
+        stats = span_processor.stats()
+        self.assertEqual(stats.spans_enqueued, 3)
+        self.assertEqual(stats.spans_dropped, 0)
+        self.assertEqual(stats.spans_exported, 3)
+        self.assertEqual(stats.spans_failed, 0)
+        self.assertEqual(stats.batches_exported, 2)
+        self.assertEqual(stats.queue_size, 0)
+        span_processor.shutdown()
+
+    def test_stats_dropped_spans(self):
+        exporting = threading.Event()
+        release = threading.Event()
+        exported = []
+
+        def blocking_export(spans):
+            exporting.set()
+            release.wait(5)
+            exported.extend(spans)
+            return export.SpanExportResult.SUCCESS
+
+        my_exporter = MySpanExporter(destination=[])
+        my_exporter.export = blocking_export
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter, max_queue_size=4, max_export_batch_size=2
+        )
+
+        # block the worker thread in an export call
+        for _ in range(2):
+            _create_start_and_end_span("foo", span_processor)
+        self.assertTrue(exporting.wait(2))
+
+        with self.assertLogs(level=WARNING):
+            for _ in range(10):
+                _create_start_and_end_span("foo", span_processor)
+
+        stats = span_processor.stats()
+        self.assertEqual(stats.spans_enqueued, 12)
+        self.assertEqual(stats.spans_dropped, 6)
+        self.assertEqual(stats.queue_size, 4)
+
+        release.set()
+        span_processor.shutdown()
+        stats = span_processor.stats()
+        self.assertEqual(stats.spans_exported, 6)
+        self.assertEqual(stats.queue_size, 0)
+        self.assertEqual(len(exported), 6)
+
+    def test_stats_failed_export(self):
+        my_exporter = MySpanExporter(
+            destination=[], export_result=export.SpanExportResult.FAILURE
+        )
+        span_processor = export.BatchExportSpanProcessor(my_exporter)
+
+        _create_start_and_end_span("foo", span_processor)
+        self.assertTrue(span_processor.force_flush())
+
+        with mock.patch.object(
+            my_exporter, "export", side_effect=ValueError
+        ), self.assertLogs(level=WARNING):
+            _create_start_and_end_span("bar", span_processor)
+            self.assertTrue(span_processor.force_flush())
+
+        stats = span_processor.stats()
+        self.assertEqual(stats.spans_exported, 0)
+        self.assertEqual(stats.spans_failed, 2)
+        span_processor.shutdown()
+
+    def test_metrics(self):
+        meter = metrics.MeterProvider(shutdown_on_exit=False).get_meter(
+            __name__
+        )
+        my_exporter = MySpanExporter(destination=[])
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter, max_export_batch_size=16, meter=meter
+        )
+
+        for name in ("xxx", "bar", "foo"):
+            _create_start_and_end_span(name, span_processor)
+        self.assertTrue(span_processor.force_flush())
+
+        meter.collect()
+        checkpoints = {
+            record.instrument.name: record.aggregator
+            for record in meter.processor.checkpoint_set()
+        }
+        self.assertEqual(checkpoints["otel.bsp.spans_enqueued"].checkpoint, 3)
+        self.assertEqual(checkpoints["otel.bsp.spans_exported"].checkpoint, 3)
+        self.assertEqual(checkpoints["otel.bsp.spans_dropped"].checkpoint, 0)
+        self.assertEqual(checkpoints["otel.bsp.queue_size"].checkpoint, 0)
+
+        batch_size = checkpoints["otel.bsp.batch_size"]
+        self.assertIsInstance(batch_size, HistogramAggregator)
+        self.assertEqual(list(batch_size.checkpoint), [1, 4, 16, float("inf")])
+        self.assertEqual(batch_size.checkpoint[4], 1)
+        self.assertIsInstance(
+            checkpoints["otel.bsp.export_duration"], HistogramAggregator
+        )
+        self.assertEqual(
+            sum(checkpoints["otel.bsp.export_duration"].checkpoint.values()),
+            1,
+        )
+        span_processor.shutdown()
+
+    def test_metrics_sdk_not_imported(self):
+        # the metrics SDK is only imported when a meter is given
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import sys\n"
+                "from opentelemetry.sdk.trace import export\n"
+                "print('opentelemetry.sdk.metrics' in sys.modules)",
+            ]
+        )
+        self.assertEqual(output.strip(), b"False")
+
+    def test_concurrent_exports(self):
+        max_concurrent_exports = 3
+        release = threading.Event()
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+        exported = []
+
+        def blocking_export(spans):
+            with lock:
+                in_flight.append(spans)
+                max_in_flight.append(len(in_flight))
+            release.wait(5)
+            with lock:
+                in_flight.remove(spans)
+                exported.extend(spans)
+            return export.SpanExportResult.SUCCESS
+
+        my_exporter = MySpanExporter(destination=[])
+        my_exporter.export = blocking_export
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter,
+            max_queue_size=64,
+            max_export_batch_size=2,
+            max_concurrent_exports=max_concurrent_exports,
+        )
+
+        for _ in range(20):
+            _create_start_and_end_span("foo", span_processor)
+
+        flush_result = []
+        flush_thread = threading.Thread(
+            target=lambda: flush_result.append(span_processor.force_flush())
+        )
+        flush_thread.start()
+
+        # wait for the worker thread to fill all export slots
+        for _ in range(200):
+            with lock:
+                if len(in_flight) == max_concurrent_exports:
+                    break
+            time.sleep(0.01)
+        with lock:
+            self.assertEqual(len(in_flight), max_concurrent_exports)
+        self.assertTrue(flush_thread.is_alive())
+
+        release.set()
+        flush_thread.join(5)
+        self.assertEqual(flush_result, [True])
+
+        # force_flush only returns once the batches in flight are exported
+        self.assertEqual(len(exported), 20)
+        self.assertEqual(max(max_in_flight), max_concurrent_exports)
+        self.assertEqual(span_processor.stats().spans_exported, 20)
+        span_processor.shutdown()
+
+    def test_concurrent_exports_shutdown(self):
+        spans_names_list = []
+
+        my_exporter = MySpanExporter(
+            destination=spans_names_list, export_timeout_millis=50
+        )
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter, max_export_batch_size=2, max_concurrent_exports=4
+        )
+
+        span_names = ["span {}".format(idx) for idx in range(9)]
+        for name in span_names:
+            _create_start_and_end_span(name, span_processor)
+
+        span_processor.shutdown()
+        self.assertTrue(my_exporter.is_shutdown)
+        self.assertCountEqual(span_names, spans_names_list)
+
+    def test_max_export_batch_bytes(self):
+        batches = []
+
+        class SizedSpanExporter(MySpanExporter):
+            def export(self, spans):
+                batches.append([span.name for span in spans])
+                return super().export(spans)
+
+            def estimate_encoded_size(self, span):
+                return int(span.name.split("-")[1])
+
+        spans_names_list = []
+        span_processor = export.BatchExportSpanProcessor(
+            SizedSpanExporter(destination=spans_names_list),
+            max_export_batch_bytes=100,
+        )
+
+        span_names = [
+            "a-40",
+            "b-40",
+            "c-40",
+            "d-150",
+            "e-10",
+            "f-100",
+        ]
+        for name in span_names:
+            _create_start_and_end_span(name, span_processor)
+
+        self.assertTrue(span_processor.force_flush())
+        self.assertCountEqual(spans_names_list, span_names)
+        for batch in batches:
+            batch_bytes = sum(int(name.split("-")[1]) for name in batch)
+            # a span over the budget is exported on its own
+            self.assertTrue(batch_bytes <= 100 or len(batch) == 1)
+        self.assertEqual(span_processor.stats().spans_exported, 6)
+        self.assertEqual(len(span_processor.queue), 0)
+        span_processor.shutdown()
+
+    def test_adaptive_schedule(self):
+        spans_names_list = []
+
+        export_event = threading.Event()
+        my_exporter = MySpanExporter(
+            destination=spans_names_list, export_event=export_event
+        )
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter,
+            max_queue_size=256,
+            max_export_batch_size=64,
+            schedule_delay_millis=5000,
+            adaptive_schedule=True,
+            min_schedule_delay_millis=10,
+        )
+
+        # a full batch wakes up the worker
+        for _ in range(64):
+            _create_start_and_end_span("foo", span_processor)
+        self.assertTrue(export_event.wait(2))
+
+        # under load, a partial batch is exported well before the max delay
+        start_time = time.time()
+        for _ in range(10):
+            _create_start_and_end_span("foo", span_processor)
+        while len(spans_names_list) < 74 and time.time() - start_time < 2:
+            time.sleep(0.01)
+        self.assertEqual(len(spans_names_list), 74)
+
+        for _ in range(4):
+            for _ in range(256):
+                _create_start_and_end_span("foo", span_processor)
+            time.sleep(0.1)
+
+        self.assertTrue(span_processor.force_flush())
+        self.assertEqual(len(spans_names_list), 74 + 1024)
+        span_processor.shutdown()
+
     def test_batch_span_processor_parameters(self):
         # zero max_queue_size
         self.assertRaises(
@@ -473,6 +798,250 @@ class TestBatchExportSpanProcessor(unittest.TestCase):
             max_export_batch_size=512,
         )
 
+        # zero max_concurrent_exports
+        self.assertRaises(
+            ValueError,
+            export.BatchExportSpanProcessor,
+            None,
+            max_concurrent_exports=0,
+        )
+
+        # negative max_export_batch_bytes
+        self.assertRaises(
+            ValueError,
+            export.BatchExportSpanProcessor,
+            None,
+            max_export_batch_bytes=-1,
+        )
+
+        # zero min_schedule_delay_millis
+        self.assertRaises(
+            ValueError,
+            export.BatchExportSpanProcessor,
+            None,
+            min_schedule_delay_millis=0,
+        )
+
+        # min_schedule_delay_millis > schedule_delay_millis
+        self.assertRaises(
+            ValueError,
+            export.BatchExportSpanProcessor,
+            None,
+            schedule_delay_millis=100,
+            min_schedule_delay_millis=200,
+        )
+
+
+class TestBatchExportSpanProcessorShardedQueue(TestBatchExportSpanProcessor):
+    """Runs the batch span processor tests using a sharded queue."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(
+            "os.environ", {"OTEL_BSP_SHARDED_QUEUE": "True"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_sharded_queue_selected(self):
+        span_processor = export.BatchExportSpanProcessor(
+            MySpanExporter(destination=[])
+        )
+        # pylint: disable=protected-access
+        self.assertIsInstance(span_processor.queue, export._ShardedSpanQueue)
+        span_processor.shutdown()
+
+    def test_multiple_producer_threads_lossless(self):
+        num_threads = 32
+        num_spans = 64
+
+        spans_names_list = []
+        my_exporter = MySpanExporter(destination=spans_names_list)
+        span_processor = export.BatchExportSpanProcessor(
+            my_exporter,
+            max_queue_size=num_threads * num_spans,
+            max_export_batch_size=128,
+        )
+
+        def create_spans(tno: int):
+            for span_idx in range(num_spans):
+                _create_start_and_end_span(
+                    "{}-{}".format(tno, span_idx), span_processor
+                )
+
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for thread_no in range(num_threads):
+                executor.submit(create_spans, thread_no)
+
+        self.assertTrue(span_processor.force_flush())
+        self.assertEqual(len(spans_names_list), num_threads * num_spans)
+
+        # spans ended by the same thread keep their order
+        for thread_no in range(num_threads):
+            prefix = "{}-".format(thread_no)
+            self.assertEqual(
+                [name for name in spans_names_list if name.startswith(prefix)],
+                ["{}-{}".format(thread_no, idx) for idx in range(num_spans)],
+            )
+        span_processor.shutdown()
+
+
+class TestShardedSpanQueue(unittest.TestCase):
+    def test_drops_oldest_span_when_full(self):
+        # pylint: disable=protected-access
+        queue = export._ShardedSpanQueue(2)
+
+        self.assertTrue(queue.put("a"))
+        self.assertTrue(queue.put("b"))
+        self.assertFalse(queue.put("c"))
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(queue.approximate_size(), 2)
+
+        spans_list = [None] * 4
+        self.assertEqual(queue.drain(spans_list, 4), 2)
+        self.assertEqual(spans_list[:2], ["b", "c"])
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.approximate_size(), 0)
+
+        # after draining there is room again
+        self.assertTrue(queue.put("d"))
+
+    def test_drain_limit_and_shards(self):
+        # pylint: disable=protected-access
+        queue = export._ShardedSpanQueue(10)
+
+        def put_spans(prefix):
+            for idx in range(3):
+                queue.put("{}{}".format(prefix, idx))
+
+        for prefix in ("a", "b"):
+            thread = threading.Thread(target=put_spans, args=(prefix,))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(queue), 6)
+        spans_list = [None] * 4
+        self.assertEqual(queue.drain(spans_list, 4), 4)
+        self.assertEqual(queue.drain(spans_list, 4), 2)
+
+        # shards of finished threads are removed once they are empty
+        self.assertEqual(queue.drain(spans_list, 4), 0)
+        self.assertEqual(queue._shards, [])
+
+
+class TestAdaptiveSchedule(unittest.TestCase):
+    def test_update(self):
+        # pylint: disable=protected-access
+        schedule = export._AdaptiveSchedule(0.01, 5.0, 2048, 512)
+        self.assertEqual(schedule.delay, 5.0)
+        self.assertEqual(schedule.wakeup_threshold, 512)
+
+        now = schedule._last_update
+        # 1024 spans per second fill a batch in half a second
+        schedule.update(1024, now + int(1e9))
+        self.assertEqual(schedule.arrival_rate, 1024)
+        self.assertAlmostEqual(schedule.delay, 0.5)
+        self.assertEqual(schedule.wakeup_threshold, 512)
+
+        # bursts are followed right away and bounded by the min delay
+        schedule.update(1024 + 102400, now + int(2e9))
+        self.assertEqual(schedule.arrival_rate, 102400)
+        self.assertEqual(schedule.delay, 0.01)
+
+        # the rate decays by halves without traffic
+        schedule.update(1024 + 102400, now + int(3e9))
+        self.assertEqual(schedule.arrival_rate, 51200)
+        for idx in range(4, 20):
+            schedule.update(1024 + 102400, now + int(idx * 1e9))
+        self.assertEqual(schedule.delay, 5.0)
+
+        # no time passed
+        schedule.update(0, now + int(19e9))
+        self.assertEqual(schedule.delay, 5.0)
+
+    def test_wakeup_threshold(self):
+        # pylint: disable=protected-access
+        schedule = export._AdaptiveSchedule(0.1, 5.0, 2048, 512)
+        for _ in range(10):
+            schedule.record_export(0.9)
+        self.assertAlmostEqual(schedule.export_latency, 0.9, places=0)
+
+        # leave room for the spans arriving during an export
+        schedule.update(2000, schedule._last_update + int(1e9))
+        self.assertLess(schedule.wakeup_threshold, 512)
+        self.assertGreater(schedule.wakeup_threshold, 0)
+        self.assertLessEqual(
+            schedule.wakeup_threshold,
+            2048 - 2000 * (schedule.export_latency + 0.1),
+        )
+
+        # never below a single span
+        schedule.update(200000, schedule._last_update + int(1e9))
+        self.assertEqual(schedule.wakeup_threshold, 1)
+
+
+class TestSpanQueue(unittest.TestCase):
+    def test_requeue(self):
+        # pylint: disable=protected-access
+        for queue in (export._SpanQueue(4), export._ShardedSpanQueue(4)):
+            for span in ("a", "b", "c"):
+                queue.put(span)
+
+            spans_list = [None] * 4
+            self.assertEqual(queue.drain(spans_list, 4), 3)
+            drained = spans_list[:3]
+            queue.requeue(drained[1:])
+            queue.put("d")
+            self.assertEqual(len(queue), 3)
+
+            # requeued spans are drained first and keep their order
+            self.assertEqual(queue.drain(spans_list, 2), 2)
+            self.assertEqual(spans_list[:2], drained[1:])
+            self.assertEqual(queue.drain(spans_list, 4), 1)
+            self.assertEqual(spans_list[0], "d")
+            self.assertEqual(len(queue), 0)
+
+
+class TestEstimateSpanSize(unittest.TestCase):
+    def test_estimate_span_size(self):
+        tracer = trace.TracerProvider().get_tracer(__name__)
+        span = tracer.start_span("span")
+        span.end()
+        base_size = export.estimate_span_size(span)
+        self.assertGreater(base_size, len("span"))
+
+        span = tracer.start_span(
+            "span", attributes={"key": "value", "numbers": (1, 2)}
+        )
+        span.add_event("event", {"flag": True})
+        span.end()
+        size = export.estimate_span_size(span)
+        self.assertGreater(size, base_size)
+        self.assertEqual(
+            size - base_size,
+            export.estimate_attributes_size(span.attributes)
+            + export.estimate_attributes_size(span.events[0].attributes)
+            + export._EVENT_OVERHEAD_BYTES  # pylint: disable=protected-access
+            + len("event"),
+        )
+
+        # the default estimate of an exporter is estimate_span_size
+        self.assertEqual(
+            MySpanExporter(destination=[]).estimate_encoded_size(span), size
+        )
+
+    def test_estimate_attributes_size(self):
+        self.assertEqual(export.estimate_attributes_size(None), 0)
+        self.assertEqual(export.estimate_attributes_size({}), 0)
+        self.assertLess(
+            export.estimate_attributes_size({"key": "v"}),
+            export.estimate_attributes_size({"key": "v" * 100}),
+        )
+        self.assertLess(
+            export.estimate_attributes_size({"key": (1,)}),
+            export.estimate_attributes_size({"key": (1, 2, 3)}),
+        )
+
 
 class TestConsoleSpanExporter(unittest.TestCase):
     def test_export(self):  # pylint: disable=no-self-use
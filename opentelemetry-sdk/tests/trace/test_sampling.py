@@ -311,6 +311,24 @@ class TestSampler(unittest.TestCase):
             almost_almost_always_on.bound, 0xFFFFFFFFFFFFFFFF,
         )
 
+    def test_probability_sampler_bound_override(self):
+        class HalfRatioBased(sampling.TraceIdRatioBased):
+            @property
+            def bound(self):
+                return 0x8000000000000000
+
+        sampler = HalfRatioBased(0)
+        self.assertTrue(
+            sampler.should_sample(
+                None, 0x7FFFFFFFFFFFFFFF, "span name"
+            ).decision.is_sampled()
+        )
+        self.assertFalse(
+            sampler.should_sample(
+                None, 0x8000000000000000, "span name"
+            ).decision.is_sampled()
+        )
+
     def exec_parent_based(self, parent_sampling_context):
         trace_state = trace.TraceState({"key": "value"})
         sampler = sampling.ParentBased(sampling.ALWAYS_ON)
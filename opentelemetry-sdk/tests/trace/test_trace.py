@@ -16,6 +16,7 @@
 import shutil
 import subprocess
 import unittest
+import weakref
 from logging import ERROR, WARNING
 from typing import Optional
 from unittest import mock
@@ -30,6 +31,10 @@ from opentelemetry.trace.status import StatusCode
 from opentelemetry.util import time_ns
 
 
+class StrSubclass(str):
+    pass
+
+
 def new_tracer() -> trace_api.Tracer:
     return trace.TracerProvider().get_tracer(__name__)
 
@@ -174,6 +179,30 @@ class TestTracerSampling(unittest.TestCase):
             trace_api.TraceFlags.DEFAULT,
         )
 
+    def test_trace_flags_are_reused(self):
+        for sampler in (sampling.ALWAYS_ON, sampling.ALWAYS_OFF):
+            tracer = trace.TracerProvider(sampler).get_tracer(__name__)
+            span1 = tracer.start_span(name="span1")
+            span2 = tracer.start_span(name="span2")
+            self.assertIs(
+                span1.get_span_context().trace_flags,
+                span2.get_span_context().trace_flags,
+            )
+
+    def test_ratio_based_sampler_drops_attributes(self):
+        sampler = sampling.TraceIdRatioBased(0)
+        result = sampler.should_sample(
+            None, 0x8000000000000000, "span", {"key": "value"}
+        )
+        self.assertFalse(result.decision.is_sampled())
+        self.assertEqual(dict(result.attributes), {})
+
+        tracer_provider = trace.TracerProvider(sampler)
+        tracer = tracer_provider.get_tracer(__name__)
+        span = tracer.start_span(name="span", attributes={"key": "value"})
+        self.assertIsInstance(span, trace_api.DefaultSpan)
+        self.assertFalse(span.is_recording())
+
 
 class TestSpanCreation(unittest.TestCase):
     def test_start_span_invalid_spancontext(self):
@@ -446,6 +475,32 @@ class TestSpan(unittest.TestCase):
         span = trace._Span("name", mock.Mock(spec=trace_api.SpanContext))
         self.assertEqual(span.name, "name")
 
+    def test_lazy_containers(self):
+        span = trace._Span("name", mock.Mock(spec=trace_api.SpanContext))
+        self.assertFalse(hasattr(span, "__dict__"))
+        self.assertEqual(dict(span.attributes), {})
+        self.assertEqual(len(span.events), 0)
+        self.assertEqual(len(span.links), 0)
+        # pylint: disable=protected-access
+        self.assertIsNone(span._attributes)
+        self.assertIsNone(span._events)
+        self.assertIsNone(span._links)
+
+        span.start()
+        span.set_attribute("key", "value")
+        span.add_event("event")
+        self.assertEqual(dict(span.attributes), {"key": "value"})
+        self.assertEqual(span.events[0].name, "event")
+        # the containers share the lock of the span
+        self.assertIs(span._attributes._lock, span._lock)
+        self.assertIs(span._events._lock, span._lock)
+        span.end()
+
+    def test_weakref(self):
+        span = self.tracer.start_span("name")
+        self.assertIs(weakref.ref(span)(), span)
+        span.end()
+
     def test_attributes(self):
         with self.tracer.start_as_current_span("root") as root:
             root.set_attribute("component", "http")
@@ -508,6 +563,62 @@ class TestSpan(unittest.TestCase):
             self.assertEqual(root.attributes["attr-key2"], "val2")
             self.assertEqual(root.attributes["attr-in-both"], "span-attr")
 
+    def test_set_attributes(self):
+        with self.tracer.start_as_current_span("root") as root:
+            root.set_attributes(
+                {
+                    "http.method": "GET",
+                    "http.status_code": 200,
+                    "list-of-numerics": [123, 314, 0],
+                    "valid-byte-type-attribute": b"valid byte",
+                    "invalid-value": {},
+                    "": "invalid-key",
+                }
+            )
+            root.set_attributes({})
+            root.set_attributes(None)
+
+        self.assertEqual(
+            dict(root.attributes),
+            {
+                "http.method": "GET",
+                "http.status_code": 200,
+                "list-of-numerics": (123, 314, 0),
+                "valid-byte-type-attribute": "valid byte",
+            },
+        )
+
+        with self.assertLogs(level=WARNING):
+            root.set_attributes({"http.method": "POST"})
+        self.assertEqual(root.attributes["http.method"], "GET")
+
+    def test_interned_attribute_sets(self):
+        tracer_provider = trace.TracerProvider(max_interned_attribute_sets=2)
+        tracer = tracer_provider.get_tracer(__name__)
+        # pylint: disable=protected-access
+        attribute_sets = tracer_provider._attribute_sets
+
+        for _ in range(3):
+            with tracer.start_as_current_span("root") as root:
+                root.set_attributes({"http.method": "GET", "retry": True})
+            self.assertEqual(
+                dict(root.attributes), {"http.method": "GET", "retry": True}
+            )
+        cache_info = attribute_sets._clean.cache_info()
+        self.assertEqual(cache_info.hits, 2)
+        self.assertEqual(cache_info.misses, 1)
+
+        # equal values of different types are interned separately
+        with tracer.start_as_current_span("root") as root:
+            root.set_attributes({"http.method": "GET", "retry": 1})
+        self.assertIs(type(root.attributes["retry"]), int)
+
+        # sequences are not interned
+        self.assertIsNone(attribute_sets.get({"list": (1, 2)}))
+        with tracer.start_as_current_span("root") as root:
+            root.set_attributes({"list": [1, 2]})
+        self.assertEqual(root.attributes["list"], (1, 2))
+
     def test_invalid_attribute_values(self):
         with self.tracer.start_as_current_span("root") as root:
             root.set_attribute("non-primitive-data-type", dict())
@@ -572,6 +683,54 @@ class TestSpan(unittest.TestCase):
         self.assertTrue(trace._is_valid_attribute_value([None, None]))
         self.assertFalse(trace._is_valid_attribute_value(["A", None, 1]))
         self.assertFalse(trace._is_valid_attribute_value([None, "A", None, 1]))
+        # subclasses of valid types and other sequence types
+        self.assertTrue(trace._is_valid_attribute_value(StrSubclass("hi")))
+        self.assertTrue(trace._is_valid_attribute_value(b"hi"))
+        self.assertTrue(trace._is_valid_attribute_value(range(3)))
+        self.assertFalse(trace._is_valid_attribute_value([StrSubclass("A")]))
+        self.assertFalse(trace._is_valid_attribute_value({"A"}))
+        # bool is a subclass of int
+        self.assertTrue(trace._is_valid_attribute_value([1, True]))
+        self.assertFalse(trace._is_valid_attribute_value([True, 1]))
+
+    def test_attribute_value_kind(self):
+        # pylint: disable=protected-access
+        self.assertEqual(
+            trace._get_attribute_value_kind(StrSubclass),
+            trace._VALID_SCALAR,
+        )
+        self.assertIn(StrSubclass, trace._ATTRIBUTE_VALUE_KINDS)
+        self.assertEqual(
+            trace._get_attribute_value_kind(bytearray),
+            trace._MUTABLE_SEQUENCE,
+        )
+        self.assertEqual(
+            trace._get_attribute_value_kind(bytes), trace._SEQUENCE
+        )
+        self.assertEqual(trace._get_attribute_value_kind(dict), trace._INVALID)
+
+    def test_trusted_attributes(self):
+        tracer_provider = trace.TracerProvider(
+            trusted_instrumentations=["trusted"]
+        )
+        tracer = tracer_provider.get_tracer(__name__)
+        self.assertFalse(tracer.trusted_attributes)
+        tracer = tracer_provider.get_tracer("trusted")
+        self.assertTrue(tracer.trusted_attributes)
+
+        with mock.patch.object(
+            trace, "_is_valid_attribute_value"
+        ) as mock_is_valid:
+            with tracer.start_as_current_span(
+                "root", attributes={"list": [1, 2]}
+            ) as root:
+                root.set_attribute("list", ["a", "b"])
+                root.add_event("event", {"key": "value"})
+            mock_is_valid.assert_not_called()
+
+        # mutable sequences set on the span are still frozen
+        self.assertEqual(root.attributes["list"], ("a", "b"))
+        self.assertEqual(root.events[0].attributes["key"], "value")
 
     def test_sampling_attributes(self):
         sampling_attributes = {